@@ -36,6 +36,12 @@ def test_imports():
     except ImportError as e:
         errors.append(f"✗ Pandas not installed: {e}")
     
+    try:
+        import pyarrow
+        print("✓ PyArrow installed")
+    except ImportError as e:
+        errors.append(f"✗ PyArrow not installed: {e}")
+    
     try:
         import requests
         print("✓ Requests installed")
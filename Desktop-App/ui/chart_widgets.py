@@ -63,8 +63,8 @@ class MultiChartWidget(QWidget):
         
         layout.addWidget(self.canvas)
     
-    def update_charts(self, statistics, dataset_name="Dataset"):
-        """Update all charts with new data"""
+    def update_charts(self, statistics, dataset_name="Dataset", series=None):
+        """Update all charts with new data; `series` holds downsampled rows per column"""
         self.figure.clear()
         
         # Create 2x2 subplot grid
@@ -95,7 +95,7 @@ class MultiChartWidget(QWidget):
         self.plot_distribution(axes[0, 1], statistics)
         
         # Chart 3: Time Series / Line Chart
-        self.plot_time_series(axes[1, 0], statistics)
+        self.plot_time_series(axes[1, 0], statistics, series)
         
         # Chart 4: Pie Chart - Value Distribution
         self.plot_value_distribution(axes[1, 1], statistics)
@@ -142,14 +142,19 @@ class MultiChartWidget(QWidget):
                 min_val = stats.get('min', mean - std)
                 max_val = stats.get('max', mean + std)
                 
-                # Generate synthetic distribution
-                data_points = [
-                    min_val,
-                    mean - std * 0.5,
-                    mean,
-                    mean + std * 0.5,
-                    max_val
-                ]
+                quantiles = stats.get('quantiles')
+                if quantiles:
+                    # Five points whose quartiles are the stored percentiles
+                    data_points = [min_val, quantiles['p25'], quantiles['p50'], quantiles['p75'], max_val]
+                else:
+                    # Generate synthetic distribution
+                    data_points = [
+                        min_val,
+                        mean - std * 0.5,
+                        mean,
+                        mean + std * 0.5,
+                        max_val
+                    ]
                 data_to_plot.append(data_points)
                 labels.append(metric.capitalize())
         
@@ -166,8 +171,16 @@ class MultiChartWidget(QWidget):
         ax.set_ylabel('Value', fontsize=11, fontweight='bold')
         ax.tick_params(axis='x', labelsize=11)
     
-    def plot_time_series(self, ax, statistics):
-        """Plot line chart (simulated time series)"""
+    def plot_time_series(self, ax, statistics, series=None):
+        """Plot line chart of the downsampled rows (simulated without them)"""
+        if series:
+            for index, column in enumerate(['Flowrate', 'Pressure', 'Temperature']):
+                if column in series:
+                    ax.plot(series[column]['x'], series[column]['y'], color=Config.CHART_COLORS[index],
+                            linewidth=1.2, label=column, alpha=0.95)
+            self._style_time_series(ax)
+            return
+        
         # Generate sample time series data based on statistics
         count = statistics.get('count', 10)
         x = np.linspace(0, count, min(count, 50))
@@ -189,7 +202,10 @@ class MultiChartWidget(QWidget):
         ax.plot(x, flowrate_y, color=Config.CHART_COLORS[0], linewidth=2, label='Flowrate', alpha=0.95)
         ax.plot(x, pressure_y, color=Config.CHART_COLORS[1], linewidth=2, label='Pressure', alpha=0.95)
         ax.plot(x, temperature_y, color=Config.CHART_COLORS[2], linewidth=2, label='Temperature', alpha=0.95)
-        
+        self._style_time_series(ax)
+    
+    def _style_time_series(self, ax):
+        """Title, axis labels and legend of the trend chart"""
         ax.set_title('Trend Analysis', fontsize=14, fontweight='bold', pad=15, color='#f9fafb')
         ax.set_xlabel('Data Points', fontsize=11, fontweight='bold')
         ax.set_ylabel('Value', fontsize=11, fontweight='bold')
@@ -26,9 +26,10 @@ class MainWindow(QMainWindow):
         self.user_data = user_data
         self.current_dataset_id = None
         self.current_dataset_name = ""
+        self.series = None
         self.datasets = []
         self.statistics = None
-        self.data_rows = []
+        self.data_frame = None
         
         self.init_ui()
         self.load_initial_data()
@@ -429,6 +430,10 @@ class MainWindow(QMainWindow):
             self.current_dataset_name = result.get('file_name', '')
             self.statistics = result.get('statistics', {})
             
+            # Downsampled rows for the trend chart
+            success, series = api_client.get_dataset_series(dataset_id, points=Config.CHART_SERIES_POINTS)
+            self.series = series.get('series') if success else None
+            
             # Update statistics cards
             self.update_statistics_display()
             
@@ -497,10 +502,18 @@ class MainWindow(QMainWindow):
             if 'temperature' in data:
                 temperature_values.extend([data['temperature'].get('min', 0), data['temperature'].get('max', 0)])
         
-        # Calculate std as (max - min) / 4 (rough estimate)
-        flowrate_std = (max(flowrate_values) - min(flowrate_values)) / 4 if flowrate_values else 1
-        pressure_std = (max(pressure_values) - min(pressure_values)) / 4 if pressure_values else 1
-        temperature_std = (max(temperature_values) - min(temperature_values)) / 4 if temperature_values else 1
+        # Use the exact std from the backend; older results fall back to (max - min) / 4
+        overall_std = stats.get('overall_std') or {}
+        overall_quantiles = stats.get('overall_quantiles') or {}
+        flowrate_std = overall_std.get('flowrate')
+        if flowrate_std is None:
+            flowrate_std = (max(flowrate_values) - min(flowrate_values)) / 4 if flowrate_values else 1
+        pressure_std = overall_std.get('pressure')
+        if pressure_std is None:
+            pressure_std = (max(pressure_values) - min(pressure_values)) / 4 if pressure_values else 1
+        temperature_std = overall_std.get('temperature')
+        if temperature_std is None:
+            temperature_std = (max(temperature_values) - min(temperature_values)) / 4 if temperature_values else 1
         
         return {
             'count': stats.get('total_equipment_count', 0),
@@ -508,59 +521,56 @@ class MainWindow(QMainWindow):
                 'mean': overall.get('flowrate', 0),
                 'std': flowrate_std,
                 'min': min(flowrate_values) if flowrate_values else 0,
-                'max': max(flowrate_values) if flowrate_values else 0
+                'max': max(flowrate_values) if flowrate_values else 0,
+                'quantiles': overall_quantiles.get('flowrate')
             },
             'pressure': {
                 'mean': overall.get('pressure', 0),
                 'std': pressure_std,
                 'min': min(pressure_values) if pressure_values else 0,
-                'max': max(pressure_values) if pressure_values else 0
+                'max': max(pressure_values) if pressure_values else 0,
+                'quantiles': overall_quantiles.get('pressure')
             },
             'temperature': {
                 'mean': overall.get('temperature', 0),
                 'std': temperature_std,
                 'min': min(temperature_values) if temperature_values else 0,
-                'max': max(temperature_values) if temperature_values else 0
+                'max': max(temperature_values) if temperature_values else 0,
+                'quantiles': overall_quantiles.get('temperature')
             }
         }
     
     def load_table_data(self, dataset_id):
         """Load data into table view"""
-        success, result = api_client.get_dataset_data(dataset_id)
+        success, result = api_client.get_dataset_frame(dataset_id)
         
         if success:
-            # Handle both list and dict responses
-            if isinstance(result, list):
-                data = result
-            else:
-                data = result.get('data', [])
-            
-            if not data:
+            if result.empty:
+                self.data_frame = None
                 self.data_table.setRowCount(0)
                 self.table_info_label.setText("No data available")
                 return
             
             # Store data
-            self.data_rows = data
+            self.data_frame = result
             
             # Set up table
-            headers = list(data[0].keys()) if data else []
+            headers = [str(column) for column in result.columns]
             self.data_table.setColumnCount(len(headers))
             self.data_table.setHorizontalHeaderLabels(headers)
-            self.data_table.setRowCount(len(data))
+            self.data_table.setRowCount(len(result))
             
-            # Populate table
-            for row_idx, row_data in enumerate(data):
-                for col_idx, header in enumerate(headers):
-                    value = row_data.get(header, '')
-                    item = QTableWidgetItem(str(value))
-                    self.data_table.setItem(row_idx, col_idx, item)
+            # Populate table from column-wise string conversion
+            cells = result.astype(str).to_numpy()
+            for row_idx, row_values in enumerate(cells):
+                for col_idx, value in enumerate(row_values):
+                    self.data_table.setItem(row_idx, col_idx, QTableWidgetItem(value))
             
             # Resize columns
             self.data_table.resizeColumnsToContents()
             
             self.table_info_label.setText(
-                f"Showing {len(data)} records from {self.current_dataset_name}"
+                f"Showing {len(result)} records from {self.current_dataset_name}"
             )
         else:
             self.table_info_label.setText(f"Error loading data: {result}")
@@ -570,7 +580,7 @@ class MainWindow(QMainWindow):
         if not self.statistics:
             return
         
-        self.multi_chart_widget.update_charts(self.statistics, self.current_dataset_name)
+        self.multi_chart_widget.update_charts(self.statistics, self.current_dataset_name, self.series)
     
     def load_history(self):
         """Load upload history"""
@@ -682,7 +692,7 @@ class MainWindow(QMainWindow):
     
     def export_to_csv(self):
         """Export current data to CSV"""
-        if not self.data_rows:
+        if self.data_frame is None or self.data_frame.empty:
             QMessageBox.warning(self, "No Data", "No data to export.")
             return
         
@@ -692,12 +702,7 @@ class MainWindow(QMainWindow):
         
         if file_path:
             try:
-                import csv
-                with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                    if self.data_rows:
-                        writer = csv.DictWriter(f, fieldnames=self.data_rows[0].keys())
-                        writer.writeheader()
-                        writer.writerows(self.data_rows)
+                self.data_frame.to_csv(file_path, index=False, encoding='utf-8')
                 
                 QMessageBox.information(self, "Success", 
                                       f"Data exported successfully to:\n{file_path}")
@@ -714,7 +719,7 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.Yes:
-            api_client.clear_credentials()
+            api_client.logout()
             from ui.login_window import LoginWindow
             self.login_window = LoginWindow()
             self.login_window.show()
@@ -23,10 +23,16 @@ class ReportWorker(QThread):
         self.output_path = output_path
     
     def run(self):
-        """Generate the report"""
+        """Queue the report on the server, wait for it and download it"""
         try:
+            self.progress_update.emit(10)
+            success, job = api_client.create_report_job(self.dataset_id)
+            if not success:
+                self.report_complete.emit(False, job)
+                return
+            
             self.progress_update.emit(30)
-            success, result = api_client.download_pdf_report(self.dataset_id, self.output_path)
+            success, result = api_client.wait_for_report(job['id'], self.output_path)
             self.progress_update.emit(100)
             self.report_complete.emit(success, result)
         except Exception as e:
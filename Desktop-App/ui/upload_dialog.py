@@ -11,6 +11,10 @@ from utils.api_client import api_client
 from utils.config import Config
 import os
 
+# Share of the progress bar covered by the file transfer; server-side
+# processing progress fills the rest
+UPLOAD_PROGRESS_SHARE = 10
+
 class UploadWorker(QThread):
     """Worker thread for uploading files"""
     
@@ -21,11 +25,31 @@ class UploadWorker(QThread):
         super().__init__()
         self.file_path = file_path
     
+    def report_processing_progress(self, percent):
+        """Map server-side processing progress onto the rest of the bar"""
+        share = 100 - UPLOAD_PROGRESS_SHARE
+        self.progress_update.emit(UPLOAD_PROGRESS_SHARE + int(percent * share / 100))
+    
     def run(self):
         """Run the upload"""
         try:
-            self.progress_update.emit(30)
+            self.progress_update.emit(0)
             success, result = api_client.upload_csv(self.file_path)
+            
+            # The server processes the file in the background; report its progress
+            if success and result.get('status') == 'processing':
+                self.progress_update.emit(UPLOAD_PROGRESS_SHARE)
+                success, dataset = api_client.wait_for_dataset(
+                    result['dataset_id'],
+                    on_progress=self.report_processing_progress
+                )
+                if success:
+                    result['status'] = dataset['status']
+                    result['row_count'] = dataset['row_count']
+                    result['statistics'] = dataset['statistics']
+                else:
+                    result = dataset
+            
             self.progress_update.emit(100)
             self.upload_complete.emit(success, result)
         except Exception as e:
@@ -2,12 +2,15 @@
 API Client for communicating with Django backend
 """
 
+import time
 import requests
 import json
-import base64
-from typing import Optional, Dict, Any, Tuple
+import pyarrow as pa
+from typing import Optional, Dict, Any, List, Tuple, Callable
 from utils.config import Config
 
+ARROW_STREAM_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+
 class APIClient:
     """Handles all API communications with the backend"""
     
@@ -15,35 +18,36 @@ class APIClient:
         self.base_url = Config.API_BASE_URL
         self.timeout = Config.API_TIMEOUT
         self.username = None
-        self.password = None
-        self.auth_header = None
+        self.token = None
     
-    def set_credentials(self, username: str, password: str):
-        """Set authentication credentials"""
+    def set_credentials(self, username: str, token: str):
+        """Set authentication credentials from the token issued at login"""
         self.username = username
-        self.password = password
-        credentials = f"{username}:{password}"
-        self.auth_header = base64.b64encode(credentials.encode()).decode()
+        self.token = token
     
     def clear_credentials(self):
         """Clear authentication credentials"""
         self.username = None
-        self.password = None
-        self.auth_header = None
+        self.token = None
+    
+    def _auth_headers(self) -> Dict[str, str]:
+        """Get the bearer token authentication header"""
+        if self.token:
+            return {'Authorization': f'Bearer {self.token}'}
+        return {}
     
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers with authentication"""
         headers = {
             'Content-Type': 'application/json',
         }
-        if self.auth_header:
-            headers['Authorization'] = f'Basic {self.auth_header}'
+        headers.update(self._auth_headers())
         return headers
     
     def _handle_response(self, response: requests.Response) -> Tuple[bool, Any]:
         """Handle API response"""
         try:
-            if response.status_code in [200, 201]:
+            if response.status_code in [200, 201, 202]:
                 return True, response.json()
             else:
                 error_data = response.json() if response.text else {}
@@ -65,14 +69,27 @@ class APIClient:
             response = requests.post(url, json=data, timeout=self.timeout)
             
             if response.status_code == 200:
-                self.set_credentials(username, password)
-                return True, response.json()
+                result = response.json()
+                self.set_credentials(username, result.get('token'))
+                return True, result
             else:
                 error_data = response.json() if response.text else {}
                 return False, error_data.get('error', 'Login failed')
         except Exception as e:
             return False, f"Connection error: {str(e)}"
     
+    def logout(self) -> Tuple[bool, Any]:
+        """Logout user and revoke the API token"""
+        try:
+            url = f"{self.base_url}/api/v1/auth/logout/"
+            headers = self._get_headers()
+            response = requests.post(url, headers=headers, timeout=self.timeout)
+            return self._handle_response(response)
+        except Exception as e:
+            return False, f"Connection error: {str(e)}"
+        finally:
+            self.clear_credentials()
+    
     def register(self, username: str, email: str, password: str, 
                  first_name: str = "", last_name: str = "") -> Tuple[bool, Any]:
         """Register new user"""
@@ -106,9 +123,7 @@ class APIClient:
         """Upload CSV file"""
         try:
             url = f"{self.base_url}/api/v1/analytics/csv/upload/"
-            headers = {}
-            if self.auth_header:
-                headers['Authorization'] = f'Basic {self.auth_header}'
+            headers = self._auth_headers()
             
             with open(file_path, 'rb') as f:
                 files = {'file': f}
@@ -119,16 +134,87 @@ class APIClient:
         except Exception as e:
             return False, f"Upload error: {str(e)}"
     
-    def list_datasets(self) -> Tuple[bool, Any]:
-        """List all datasets"""
+    def get_dataset_status(self, dataset_id: int) -> Tuple[bool, Any]:
+        """Get dataset processing status and progress"""
         try:
-            url = f"{self.base_url}/api/v1/analytics/datasets/"
+            url = f"{self.base_url}/api/v1/analytics/datasets/{dataset_id}/status/"
             headers = self._get_headers()
             response = requests.get(url, headers=headers, timeout=self.timeout)
             return self._handle_response(response)
         except Exception as e:
             return False, f"Connection error: {str(e)}"
     
+    def get_dataset_histograms(self, dataset_id: int, types: Optional[List[str]] = None) -> Tuple[bool, Any]:
+        """Get the fixed-bin histograms computed when the dataset was processed"""
+        try:
+            url = f"{self.base_url}/api/v1/analytics/datasets/{dataset_id}/histograms/"
+            headers = self._get_headers()
+            params = {'type': ','.join(types)} if types else None
+            response = requests.get(url, headers=headers, params=params, timeout=self.timeout)
+            return self._handle_response(response)
+        except Exception as e:
+            return False, f"Connection error: {str(e)}"
+    
+    def get_dataset_series(self, dataset_id: int, points: int = 1000,
+                           columns: Optional[List[str]] = None) -> Tuple[bool, Any]:
+        """Get a min/max-downsampled series of each numeric column for plotting"""
+        try:
+            url = f"{self.base_url}/api/v1/analytics/datasets/{dataset_id}/series/"
+            headers = self._get_headers()
+            params = {'points': points}
+            if columns:
+                params['columns'] = ','.join(columns)
+            response = requests.get(url, headers=headers, params=params, timeout=self.timeout)
+            return self._handle_response(response)
+        except Exception as e:
+            return False, f"Connection error: {str(e)}"
+    
+    def wait_for_dataset(self, dataset_id: int, on_progress: Optional[Callable[[float], None]] = None,
+                         poll_interval: float = 1.0, max_wait: float = 600) -> Tuple[bool, Any]:
+        """Poll an uploaded dataset until background processing finishes"""
+        deadline = time.monotonic() + max_wait
+        while True:
+            success, result = self.get_dataset_status(dataset_id)
+            if not success:
+                return False, result
+            
+            if on_progress:
+                on_progress(result.get('progress') or 0.0)
+            
+            if result.get('status') == 'completed':
+                return self.get_dataset(dataset_id)
+            if result.get('status') == 'failed':
+                return False, result.get('error_log') or 'Processing failed'
+            
+            if time.monotonic() >= deadline:
+                return False, "Timed out waiting for the dataset to be processed"
+            time.sleep(poll_interval)
+    
+    def list_datasets(self, page_size: int = 500) -> Tuple[bool, Any]:
+        """
+        List all datasets (summary fields only, without statistics).
+        
+        The server returns the list one page at a time; pages are followed
+        via their "next" cursor until the last one, so the result holds the
+        whole history in a single "datasets" list.
+        """
+        try:
+            url = f"{self.base_url}/api/v1/analytics/datasets/"
+            headers = self._get_headers()
+            params = {'view': 'summary', 'limit': page_size}
+            datasets = []
+            while True:
+                response = requests.get(url, headers=headers, params=params, timeout=self.timeout)
+                success, result = self._handle_response(response)
+                if not success:
+                    return success, result
+                datasets.extend(result.get('datasets', []))
+                if not result.get('next'):
+                    return True, {'count': len(datasets), 'next': None, 'datasets': datasets}
+                params['cursor'] = result['next']
+        except Exception as e:
+            return False, f"Connection error: {str(e)}"
+    
     def get_dataset(self, dataset_id: int) -> Tuple[bool, Any]:
         """Get specific dataset details"""
         try:
@@ -159,6 +245,25 @@ class APIClient:
         except Exception as e:
             return False, f"Connection error: {str(e)}"
     
+    def get_dataset_frame(self, dataset_id: int) -> Tuple[bool, Any]:
+        """Get dataset raw data as a pandas DataFrame using the Arrow wire format"""
+        try:
+            url = f"{self.base_url}/api/v1/analytics/datasets/{dataset_id}/data/"
+            headers = self._get_headers()
+            headers['Accept'] = ARROW_STREAM_MEDIA_TYPE
+            response = requests.get(url, headers=headers, timeout=self.timeout)
+            
+            if response.status_code == 200:
+                return True, pa.ipc.open_stream(response.content).read_all().to_pandas()
+            
+            # Errors are sent as JSON whatever format was requested
+            error_data = response.json() if response.text else {}
+            error_msg = (error_data.get('error') or error_data.get('detail')
+                         or f'Request failed with status {response.status_code}')
+            return False, error_msg
+        except Exception as e:
+            return False, f"Connection error: {str(e)}"
+    
     def delete_dataset(self, dataset_id: int) -> Tuple[bool, Any]:
         """Delete a dataset"""
         try:
@@ -182,14 +287,68 @@ class APIClient:
         except Exception as e:
             return False, f"Connection error: {str(e)}"
     
-    def download_pdf_report(self, dataset_id: int, output_path: str) -> Tuple[bool, Any]:
-        """Download PDF report for a dataset"""
+    def download_pdf_report(self, dataset_id: int, output_path: str,
+                            chart_format: Optional[str] = None) -> Tuple[bool, Any]:
+        """Download PDF report for a dataset ('raster' or 'vector' charts; server default if None)"""
         try:
             url = f"{self.base_url}/api/v1/analytics/datasets/{dataset_id}/pdf-report/"
-            headers = {}
-            if self.auth_header:
-                headers['Authorization'] = f'Basic {self.auth_header}'
+            headers = self._auth_headers()
+            params = {'charts': chart_format} if chart_format else None
+            
+            response = requests.get(url, headers=headers, params=params, timeout=self.timeout, stream=True)
+            
+            if response.status_code == 200:
+                with open(output_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        f.write(chunk)
+                return True, output_path
+            else:
+                return False, f"Failed to download PDF: {response.status_code}"
+        except Exception as e:
+            return False, f"Download error: {str(e)}"
+    
+    def create_report_job(self, dataset_id: int, chart_format: Optional[str] = None) -> Tuple[bool, Any]:
+        """Queue PDF report generation on the server's background workers"""
+        try:
+            url = f"{self.base_url}/api/v1/analytics/datasets/{dataset_id}/reports/"
+            headers = self._get_headers()
+            data = {'charts': chart_format} if chart_format else {}
+            response = requests.post(url, json=data, headers=headers, timeout=self.timeout)
+            return self._handle_response(response)
+        except Exception as e:
+            return False, f"Connection error: {str(e)}"
+    
+    def get_report_job(self, job_id: int) -> Tuple[bool, Any]:
+        """Get the status of a report job"""
+        try:
+            url = f"{self.base_url}/api/v1/analytics/reports/{job_id}/"
+            headers = self._get_headers()
+            response = requests.get(url, headers=headers, timeout=self.timeout)
+            return self._handle_response(response)
+        except Exception as e:
+            return False, f"Connection error: {str(e)}"
+    
+    def wait_for_report(self, job_id: int, output_path: str, poll_interval: float = 1.0,
+                        max_wait: float = 600) -> Tuple[bool, Any]:
+        """Poll a report job until the PDF is ready, then save it to output_path"""
+        deadline = time.monotonic() + max_wait
+        while True:
+            success, result = self.get_report_job(job_id)
+            if not success:
+                return False, result
             
+            if result.get('status') == 'completed':
+                break
+            if result.get('status') == 'failed':
+                return False, result.get('error_log') or 'Report generation failed'
+            
+            if time.monotonic() >= deadline:
+                return False, "Timed out waiting for the report"
+            time.sleep(poll_interval)
+        
+        try:
+            url = f"{self.base_url}/api/v1/analytics/reports/{job_id}/download/"
+            headers = self._auth_headers()
             response = requests.get(url, headers=headers, timeout=self.timeout, stream=True)
             
             if response.status_code == 200:
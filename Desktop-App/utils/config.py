@@ -47,6 +47,7 @@ class Config:
         '#06b6d4',  # Cyan
         '#f59e0b',  # Amber
     ]
+    CHART_SERIES_POINTS = 1000  # Points per line in the trend chart (downsampled by the server)
     
     # File Settings
     MAX_FILE_SIZE_MB = 50
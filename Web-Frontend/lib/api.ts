@@ -4,8 +4,8 @@
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
-// Store credentials in memory for Basic Auth
-let authCredentials: string | null = null;
+// Store the API token issued at login in memory
+let authToken: string | null = null;
 
 // TypeScript Interfaces
 export interface UserPreferences {
@@ -31,34 +31,35 @@ export interface UserProfile {
 }
 
 /**
- * Set authentication credentials for API requests
+ * Set the API token used for authenticated requests
  */
-export function setAuthCredentials(username: string, password: string) {
-  authCredentials = btoa(`${username}:${password}`);
+export function setAuthToken(token: string) {
+  authToken = token;
   if (typeof window !== 'undefined') {
-    localStorage.setItem('auth_credentials', authCredentials);
+    localStorage.setItem('auth_token', token);
   }
 }
 
 /**
- * Get stored authentication credentials
+ * Get stored API token
  */
-export function getAuthCredentials(): string | null {
-  if (authCredentials) return authCredentials;
+export function getAuthToken(): string | null {
+  if (authToken) return authToken;
   
   if (typeof window !== 'undefined') {
-    authCredentials = localStorage.getItem('auth_credentials');
+    authToken = localStorage.getItem('auth_token');
   }
   
-  return authCredentials;
+  return authToken;
 }
 
 /**
- * Clear authentication credentials
+ * Clear the API token
  */
-export function clearAuthCredentials() {
-  authCredentials = null;
+export function clearAuthToken() {
+  authToken = null;
   if (typeof window !== 'undefined') {
+    localStorage.removeItem('auth_token');
     localStorage.removeItem('auth_credentials');
     localStorage.removeItem('user_data');
   }
@@ -68,7 +69,7 @@ export function clearAuthCredentials() {
  * Check if user is authenticated
  */
 export function isAuthenticated(): boolean {
-  return getAuthCredentials() !== null;
+  return getAuthToken() !== null;
 }
 
 /**
@@ -78,14 +79,14 @@ async function apiRequest(
   endpoint: string,
   options: RequestInit = {}
 ): Promise<Response> {
-  const credentials = getAuthCredentials();
+  const token = getAuthToken();
   
   const headers: Record<string, string> = {
     ...(options.headers as Record<string, string>),
   };
 
-  if (credentials) {
-    headers['Authorization'] = `Basic ${credentials}`;
+  if (token) {
+    headers['Authorization'] = `Bearer ${token}`;
   }
 
   // Don't set Content-Type for FormData
@@ -117,7 +118,7 @@ export async function login(username: string, password: string) {
 
   if (response.ok) {
     const data = await response.json();
-    setAuthCredentials(username, password);
+    setAuthToken(data.token);
     
     if (typeof window !== 'undefined') {
       localStorage.setItem('user_data', JSON.stringify(data.user));
@@ -168,7 +169,7 @@ export async function register(
 
   if (response.ok) {
     const data = await response.json();
-    setAuthCredentials(username, password);
+    setAuthToken(data.token);
     
     if (typeof window !== 'undefined') {
       localStorage.setItem('user_data', JSON.stringify(data.user));
@@ -203,7 +204,7 @@ export async function logout() {
   } catch (error) {
     console.error('Logout error:', error);
   } finally {
-    clearAuthCredentials();
+    clearAuthToken();
   }
 }
 
@@ -309,7 +310,7 @@ export async function updateUserPreferences(preferences: Partial<UserPreferences
 /**
  * Upload CSV file
  */
-export async function uploadCSV(file: File) {
+export async function uploadCSV(file: File, onProgress?: (percent: number) => void) {
   const formData = new FormData();
   formData.append('file', file);
 
@@ -320,6 +321,9 @@ export async function uploadCSV(file: File) {
 
   if (response.ok) {
     const data = await response.json();
+    if (data.status === 'processing') {
+      return waitForDataset(data.dataset_id, onProgress);
+    }
     return { success: true, data };
   } else {
     let errorMessage = 'Upload failed';
@@ -339,10 +343,61 @@ export async function uploadCSV(file: File) {
 }
 
 /**
- * List all datasets
+ * Get the fixed-bin histograms computed when a dataset was processed
+ */
+export async function getDatasetHistograms(id: number, types?: string[]) {
+  const query = types && types.length ? `?type=${encodeURIComponent(types.join(','))}` : '';
+  const response = await apiRequest(`/api/v1/analytics/datasets/${id}/histograms/${query}`, {
+    method: 'GET',
+  });
+
+  if (response.ok) {
+    const data: DatasetHistograms = await response.json();
+    return { success: true, data };
+  } else {
+    let errorMessage = 'Failed to fetch dataset histograms';
+    try {
+      const error = await response.json();
+      errorMessage = error.error || error.detail || errorMessage;
+    } catch (e) {
+      errorMessage = `Server error: ${response.status}`;
+    }
+    return { success: false, error: errorMessage };
+  }
+}
+
+/**
+ * Get a min/max-downsampled series of each numeric column for plotting
+ */
+export async function getDatasetSeries(id: number, points = 1000, columns?: string[]) {
+  const params = new URLSearchParams({ points: String(points) });
+  if (columns && columns.length) {
+    params.set('columns', columns.join(','));
+  }
+  const response = await apiRequest(`/api/v1/analytics/datasets/${id}/series/?${params}`, {
+    method: 'GET',
+  });
+
+  if (response.ok) {
+    const data: DatasetSeries = await response.json();
+    return { success: true, data };
+  } else {
+    let errorMessage = 'Failed to fetch dataset series';
+    try {
+      const error = await response.json();
+      errorMessage = error.error || error.detail || errorMessage;
+    } catch (e) {
+      errorMessage = `Server error: ${response.status}`;
+    }
+    return { success: false, error: errorMessage };
+  }
+}
+
+/**
+ * Get dataset processing status and progress
  */
-export async function listDatasets() {
-  const response = await apiRequest('/api/v1/analytics/datasets/', {
+export async function getDatasetStatus(id: number) {
+  const response = await apiRequest(`/api/v1/analytics/datasets/${id}/status/`, {
     method: 'GET',
   });
 
@@ -350,15 +405,10 @@ export async function listDatasets() {
     const data = await response.json();
     return { success: true, data };
   } else {
-    let errorMessage = 'Failed to fetch datasets';
+    let errorMessage = 'Failed to fetch dataset status';
     try {
-      const contentType = response.headers.get('content-type');
-      if (contentType && contentType.includes('application/json')) {
-        const error = await response.json();
-        errorMessage = error.error || errorMessage;
-      } else {
-        errorMessage = `Server error: ${response.status}`;
-      }
+      const error = await response.json();
+      errorMessage = error.error || error.detail || errorMessage;
     } catch (e) {
       errorMessage = `Server error: ${response.status}`;
     }
@@ -366,6 +416,98 @@ export async function listDatasets() {
   }
 }
 
+/**
+ * Poll an uploaded dataset until background processing finishes
+ */
+export async function waitForDataset(
+  id: number,
+  onProgress?: (percent: number) => void,
+  pollInterval = 1000,
+  maxWait = 600000
+) {
+  const deadline = Date.now() + maxWait;
+
+  while (true) {
+    const result = await getDatasetStatus(id);
+    if (!result.success) {
+      return result;
+    }
+
+    const progress = result.data;
+    onProgress?.(progress.progress ?? 0);
+
+    if (progress.status === 'completed') {
+      const detail = await getDataset(id);
+      if (!detail.success) {
+        return detail;
+      }
+      const dataset = detail.data;
+      return {
+        success: true,
+        data: {
+          dataset_id: dataset.id,
+          file_name: dataset.file_name,
+          status: dataset.status,
+          row_count: dataset.row_count,
+          statistics: dataset.statistics,
+        },
+      };
+    }
+    if (progress.status === 'failed') {
+      return { success: false, error: progress.error_log || 'Processing failed' };
+    }
+
+    if (Date.now() >= deadline) {
+      return { success: false, error: 'Timed out waiting for the dataset to be processed' };
+    }
+    await new Promise((resolve) => setTimeout(resolve, pollInterval));
+  }
+}
+
+/**
+ * List all datasets
+ *
+ * The server pages the list with a keyset cursor; pages are followed via
+ * `next` until the last one, so `data.datasets` holds the whole history.
+ */
+export async function listDatasets(pageSize: number = 500) {
+  const datasets: Dataset[] = [];
+  let cursor: string | null = null;
+
+  while (true) {
+    const params = new URLSearchParams({ view: 'summary', limit: String(pageSize) });
+    if (cursor) {
+      params.set('cursor', cursor);
+    }
+    const response = await apiRequest(`/api/v1/analytics/datasets/?${params}`, {
+      method: 'GET',
+    });
+
+    if (!response.ok) {
+      let errorMessage = 'Failed to fetch datasets';
+      try {
+        const contentType = response.headers.get('content-type');
+        if (contentType && contentType.includes('application/json')) {
+          const error = await response.json();
+          errorMessage = error.error || errorMessage;
+        } else {
+          errorMessage = `Server error: ${response.status}`;
+        }
+      } catch (e) {
+        errorMessage = `Server error: ${response.status}`;
+      }
+      return { success: false, error: errorMessage };
+    }
+
+    const page = await response.json();
+    datasets.push(...page.datasets);
+    cursor = page.next;
+    if (!cursor) {
+      return { success: true, data: { count: datasets.length, next: null, datasets } };
+    }
+  }
+}
+
 /**
  * Get specific dataset
  */
@@ -452,9 +594,11 @@ export async function getStatistics() {
 
 /**
  * Generate PDF report for a dataset
+ * @param chartFormat - 'raster' (images) or 'vector' (smaller, sharp at any zoom); server default if omitted
  */
-export async function generatePDF(id: number) {
-  const response = await apiRequest(`/api/v1/analytics/datasets/${id}/pdf-report/`, {
+export async function generatePDF(id: number, chartFormat?: 'raster' | 'vector') {
+  const query = chartFormat ? `?charts=${chartFormat}` : '';
+  const response = await apiRequest(`/api/v1/analytics/datasets/${id}/pdf-report/${query}`, {
     method: 'GET',
   });
 
@@ -479,10 +623,110 @@ export async function generatePDF(id: number) {
 }
 
 /**
- * Download PDF report
+ * Queue PDF report generation on the server's background workers
+ * @param chartFormat - 'raster' or 'vector' charts; server default if omitted
+ */
+export async function createReportJob(id: number, chartFormat?: 'raster' | 'vector') {
+  const response = await apiRequest(`/api/v1/analytics/datasets/${id}/reports/`, {
+    method: 'POST',
+    body: JSON.stringify(chartFormat ? { charts: chartFormat } : {}),
+  });
+
+  if (response.ok) {
+    const data: ReportJob = await response.json();
+    return { success: true, data };
+  } else {
+    let errorMessage = 'Failed to start report generation';
+    try {
+      const error = await response.json();
+      errorMessage = error.error || error.detail || errorMessage;
+    } catch (e) {
+      errorMessage = `Server error: ${response.status}`;
+    }
+    return { success: false, error: errorMessage };
+  }
+}
+
+/**
+ * Get the status of a report job
  */
-export async function downloadPDF(id: number, filename: string = 'equipment_report.pdf') {
-  const result = await generatePDF(id);
+export async function getReportJob(jobId: number) {
+  const response = await apiRequest(`/api/v1/analytics/reports/${jobId}/`, {
+    method: 'GET',
+  });
+
+  if (response.ok) {
+    const data: ReportJob = await response.json();
+    return { success: true, data };
+  } else {
+    let errorMessage = 'Failed to fetch report status';
+    try {
+      const error = await response.json();
+      errorMessage = error.error || error.detail || errorMessage;
+    } catch (e) {
+      errorMessage = `Server error: ${response.status}`;
+    }
+    return { success: false, error: errorMessage };
+  }
+}
+
+/**
+ * Poll a report job until the PDF is ready, then fetch it
+ */
+export async function waitForReport(jobId: number, pollInterval = 1000, maxWait = 600000) {
+  const deadline = Date.now() + maxWait;
+
+  while (true) {
+    const result = await getReportJob(jobId);
+    if (!result.success || !result.data) {
+      return { success: false, error: result.error };
+    }
+
+    if (result.data.status === 'completed') {
+      break;
+    }
+    if (result.data.status === 'failed') {
+      return { success: false, error: result.data.error_log || 'Report generation failed' };
+    }
+
+    if (Date.now() >= deadline) {
+      return { success: false, error: 'Timed out waiting for the report' };
+    }
+    await new Promise((resolve) => setTimeout(resolve, pollInterval));
+  }
+
+  const response = await apiRequest(`/api/v1/analytics/reports/${jobId}/download/`, {
+    method: 'GET',
+  });
+  if (response.ok) {
+    const blob = await response.blob();
+    return { success: true, blob };
+  }
+
+  let errorMessage = 'Failed to download report';
+  try {
+    const error = await response.json();
+    errorMessage = error.error || errorMessage;
+  } catch (e) {
+    errorMessage = `Server error: ${response.status}`;
+  }
+  return { success: false, error: errorMessage };
+}
+
+/**
+ * Download PDF report (generated by a background report job)
+ */
+export async function downloadPDF(
+  id: number,
+  filename: string = 'equipment_report.pdf',
+  chartFormat?: 'raster' | 'vector'
+) {
+  const job = await createReportJob(id, chartFormat);
+  if (!job.success || !job.data) {
+    return { success: false, error: job.error };
+  }
+
+  const result = await waitForReport(job.data.id);
   
   if (result.success && result.blob) {
     const url = window.URL.createObjectURL(result.blob);
@@ -530,7 +774,7 @@ export interface Dataset {
   uploaded_at: string;
   row_count: number;
   status: 'processing' | 'completed' | 'failed';
-  statistics: any;
+  statistics?: any; // Not included in summary listings
   uploaded_by_username: string;
 }
 
@@ -549,4 +793,36 @@ export interface Statistics {
     pressure: number;
     temperature: number;
   };
+  overall_histograms?: { [parameter: string]: Histogram };
+}
+
+// Equal-width bins over range; edge i is range[0] + i * (range[1] - range[0]) / counts.length
+export interface Histogram {
+  range: [number, number];
+  counts: number[];
+}
+
+// x holds row positions (among rows matching the type filter), y the values
+export interface DatasetSeries {
+  dataset_id: number;
+  total_rows: number;
+  bucket_size: number;
+  series: { [column: string]: { x: number[]; y: number[] } };
+}
+
+export interface ReportJob {
+  id: number;
+  dataset_id: number;
+  chart_format: 'raster' | 'vector';
+  status: 'processing' | 'completed' | 'failed';
+  error_log: string | null;
+  created_at: string;
+  started_at: string | null;
+  completed_at: string | null;
+}
+
+export interface DatasetHistograms {
+  dataset_id: number;
+  overall: { [parameter: string]: Histogram };
+  by_type: { [type: string]: { [parameter: string]: Histogram } };
 }
@@ -0,0 +1,493 @@
+"""
+Columnar Parquet sidecars for uploaded CSV datasets.
+
+The first time a dataset is processed, its validated rows are written to a
+compressed Parquet file next to the uploaded CSV. Later reads load the
+sidecar instead of re-tokenizing the CSV text.
+"""
+import os
+import math
+import logging
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_COLUMNS = ['Flowrate', 'Pressure', 'Temperature']
+
+
+class DataQueryError(ValueError):
+    """Raised when a data query references columns the dataset does not have."""
+
+
+class SidecarWriter:
+    """
+    Incrementally write validated DataFrame chunks to a Parquet sidecar.
+
+    The schema is fixed by the first chunk, with numeric columns stored as
+    float64 so that every chunk shares the same types. If a later chunk
+    cannot be cast to that schema the sidecar is abandoned and reads fall
+    back to the CSV.
+
+    Each writer uses its own temporary file, so the upload worker and a
+    request backfilling the same sidecar never write into each other's file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = None
+        self.writer = None
+        self.schema = None
+        self.failed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.discard()
+        return False
+
+    def write(self, df):
+        """
+        Append a chunk to the sidecar.
+
+        Args:
+            df: pandas DataFrame chunk that has passed validation
+        """
+        if self.failed:
+            return
+
+        frame = df.astype({col: 'float64' for col in NUMERIC_COLUMNS if col in df.columns})
+        try:
+            table = pa.Table.from_pandas(frame, schema=self.schema, preserve_index=False)
+            if self.writer is None:
+                self.schema = table.schema
+                fd, self.tmp_path = tempfile.mkstemp(
+                    prefix=f"{os.path.basename(self.path)}.",
+                    suffix='.tmp',
+                    dir=os.path.dirname(self.path)
+                )
+                os.close(fd)
+                self.writer = pq.ParquetWriter(
+                    self.tmp_path,
+                    self.schema,
+                    compression=getattr(settings, 'PARQUET_COMPRESSION', 'zstd')
+                )
+            # Bounded row groups let a page be read without the rest of the file
+            self.writer.write_table(table, row_group_size=getattr(settings, 'PARQUET_ROW_GROUP_SIZE', 65536))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, ValueError) as e:
+            logger.warning(f"Skipping Parquet sidecar for {self.path}: {e}")
+            self.discard()
+
+    def commit(self):
+        """Close the writer and move the finished sidecar into place."""
+        if self.failed or self.writer is None:
+            return False
+
+        self.writer.close()
+        self.writer = None
+        os.replace(self.tmp_path, self.path)
+        return True
+
+    def discard(self):
+        """Close the writer and remove any partially written file."""
+        self.failed = True
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if self.tmp_path and os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def has_sidecar(dataset):
+    """Return True if the dataset already has a Parquet sidecar on disk."""
+    return os.path.exists(dataset.sidecar_path)
+
+
+def write_sidecar(dataset, df):
+    """
+    Write a complete DataFrame as the dataset's sidecar.
+
+    Returns:
+        bool: True if the sidecar was written
+    """
+    with SidecarWriter(dataset.sidecar_path) as sidecar:
+        sidecar.write(df)
+        return sidecar.commit()
+
+
+def load_dataframe(dataset, columns=None):
+    """
+    Load a dataset's rows, preferring the Parquet sidecar.
+
+    Datasets processed before sidecars existed are read from the CSV once
+    and the sidecar is backfilled for subsequent reads.
+
+    Args:
+        dataset: CSVDataset model instance
+        columns: Optional list of columns to load
+
+    Returns:
+        pandas DataFrame
+    """
+    if has_sidecar(dataset):
+        return pd.read_parquet(dataset.sidecar_path, columns=columns)
+
+    df = pd.read_csv(dataset.file.path, dtype={'Type': str})
+    if dataset.status == 'completed':
+        write_sidecar(dataset, df)
+    return df[columns] if columns else df
+
+
+def iter_frames(dataset, chunk_size, columns=None, dtype=None, on_progress=None):
+    """
+    Yield a dataset's rows as DataFrames of at most chunk_size rows.
+
+    Args:
+        dataset: CSVDataset model instance
+        chunk_size: Maximum rows per yielded DataFrame
+        columns: Optional list of columns to load
+        dtype: Optional dtype mapping used when falling back to the CSV
+        on_progress: Optional callable receiving the number of source bytes
+            consumed after each yielded DataFrame
+
+    Yields:
+        pandas DataFrame
+    """
+    if has_sidecar(dataset):
+        parquet_file = pq.ParquetFile(dataset.sidecar_path)
+        total_rows = parquet_file.metadata.num_rows
+        total_bytes = os.path.getsize(dataset.sidecar_path)
+        rows_read = 0
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+            rows_read += batch.num_rows
+            if on_progress:
+                # Decompressed batches have no byte offset; estimate by rows
+                on_progress(total_bytes * rows_read // max(total_rows, 1))
+        return
+
+    with open(dataset.file.path, 'rb') as handle:
+        with pd.read_csv(handle, chunksize=chunk_size, usecols=columns, dtype=dtype) as reader:
+            for chunk in reader:
+                yield chunk
+                if on_progress:
+                    on_progress(handle.tell())
+
+
+def dataset_columns(dataset):
+    """Return the dataset's column names without loading any rows."""
+    if has_sidecar(dataset):
+        return pq.read_schema(dataset.sidecar_path).names
+    return pd.read_csv(dataset.file.path, nrows=0).columns.tolist()
+
+
+def load_table(dataset, columns=None, filter=None):
+    """
+    Load a dataset as a pyarrow Table, pushing projection and filtering
+    down into the Parquet reader.
+
+    Args:
+        dataset: CSVDataset model instance
+        columns: Optional list of columns to load
+        filter: Optional pyarrow.compute Expression selecting rows
+
+    Returns:
+        pyarrow.Table
+    """
+    if not has_sidecar(dataset):
+        df = load_dataframe(dataset)
+        if not has_sidecar(dataset):
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if filter is not None:
+                table = table.filter(filter)
+            return table.select(columns) if columns else table
+
+    return pq.read_table(dataset.sidecar_path, columns=columns, filters=filter)
+
+
+def _resolve_columns(dataset, columns, types, extra=()):
+    """
+    Validate requested column names against the dataset.
+
+    Returns:
+        tuple: (columns to return, columns that must be read)
+
+    Raises:
+        DataQueryError: If a requested or extra column does not exist
+    """
+    available = dataset_columns(dataset)
+    requested = list(columns) if columns else available
+
+    unknown = [name for name in requested + list(extra) if name not in available]
+    if unknown:
+        raise DataQueryError(f"Unknown columns: {', '.join(unknown)}")
+
+    needed = list(dict.fromkeys(requested + list(extra) + (['Type'] if types else [])))
+    return requested, needed
+
+
+def query_rows(dataset, columns=None, types=None, sort=None, offset=0, limit=None):
+    """
+    Return one page of a dataset's rows, projected, filtered and sorted.
+
+    Without a sort, only the row groups holding the page are read (plus the
+    Type column when filtering), so the cost of a page tracks the page size
+    rather than the dataset size. Sorting needs every matching row.
+
+    Args:
+        dataset: CSVDataset model instance
+        columns: Optional list of columns to return (defaults to all)
+        types: Optional list of equipment types to keep
+        sort: Optional list of column names, prefixed with '-' for descending
+        offset: Number of matching rows to skip
+        limit: Maximum number of rows to return (None for all)
+
+    Returns:
+        tuple: (total matching row count, list of row dicts)
+
+    Raises:
+        DataQueryError: If a projected or sort column does not exist
+    """
+    sort_keys = []
+    for key in sort or []:
+        if key.startswith('-'):
+            sort_keys.append((key[1:], 'descending'))
+        else:
+            sort_keys.append((key, 'ascending'))
+    if any(not name for name, _ in sort_keys):
+        raise DataQueryError("Sort keys must name a column, e.g. sort=-Flowrate.")
+
+    requested, needed = _resolve_columns(dataset, columns, types, [name for name, _ in sort_keys])
+
+    if not sort_keys and has_sidecar(dataset):
+        return _read_page(dataset, requested, types, offset, limit)
+
+    # Sidecars written before Type was always read as text may hold it as int64
+    filter = pc.field('Type').cast(pa.string()).isin(types) if types else None
+
+    table = load_table(dataset, columns=needed, filter=filter)
+    total = table.num_rows
+
+    if sort_keys:
+        table = table.sort_by(sort_keys)
+
+    page = table.slice(offset, limit)
+    return total, page.select(requested).to_pylist()
+
+
+def _read_page(dataset, columns, types, offset, limit):
+    """
+    Read one unsorted page from the sidecar, touching only the row groups
+    that hold it.
+
+    Returns:
+        tuple: (total matching row count, list of row dicts)
+    """
+    parquet_file = pq.ParquetFile(dataset.sidecar_path)
+    metadata = parquet_file.metadata
+    stop = None if limit is None else offset + limit
+
+    if types:
+        type_column = parquet_file.read(columns=['Type']).column('Type')
+        matches = pc.is_in(pc.cast(type_column, pa.string()), value_set=pa.array(types, type=pa.string()))
+        positions = np.flatnonzero(matches.to_numpy(zero_copy_only=False))
+        total = positions.size
+        positions = positions[offset:stop]
+    else:
+        total = metadata.num_rows
+        positions = np.arange(offset, total if stop is None else min(stop, total))
+
+    if not positions.size:
+        return total, []
+
+    bounds = np.cumsum([0] + [metadata.row_group(group).num_rows for group in range(metadata.num_row_groups)])
+    first, last = np.searchsorted(bounds, positions[[0, -1]], side='right') - 1
+    table = parquet_file.read_row_groups(range(first, last + 1), columns=columns)
+    return total, table.take(positions - bounds[first]).to_pylist()
+
+
+def iter_batches(dataset, batch_size, columns=None, types=None, offset=0, limit=None):
+    """
+    Yield a dataset's rows as pyarrow RecordBatches of at most batch_size rows.
+
+    Rows are read from the sidecar one batch at a time, so memory stays
+    flat regardless of dataset size. Column names are validated before the
+    returned generator is consumed. If no rows match, a single empty batch
+    carrying the schema is yielded.
+
+    Args:
+        dataset: CSVDataset model instance
+        batch_size: Maximum rows per batch read from storage
+        columns: Optional list of columns to return (defaults to all)
+        types: Optional list of equipment types to keep
+        offset: Number of matching rows to skip
+        limit: Maximum number of rows to yield (None for all)
+
+    Returns:
+        generator of pyarrow.RecordBatch
+
+    Raises:
+        DataQueryError: If a projected column does not exist
+    """
+    requested, needed = _resolve_columns(dataset, columns, types)
+    return _generate_batches(dataset, batch_size, requested, needed, types, offset, limit)
+
+
+def _generate_batches(dataset, batch_size, requested, needed, types, offset, limit):
+    """Generator behind iter_batches, run only once the response is streamed."""
+    if has_sidecar(dataset):
+        batches = pq.ParquetFile(dataset.sidecar_path).iter_batches(
+            batch_size=batch_size, columns=needed
+        )
+    else:
+        batches = load_table(dataset, columns=needed).to_batches(max_chunksize=batch_size)
+
+    value_set = pa.array(types, type=pa.string()) if types else None
+    remaining = limit
+    yielded = False
+    empty_batch = None
+
+    for batch in batches:
+        if value_set is not None:
+            batch = batch.filter(pc.is_in(pc.cast(batch['Type'], pa.string()), value_set=value_set))
+
+        if offset:
+            skipped = min(offset, batch.num_rows)
+            batch = batch.slice(skipped)
+            offset -= skipped
+
+        if remaining is not None:
+            batch = batch.slice(0, remaining)
+            remaining -= batch.num_rows
+
+        if batch.num_rows:
+            yielded = True
+            yield batch.select(requested)
+        elif empty_batch is None:
+            empty_batch = batch.select(requested)
+
+        if remaining == 0:
+            break
+
+    # Binary writers need a schema even when no rows matched
+    if not yielded and empty_batch is not None:
+        yield empty_batch
+
+
+def count_rows(dataset, types=None, batch_size=100000):
+    """
+    Count a dataset's rows, optionally only those of the given types.
+
+    Without a type filter the count is read from the sidecar's Parquet
+    metadata. With one, only the Type column is scanned.
+
+    Args:
+        dataset: CSVDataset model instance
+        types: Optional list of equipment types to count
+        batch_size: Rows read per batch when scanning Type
+
+    Returns:
+        int: Number of matching rows
+    """
+    if not types:
+        if has_sidecar(dataset):
+            return pq.ParquetFile(dataset.sidecar_path).metadata.num_rows
+        return load_table(dataset, columns=['Type']).num_rows
+    return sum(batch.num_rows for batch in iter_batches(dataset, batch_size, columns=['Type'], types=types))
+
+
+def downsample_series(dataset, total_rows, points, columns=None, types=None, batch_size=100000):
+    """
+    Decimate numeric columns to at most `points` points for plotting.
+
+    Rows are split into equal buckets by row position, and each bucket
+    keeps its minimum and maximum (in row order), so peaks and dips stay
+    visible however far a series is reduced. The dataset is read in
+    batches, so memory is set by batch_size and `points`, not by the
+    dataset size. Series with at most `points` rows are returned whole.
+
+    Args:
+        dataset: CSVDataset model instance
+        total_rows: Number of rows matching `types`, used to size buckets
+        points: Maximum points per series (at least 2)
+        columns: Optional numeric columns to return (defaults to all)
+        types: Optional list of equipment types to keep
+        batch_size: Rows read per batch
+
+    Returns:
+        dict: {'bucket_size': n, 'series': {column: {'x': [row positions], 'y': [values]}}}
+
+    Raises:
+        DataQueryError: If a column does not exist or is not numeric
+    """
+    columns = list(columns) if columns else [name for name in NUMERIC_COLUMNS if name in dataset_columns(dataset)]
+    not_numeric = [name for name in columns if name not in NUMERIC_COLUMNS]
+    if not_numeric:
+        raise DataQueryError(f"Columns are not numeric: {', '.join(not_numeric)}")
+
+    bucket_size = 1 if total_rows <= points else math.ceil(total_rows / (points // 2))
+    parts = {name: [] for name in columns}
+    start = 0
+
+    for batch in iter_batches(dataset, batch_size, columns=columns, types=types):
+        # iter_batches yields one empty batch when no rows match
+        if not batch.num_rows:
+            continue
+        buckets = (start + np.arange(batch.num_rows)) // bucket_size
+        for name in columns:
+            values = batch[name].to_numpy(zero_copy_only=False).astype(float)
+            parts[name].append(_bucket_extremes(buckets, start, values))
+        start += batch.num_rows
+
+    series = {}
+    for name, chunks in parts.items():
+        if not chunks:
+            series[name] = {'x': [], 'y': []}
+            continue
+        # Buckets that straddle two batches appear twice; reduce them again
+        buckets, positions, values = (np.concatenate(arrays) for arrays in zip(*chunks))
+        lowest = _first_per_bucket(np.lexsort((values, buckets)), buckets)
+        highest = _first_per_bucket(np.lexsort((-values, buckets)), buckets)
+        keep = np.unique(np.concatenate([positions[lowest], positions[highest]]))
+        order = np.argsort(positions, kind='stable')
+        index = order[np.searchsorted(positions[order], keep)]
+        series[name] = {'x': keep.tolist(), 'y': values[index].tolist()}
+
+    return {'bucket_size': bucket_size, 'series': series}
+
+
+def _bucket_extremes(buckets, start, values):
+    """
+    Minimum and maximum of each bucket within one batch, in one pass.
+    Buckets are contiguous runs, since they follow row positions.
+
+    Returns:
+        tuple: (bucket ids, row positions, values), two entries per bucket
+    """
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    segments = np.repeat(np.arange(starts.size), np.diff(np.r_[starts, values.size]))
+
+    index = []
+    for reduce in (np.minimum, np.maximum):
+        extremes = reduce.reduceat(values, starts)
+        hits = np.flatnonzero(values == extremes[segments])
+        # First hit of each segment
+        index.append(hits[np.r_[True, segments[hits][1:] != segments[hits][:-1]]])
+
+    index = np.concatenate(index)
+    return buckets[index], start + index, values[index]
+
+
+def _first_per_bucket(order, buckets):
+    """Indices of the first row of each bucket in an ordering sorted by bucket."""
+    ordered = buckets[order]
+    first = np.ones(ordered.size, dtype=bool)
+    first[1:] = ordered[1:] != ordered[:-1]
+    return order[first]
@@ -0,0 +1,412 @@
+"""
+Database-backed background job queue for CSV processing and PDF reports.
+
+Uploaded datasets are the queue: a dataset with status 'processing' and no
+processing_started_at is waiting for a worker. Workers claim datasets with
+a conditional UPDATE, so several worker processes can share the queue
+safely. Run the workers with `python manage.py process_uploads`.
+
+Report jobs (see ReportJob) are queued and claimed the same way and run on
+the same pool, after any waiting uploads.
+
+A claim lasts as long as its worker keeps a heartbeat going: uploads
+refresh processing_started_at with every progress write, report jobs
+refresh heartbeat_at from a background thread while the PDF renders. Work
+whose heartbeat is more than CSV_JOB_STALE_AFTER seconds old is treated as
+abandoned by a crashed worker and can be claimed again.
+
+The same loop sweeps files of datasets removed by the retention limit
+(see FileDeletion); `python manage.py sweep_files` runs one sweep on its own.
+
+Model imports are deferred to function bodies because this module is also
+imported by freshly spawned worker processes before Django is set up.
+"""
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from . import report_cache
+
+logger = logging.getLogger(__name__)
+
+
+def background_processing_enabled():
+    """Return True if uploads are handed to the worker pool."""
+    return getattr(settings, 'CSV_BACKGROUND_PROCESSING', True)
+
+
+def claim_next_dataset():
+    """
+    Atomically claim the oldest dataset waiting to be processed.
+
+    Datasets whose last heartbeat (processing_started_at, refreshed by every
+    progress write) is more than CSV_JOB_STALE_AFTER seconds old are treated
+    as abandoned by a crashed worker and can be claimed again.
+
+    Returns:
+        int or None: Primary key of the claimed dataset
+    """
+    from .models import CSVDataset
+
+    stale_after = getattr(settings, 'CSV_JOB_STALE_AFTER', 3600)
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+
+    candidates = CSVDataset.objects.filter(status='processing').filter(
+        Q(processing_started_at__isnull=True) | Q(processing_started_at__lt=cutoff)
+    ).order_by('uploaded_at').values_list('pk', 'processing_started_at')
+
+    for pk, started_at in candidates[:10]:
+        claimed = CSVDataset.objects.filter(
+            pk=pk,
+            status='processing',
+            processing_started_at=started_at
+        ).update(processing_started_at=timezone.now())
+        if claimed:
+            return pk
+
+    return None
+
+
+def claim_next_report_job():
+    """
+    Atomically claim the oldest report job waiting for a worker.
+
+    Like datasets, jobs whose heartbeat_at is more than CSV_JOB_STALE_AFTER
+    seconds old can be claimed again.
+
+    Returns:
+        int or None: Primary key of the claimed job
+    """
+    from .models import ReportJob
+
+    stale_after = getattr(settings, 'CSV_JOB_STALE_AFTER', 3600)
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+
+    candidates = ReportJob.objects.filter(status='processing').filter(
+        Q(heartbeat_at__isnull=True) | Q(heartbeat_at__lt=cutoff)
+    ).order_by('created_at').values_list('pk', 'heartbeat_at')
+
+    for pk, heartbeat_at in candidates[:10]:
+        now = timezone.now()
+        claimed = ReportJob.objects.filter(
+            pk=pk,
+            status='processing',
+            heartbeat_at=heartbeat_at
+        ).update(started_at=now, heartbeat_at=now)
+        if claimed:
+            return pk
+
+    return None
+
+
+def process_dataset(dataset_id):
+    """
+    Process one claimed dataset. Runs inside a worker process.
+
+    The dataset may be deleted at any point, e.g. by the retention limit.
+    Processing only ever UPDATEs the row, so it checks for deletion at every
+    progress and final write and stops without inserting the row again.
+
+    Returns:
+        tuple: (dataset_id, success, error_message)
+    """
+    from .models import CSVDataset
+    from .services import CSVProcessingService
+
+    try:
+        dataset = CSVDataset.objects.get(pk=dataset_id)
+    except CSVDataset.DoesNotExist:
+        # Deleted (e.g. by the retention limit) while queued
+        return dataset_id, False, 'Dataset no longer exists.'
+
+    success, error_message = CSVProcessingService(dataset).process()
+    return dataset_id, success, error_message
+
+
+def process_report_job(job_id, chart_processes=1):
+    """
+    Generate the PDF of one claimed report job. Runs inside a worker process.
+
+    Charts are rendered in this process by default: the pool already runs
+    one job per worker, so a chart pool per job would oversubscribe the CPUs.
+
+    Args:
+        job_id: Primary key of the claimed ReportJob
+        chart_processes: Processes rendering raster charts
+
+    Returns:
+        tuple: (job_id, success, error_message)
+    """
+    from .models import ReportJob
+    from .pdf_service import PDFReportService
+
+    try:
+        job = ReportJob.objects.select_related('dataset__uploaded_by').get(pk=job_id)
+    except ReportJob.DoesNotExist:
+        # Deleted along with its dataset while queued
+        return job_id, False, 'Report job no longer exists.'
+
+    dataset = job.dataset
+    try:
+        # The statistics may have been recomputed since the job was queued
+        digest = report_cache.report_digest(dataset, PDFReportService.TEMPLATE_VERSION, job.chart_format)
+        with _report_heartbeat(job_id):
+            report_cache.get_or_render(
+                dataset.id,
+                digest,
+                lambda output: PDFReportService(dataset, job.chart_format, chart_processes).generate(output),
+                variant=job.chart_format
+            )
+    except Exception as e:
+        logger.exception(f"Report job {job_id} failed")
+        ReportJob.objects.filter(pk=job_id).update(
+            status='failed',
+            error_log=str(e),
+            completed_at=timezone.now()
+        )
+        return job_id, False, str(e)
+
+    ReportJob.objects.filter(pk=job_id).update(
+        status='completed',
+        digest=digest,
+        completed_at=timezone.now()
+    )
+    return job_id, True, None
+
+
+@contextmanager
+def _report_heartbeat(job_id):
+    """
+    Refresh a report job's heartbeat_at from a background thread.
+
+    PDF rendering reports no progress, so while the job runs the thread
+    touches the row every CSV_JOB_STALE_AFTER / 4 seconds, keeping the
+    claim fresh without a write per chart.
+    """
+    from .models import ReportJob
+
+    interval = getattr(settings, 'CSV_JOB_STALE_AFTER', 3600) / 4
+    stopped = threading.Event()
+
+    def beat():
+        try:
+            while not stopped.wait(interval):
+                ReportJob.objects.filter(pk=job_id, status='processing').update(
+                    heartbeat_at=timezone.now()
+                )
+        finally:
+            # Closes only this thread's connection
+            connections.close_all()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def expire_report_jobs():
+    """
+    Delete finished report jobs older than PDF_REPORT_JOB_TTL seconds.
+
+    Returns:
+        int: Number of jobs deleted
+    """
+    from .models import ReportJob
+
+    ttl = getattr(settings, 'PDF_REPORT_JOB_TTL', 86400)
+    cutoff = timezone.now() - timedelta(seconds=ttl)
+    deleted, _ = ReportJob.objects.exclude(status='processing').filter(completed_at__lt=cutoff).delete()
+    return deleted
+
+
+def sweep_deleted_files(batch_size=None):
+    """
+    Remove stored files queued for deletion by the retention signal.
+
+    Files still referenced by a dataset (uploads deduplicated onto the
+    same stored CSV) are left in place. Cached PDF reports of the removed
+    datasets are deleted as well.
+
+    Args:
+        batch_size: Maximum queue entries handled (defaults to CSV_SWEEP_BATCH_SIZE)
+
+    Returns:
+        int: Number of stored CSVs removed
+    """
+    from .models import CSVDataset, FileDeletion
+
+    batch_size = batch_size or getattr(settings, 'CSV_SWEEP_BATCH_SIZE', 500)
+    pending = list(FileDeletion.objects.order_by('pk').values_list('pk', 'file_name')[:batch_size])
+    if not pending:
+        return 0
+
+    names = {file_name for _, file_name in pending}
+    in_use = set(CSVDataset.objects.filter(file__in=names).values_list('file', flat=True))
+    storage = CSVDataset._meta.get_field('file').storage
+
+    removed = 0
+    for file_name in names - in_use:
+        sidecar_path = f"{storage.path(file_name)}.parquet"
+        if os.path.exists(sidecar_path):
+            os.remove(sidecar_path)
+        if storage.exists(file_name):
+            storage.delete(file_name)
+            removed += 1
+
+    FileDeletion.objects.filter(pk__in=[pk for pk, _ in pending]).delete()
+    report_cache.prune()
+    logger.info(f"Swept {removed} deleted uploads from storage")
+    return removed
+
+
+def _release_dataset(dataset_id):
+    """Return a claimed dataset to the queue."""
+    from .models import CSVDataset
+
+    CSVDataset.objects.filter(pk=dataset_id, status='processing').update(
+        processing_started_at=None
+    )
+
+
+def _release_report_job(job_id):
+    """Return a claimed report job to the queue."""
+    from .models import ReportJob
+
+    ReportJob.objects.filter(pk=job_id, status='processing').update(started_at=None, heartbeat_at=None)
+
+
+def _claim_next():
+    """
+    Claim the next unit of work, uploads first so that new data is never
+    held up behind a burst of report requests.
+
+    Returns:
+        tuple or None: (task, object_id, release, log_result)
+    """
+    dataset_id = claim_next_dataset()
+    if dataset_id is not None:
+        return process_dataset, dataset_id, _release_dataset, _log_result
+
+    job_id = claim_next_report_job()
+    if job_id is not None:
+        return process_report_job, job_id, _release_report_job, _log_report_result
+
+    return None
+
+
+def _make_executor(workers):
+    """Create the worker pool. Spawned workers open their own DB connections."""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker
+    )
+
+
+def _init_worker():
+    """Set up Django in a freshly spawned worker process."""
+    django.setup()
+
+
+def _log_result(future):
+    try:
+        dataset_id, success, error_message = future.result()
+    except Exception as e:
+        logger.error(f"Background job crashed: {e}")
+        return
+
+    if success:
+        logger.info(f"Processed dataset {dataset_id} in background")
+    else:
+        logger.warning(f"Dataset {dataset_id} failed: {error_message}")
+
+
+def _log_report_result(future):
+    try:
+        job_id, success, error_message = future.result()
+    except Exception as e:
+        logger.error(f"Background job crashed: {e}")
+        return
+
+    if success:
+        logger.info(f"Generated report {job_id} in background")
+    else:
+        logger.warning(f"Report {job_id} failed: {error_message}")
+
+
+def _sweep():
+    """Remove files of expired datasets and forget old report jobs."""
+    sweep_deleted_files()
+    expire_report_jobs()
+
+
+def run_worker_pool(workers=None, poll_interval=None, once=False):
+    """
+    Claim queued datasets and report jobs and run them in a pool of worker
+    processes. While the pool is idle, files of expired datasets are swept
+    from storage.
+
+    Args:
+        workers: Number of worker processes (defaults to CSV_WORKER_PROCESSES)
+        poll_interval: Seconds to sleep when the queue is empty
+        once: Drain the current queue, wait for it to finish and return
+    """
+    workers = workers or getattr(settings, 'CSV_WORKER_PROCESSES', 2)
+    poll_interval = poll_interval or getattr(settings, 'CSV_WORKER_POLL_INTERVAL', 1.0)
+
+    sweep_interval = getattr(settings, 'CSV_SWEEP_INTERVAL', 60)
+    last_sweep = None
+    executor = _make_executor(workers)
+    running = set()
+
+    try:
+        while True:
+            running = {future for future in running if not future.done()}
+
+            while len(running) < workers:
+                claimed = _claim_next()
+                if claimed is None:
+                    break
+                task, object_id, release, log_result = claimed
+                try:
+                    future = executor.submit(task, object_id)
+                except BrokenProcessPool:
+                    # A worker died (e.g. out of memory). Its work is
+                    # reclaimed once stale; this one is released right away.
+                    logger.error("Worker pool broke, restarting it")
+                    release(object_id)
+                    executor.shutdown(wait=False)
+                    executor = _make_executor(workers)
+                    running = set()
+                    break
+                future.add_done_callback(log_result)
+                running.add(future)
+
+            if once and not running:
+                _sweep()
+                return
+
+            # File removal never competes with queued uploads or reports
+            if not running and (last_sweep is None or time.monotonic() - last_sweep >= sweep_interval):
+                _sweep()
+                last_sweep = time.monotonic()
+
+            connections.close_all()
+            time.sleep(poll_interval)
+    finally:
+        executor.shutdown(wait=True)
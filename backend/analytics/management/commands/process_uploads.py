@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from analytics.jobs import run_worker_pool
+
+
+class Command(BaseCommand):
+    help = 'Run the background worker pool that processes uploaded CSV files and PDF report jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Number of worker processes (default: CSV_WORKER_PROCESSES)'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            help='Seconds to wait between queue checks (default: CSV_WORKER_POLL_INTERVAL)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the datasets and report jobs currently queued, then exit'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Processing queued CSV uploads... (Ctrl+C to stop)')
+        try:
+            run_worker_pool(
+                workers=options['workers'],
+                poll_interval=options['poll_interval'],
+                once=options['once']
+            )
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS('Worker pool stopped.'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from analytics.jobs import sweep_deleted_files
+from analytics.models import FileDeletion
+
+
+class Command(BaseCommand):
+    help = 'Remove stored files of datasets deleted by the retention limit.'
+
+    def handle(self, *args, **options):
+        removed = 0
+        while FileDeletion.objects.exists():
+            removed += sweep_deleted_files()
+        self.stdout.write(self.style.SUCCESS(f'Removed {removed} stored uploads.'))
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:18
+
+from django.db import migrations, models
+
+
+def mark_finished_datasets_done(apps, schema_editor):
+    CSVDataset = apps.get_model('analytics', 'CSVDataset')
+    CSVDataset.objects.exclude(status='processing').update(phase='done')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_csvdataset_processing_started_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='csvdataset',
+            name='bytes_read',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='csvdataset',
+            name='bytes_total',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='csvdataset',
+            name='phase',
+            field=models.CharField(choices=[('queued', 'Queued'), ('reading', 'Reading'), ('computing', 'Computing statistics'), ('saving', 'Saving'), ('done', 'Done')], default='queued', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='csvdataset',
+            name='rows_processed',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(mark_finished_datasets_done, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_csvdataset_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='csvdataset',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+    ]
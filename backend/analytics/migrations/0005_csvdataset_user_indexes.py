@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_csvdataset_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='csvdataset',
+            index=models.Index(fields=['uploaded_by', 'uploaded_at'], name='dataset_user_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='csvdataset',
+            index=models.Index(fields=['uploaded_by', 'status', 'uploaded_at'], name='dataset_user_status_idx'),
+        ),
+    ]
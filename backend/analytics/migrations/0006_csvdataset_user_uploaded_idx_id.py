@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0005_csvdataset_user_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='csvdataset',
+            name='dataset_user_uploaded_idx',
+        ),
+        migrations.AddIndex(
+            model_name='csvdataset',
+            index=models.Index(fields=['uploaded_by', 'uploaded_at', 'id'], name='dataset_user_uploaded_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+PARAMETERS = ['flowrate', 'pressure', 'temperature']
+
+
+def backfill_type_statistics(apps, schema_editor):
+    CSVDataset = apps.get_model('analytics', 'CSVDataset')
+    TypeStatistic = apps.get_model('analytics', 'TypeStatistic')
+
+    completed = CSVDataset.objects.filter(status='completed').exclude(statistics=None)
+    for dataset in completed.iterator():
+        rows = []
+        for equipment_type, entry in dataset.statistics.get('by_type', {}).items():
+            values = {}
+            for parameter in PARAMETERS:
+                values[f'{parameter}_mean'] = entry[parameter]['avg']
+                values[f'{parameter}_min'] = entry[parameter]['min']
+                values[f'{parameter}_max'] = entry[parameter]['max']
+            rows.append(TypeStatistic(dataset=dataset, equipment_type=equipment_type, count=entry['count'], **values))
+        TypeStatistic.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0007_filedeletion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TypeStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('equipment_type', models.CharField(max_length=255)),
+                ('count', models.IntegerField()),
+                ('flowrate_mean', models.FloatField()),
+                ('flowrate_min', models.FloatField()),
+                ('flowrate_max', models.FloatField()),
+                ('pressure_mean', models.FloatField()),
+                ('pressure_min', models.FloatField()),
+                ('pressure_max', models.FloatField()),
+                ('temperature_mean', models.FloatField()),
+                ('temperature_min', models.FloatField()),
+                ('temperature_max', models.FloatField()),
+                ('dataset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='type_statistics', to='analytics.csvdataset')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['equipment_type', 'dataset'], name='typestat_type_dataset_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='typestatistic',
+            constraint=models.UniqueConstraint(fields=('dataset', 'equipment_type'), name='unique_dataset_type'),
+        ),
+        migrations.RunPython(backfill_type_statistics, migrations.RunPython.noop),
+    ]
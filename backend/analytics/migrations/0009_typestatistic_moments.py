@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0008_typestatistic'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='typestatistic',
+            name='flowrate_m2',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='typestatistic',
+            name='flowrate_sum',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='typestatistic',
+            name='pressure_m2',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='typestatistic',
+            name='pressure_sum',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='typestatistic',
+            name='temperature_m2',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='typestatistic',
+            name='temperature_sum',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0009_typestatistic_moments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='typestatistic',
+            name='sketch',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0010_typestatistic_sketch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='typestatistic',
+            name='histograms',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
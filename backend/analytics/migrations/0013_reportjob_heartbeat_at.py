@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:58
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def set_heartbeat(apps, schema_editor):
+    """Claimed jobs last showed signs of life when they were claimed."""
+    ReportJob = apps.get_model('analytics', 'ReportJob')
+    ReportJob.objects.filter(started_at__isnull=False).update(heartbeat_at=F('started_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0012_reportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(set_heartbeat, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,8 @@
-from django.db import models
+import os
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.conf import settings
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 
@@ -14,6 +15,13 @@ class CSVDataset(models.Model):
         ('completed', 'Completed'),
         ('failed', 'Failed'),
     ]
+    PHASE_CHOICES = [
+        ('queued', 'Queued'),
+        ('reading', 'Reading'),
+        ('computing', 'Computing statistics'),
+        ('saving', 'Saving'),
+        ('done', 'Done'),
+    ]
 
     file_name = models.CharField(max_length=255)
     file = models.FileField(upload_to='csv_uploads/')
@@ -24,15 +32,223 @@ class CSVDataset(models.Model):
     statistics = models.JSONField(null=True, blank=True)
     error_log = models.TextField(null=True, blank=True)
     processed_at = models.DateTimeField(null=True, blank=True)
+    processing_started_at = models.DateTimeField(null=True, blank=True)
+    phase = models.CharField(max_length=20, choices=PHASE_CHOICES, default='queued')
+    rows_processed = models.BigIntegerField(default=0)
+    bytes_read = models.BigIntegerField(default=0)
+    bytes_total = models.BigIntegerField(null=True, blank=True)
+    content_hash = models.CharField(max_length=64, null=True, blank=True, db_index=True)
 
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            # Per-user listing (keyset pages on uploaded_at, id) and the retention signal
+            models.Index(fields=['uploaded_by', 'uploaded_at', 'id'], name='dataset_user_uploaded_idx'),
+            # Latest completed dataset for a user
+            models.Index(fields=['uploaded_by', 'status', 'uploaded_at'], name='dataset_user_status_idx'),
+        ]
         verbose_name = 'CSV Dataset'
         verbose_name_plural = 'CSV Datasets'
 
     def __str__(self):
         return f"{self.file_name} - {self.uploaded_by.username}"
 
+    @property
+    def sidecar_path(self):
+        """Path of the columnar Parquet copy stored next to the uploaded CSV."""
+        return f"{self.file.path}.parquet"
+
+    def delete_files(self):
+        """
+        Delete the uploaded CSV and its Parquet sidecar from storage.
+        Files shared with a deduplicated upload are kept until the last
+        dataset referencing them is deleted.
+        """
+        if not self.file:
+            return
+        if self.content_hash and CSVDataset.objects.filter(
+            content_hash=self.content_hash,
+            file=self.file.name
+        ).exclude(pk=self.pk).exists():
+            return
+        if os.path.exists(self.sidecar_path):
+            os.remove(self.sidecar_path)
+        self.file.delete(save=False)
+
+
+class TypeStatistic(models.Model):
+    """
+    Per-type statistics of a dataset, one row per equipment type.
+
+    Mirrors `CSVDataset.statistics['by_type']` in columns so that questions
+    across datasets can be answered with SQL aggregates instead of decoding
+    every statistics blob.
+    """
+    PARAMETERS = ['flowrate', 'pressure', 'temperature']
+
+    dataset = models.ForeignKey(CSVDataset, on_delete=models.CASCADE, related_name='type_statistics')
+    equipment_type = models.CharField(max_length=255)
+    count = models.IntegerField()
+    flowrate_mean = models.FloatField()
+    flowrate_min = models.FloatField()
+    flowrate_max = models.FloatField()
+    pressure_mean = models.FloatField()
+    pressure_min = models.FloatField()
+    pressure_max = models.FloatField()
+    temperature_mean = models.FloatField()
+    temperature_min = models.FloatField()
+    temperature_max = models.FloatField()
+    # Exact moments for merging (null for statistics computed before they were stored)
+    flowrate_sum = models.FloatField(null=True, blank=True)
+    flowrate_m2 = models.FloatField(null=True, blank=True)
+    pressure_sum = models.FloatField(null=True, blank=True)
+    pressure_m2 = models.FloatField(null=True, blank=True)
+    temperature_sum = models.FloatField(null=True, blank=True)
+    temperature_m2 = models.FloatField(null=True, blank=True)
+    # Serialized quantile sketches, one per parameter (see analytics.sketches)
+    sketch = models.BinaryField(null=True, blank=True)
+    # Fixed-bin histograms per parameter: {'flowrate': {'range': [low, high], 'counts': [...]}, ...}
+    histograms = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dataset', 'equipment_type'], name='unique_dataset_type'),
+        ]
+        indexes = [
+            models.Index(fields=['equipment_type', 'dataset'], name='typestat_type_dataset_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.equipment_type} ({self.dataset_id})"
+
+    @classmethod
+    def from_statistics(cls, dataset, statistics, sketches=None, histograms=None):
+        """
+        Build unsaved rows from a statistics dict.
+
+        Args:
+            dataset: CSVDataset the statistics belong to
+            statistics: Dict with a 'by_type' mapping as stored on the dataset
+            sketches: Optional {type: serialized quantile sketches} mapping
+            histograms: Optional {type: histograms} mapping
+
+        Returns:
+            list: TypeStatistic instances, ready for bulk_create
+        """
+        sketches = sketches or {}
+        histograms = histograms or {}
+        rows = []
+        for equipment_type, entry in (statistics or {}).get('by_type', {}).items():
+            values = {}
+            for parameter in cls.PARAMETERS:
+                values[f'{parameter}_mean'] = entry[parameter]['avg']
+                values[f'{parameter}_min'] = entry[parameter]['min']
+                values[f'{parameter}_max'] = entry[parameter]['max']
+                values[f'{parameter}_sum'] = entry[parameter].get('sum')
+                values[f'{parameter}_m2'] = entry[parameter].get('m2')
+            rows.append(cls(
+                dataset=dataset,
+                equipment_type=equipment_type,
+                count=entry['count'],
+                sketch=sketches.get(equipment_type),
+                histograms=histograms.get(equipment_type),
+                **values
+            ))
+        return rows
+
+
+class FileDeletion(models.Model):
+    """
+    Stored upload queued for removal from storage.
+
+    Retention deletes dataset rows in bulk and records their files here;
+    the background sweeper unlinks the CSV and its sidecar later, so the
+    upload request never waits on filesystem deletes.
+    """
+    file_name = models.CharField(max_length=255)
+    queued_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['queued_at']
+
+    def __str__(self):
+        return self.file_name
+
+
+class ReportJob(models.Model):
+    """
+    PDF report generation queued for the background worker pool.
+
+    Works like the upload queue: a job with status 'processing' and no
+    heartbeat_at is waiting for a worker (see analytics.jobs). The worker
+    refreshes heartbeat_at while it renders. The finished PDF is stored in
+    the report cache under `digest`.
+    """
+    STATUS_CHOICES = CSVDataset.STATUS_CHOICES
+
+    dataset = models.ForeignKey(CSVDataset, on_delete=models.CASCADE, related_name='report_jobs')
+    chart_format = models.CharField(max_length=10, default='raster')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='processing')
+    digest = models.CharField(max_length=64)
+    error_log = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            # Queue scan for unclaimed and stale jobs
+            models.Index(fields=['status', 'created_at'], name='reportjob_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Report {self.pk} for dataset {self.dataset_id} ({self.status})"
+
+
+def enforce_dataset_limit(user_id):
+    """
+    Delete a user's datasets beyond the newest MAX_DATASETS_PER_USER.
+
+    Runs a fixed number of queries however long the user's history is:
+    an index-only scan for the expired ids, a primary key lookup of their
+    files, one insert queueing the files for the sweeper and one DELETE
+    each for their TypeStatistic rows, their ReportJobs and the datasets.
+    The deletes bypass Django's cascade collector, which would first load
+    every child row; no delete signals are sent. Datasets still being
+    processed are left for the worker, which calls this again once it has
+    finished them.
+
+    Args:
+        user_id: ID of the user whose datasets are trimmed
+    """
+    max_datasets = getattr(settings, 'MAX_DATASETS_PER_USER', 5)
+
+    # Everything past the newest max_datasets uploads (newest first)
+    expired_ids = list(
+        CSVDataset.objects.filter(uploaded_by_id=user_id)
+        .order_by('-uploaded_at', '-id')
+        .values_list('pk', flat=True)[max_datasets:]
+    )
+    if not expired_ids:
+        return
+
+    expired = list(
+        CSVDataset.objects.filter(pk__in=expired_ids).exclude(status='processing').order_by().values_list('pk', 'file')
+    )
+    if not expired:
+        return
+    pks = [pk for pk, _ in expired]
+    files = [file_name for _, file_name in expired if file_name]
+
+    with transaction.atomic():
+        FileDeletion.objects.bulk_create([FileDeletion(file_name=file_name) for file_name in files])
+        # Children first, as the cascade collector would
+        TypeStatistic.objects.filter(dataset_id__in=pks)._raw_delete(TypeStatistic.objects.db)
+        ReportJob.objects.filter(dataset_id__in=pks)._raw_delete(ReportJob.objects.db)
+        CSVDataset.objects.filter(pk__in=pks)._raw_delete(CSVDataset.objects.db)
+
 
 @receiver(post_save, sender=CSVDataset)
 def manage_user_dataset_limit(sender, instance, created, **kwargs):
@@ -41,15 +257,4 @@ def manage_user_dataset_limit(sender, instance, created, **kwargs):
     Keep only the last MAX_DATASETS_PER_USER datasets per user.
     """
     if created:
-        user = instance.uploaded_by
-        max_datasets = getattr(settings, 'MAX_DATASETS_PER_USER', 5)
-        
-        # Get all datasets for this user, ordered by upload date (newest first)
-        user_datasets = CSVDataset.objects.filter(uploaded_by=user).order_by('-uploaded_at')
-        
-        # If user has more than allowed, delete the oldest ones
-        if user_datasets.count() > max_datasets:
-            datasets_to_delete = user_datasets[max_datasets:]
-            for dataset in datasets_to_delete:
-                dataset.file.delete(save=False)  # Delete the file from storage
-                dataset.delete()  # Delete the database record
+        enforce_dataset_limit(instance.uploaded_by_id)
@@ -0,0 +1,82 @@
+"""
+Keyset (cursor) pagination for dataset lists.
+
+Pages are ordered newest first by (uploaded_at, id). The cursor encodes the
+position of the last row on a page, so fetching the next page is an index
+range scan that costs the same no matter how deep into the history it is.
+"""
+import base64
+import binascii
+from datetime import datetime
+from django.db.models import Q
+from django.utils import timezone
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor query parameter cannot be decoded."""
+
+
+def encode_cursor(dataset):
+    """
+    Build an opaque cursor pointing just after `dataset`.
+
+    Args:
+        dataset: Last CSVDataset on the current page
+
+    Returns:
+        str: URL-safe cursor string
+    """
+    position = f"{dataset.uploaded_at.isoformat()}|{dataset.pk}"
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Returns:
+        tuple: (uploaded_at, pk)
+
+    Raises:
+        InvalidCursor: If the cursor is malformed, or carries a timestamp
+            without a UTC offset (encode_cursor always writes one)
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        uploaded_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        uploaded_at, pk = datetime.fromisoformat(uploaded_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor('Invalid cursor.')
+    if timezone.is_naive(uploaded_at):
+        raise InvalidCursor('Invalid cursor.')
+    return uploaded_at, pk
+
+
+def paginate_by_upload(queryset, cursor=None, limit=50):
+    """
+    Return one page of a queryset ordered newest first.
+
+    Args:
+        queryset: CSVDataset queryset, already filtered
+        cursor: Optional cursor from a previous page
+        limit: Maximum number of rows on the page
+
+    Returns:
+        tuple: (list of datasets, cursor for the next page or None)
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    queryset = queryset.order_by('-uploaded_at', '-id')
+
+    if cursor:
+        uploaded_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(uploaded_at__lt=uploaded_at) | Q(uploaded_at=uploaded_at, id__lt=pk)
+        )
+
+    # Fetch one extra row to learn whether another page exists
+    rows = list(queryset[:limit + 1])
+    if len(rows) > limit:
+        return rows[:limit], encode_cursor(rows[limit - 1])
+    return rows, None
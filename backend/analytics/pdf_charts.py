@@ -1,13 +1,64 @@
 """
 Chart generation utilities for PDF reports.
+
+Charts are independent of each other, so render_report_charts can draw
+them concurrently in a pool of worker processes (pyplot is not
+thread-safe). The pool is created on first use and reused by later
+reports, so only the first report pays for starting the workers.
+
+Rendered PNGs are memoized in a process-wide LRU keyed by chart kind, a
+digest of the statistics the charts read and the render DPI (each kind
+has a fixed size). Datasets with the same statistics, such as duplicate
+uploads, and reports rebuilt after a template change reuse the renders.
+The charts of a report look their PNG up in the LRU when they are drawn
+instead of keeping a reference, so reports never pin cached renders.
 """
+import json
+import hashlib
+import logging
+import multiprocessing
+import threading
+from collections import OrderedDict
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import matplotlib
 matplotlib.use('Agg')  # Use non-GUI backend
 import matplotlib.pyplot as plt
 import numpy as np
 from io import BytesIO
-from reportlab.platypus import Image
+from reportlab.platypus import Flowable
 from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CHART_DPI = 150
+
+# Statistics keys the chart functions read; only these are hashed and sent to workers
+CHART_STATISTICS_KEYS = ('by_type',)
+
+_chart_cache = None
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def _distribution_sample(entry, size=101):
+    """
+    Evenly spaced values that follow a parameter's stored percentiles.
+    
+    Returns None for statistics computed before percentiles were stored.
+    """
+    quantiles = entry.get('quantiles')
+    if not quantiles:
+        return None
+    points = sorted((int(key[1:]) / 100, value) for key, value in quantiles.items())
+    fractions = [0.0] + [fraction for fraction, _ in points] + [1.0]
+    values = [entry['min']] + [value for _, value in points] + [entry['max']]
+    return np.interp(np.linspace(0, 1, size), fractions, values)
 
 
 def create_bar_chart(statistics):
@@ -61,12 +112,11 @@ def create_bar_chart(statistics):
         
         # Save to buffer
         img_buffer = BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
+        plt.savefig(img_buffer, format='png', dpi=CHART_DPI, bbox_inches='tight')
         plt.close()
         
-        # Create ReportLab Image
-        img = Image(img_buffer, width=5*inch, height=3.3*inch)
+        # Create ReportLab flowable
+        img = ChartImage(img_buffer.getvalue(), width=5*inch, height=3.3*inch)
         return img
         
     except Exception as e:
@@ -124,12 +174,11 @@ def create_pie_chart(statistics):
         
         # Save to buffer
         img_buffer = BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
+        plt.savefig(img_buffer, format='png', dpi=CHART_DPI, bbox_inches='tight')
         plt.close()
         
-        # Create ReportLab Image
-        img = Image(img_buffer, width=5*inch, height=3.3*inch)
+        # Create ReportLab flowable
+        img = ChartImage(img_buffer.getvalue(), width=5*inch, height=3.3*inch)
         return img
         
     except Exception as e:
@@ -205,12 +254,11 @@ def create_comparison_chart(statistics):
         
         # Save to buffer
         img_buffer = BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
+        plt.savefig(img_buffer, format='png', dpi=CHART_DPI, bbox_inches='tight')
         plt.close()
         
-        # Create ReportLab Image
-        img = Image(img_buffer, width=6.5*inch, height=2.5*inch)
+        # Create ReportLab flowable
+        img = ChartImage(img_buffer.getvalue(), width=6.5*inch, height=2.5*inch)
         return img
         
     except Exception as e:
@@ -228,24 +276,25 @@ def create_box_plot(statistics):
         
         types = list(by_type.keys())
         
-        # Prepare data for box plots
-        flowrate_data = [[by_type[t]['flowrate']['min'], 
-                         by_type[t]['flowrate']['avg'], 
-                         by_type[t]['flowrate']['max']] for t in types]
+        # Prepare data for box plots from the stored percentiles, or min/avg/max
+        def box_data(parameter):
+            data = []
+            for t in types:
+                entry = by_type[t][parameter]
+                sample = _distribution_sample(entry)
+                data.append(sample if sample is not None else [entry['min'], entry['avg'], entry['max']])
+            return data
         
-        pressure_data = [[by_type[t]['pressure']['min'], 
-                         by_type[t]['pressure']['avg'], 
-                         by_type[t]['pressure']['max']] for t in types]
-        
-        temp_data = [[by_type[t]['temperature']['min'], 
-                     by_type[t]['temperature']['avg'], 
-                     by_type[t]['temperature']['max']] for t in types]
+        flowrate_data = box_data('flowrate')
+        pressure_data = box_data('pressure')
+        temp_data = box_data('temperature')
         
         # Create figure with 3 subplots
         fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(8, 3.5))
         
         # Flowrate box plot
-        bp1 = ax1.boxplot(flowrate_data, labels=types, patch_artist=True)
+        bp1 = ax1.boxplot(flowrate_data, patch_artist=True)
+        ax1.set_xticks(range(1, len(types) + 1), types)
         for patch in bp1['boxes']:
             patch.set_facecolor('#0EA5E9')
             patch.set_alpha(0.6)
@@ -255,7 +304,8 @@ def create_box_plot(statistics):
         ax1.grid(axis='y', alpha=0.3)
         
         # Pressure box plot
-        bp2 = ax2.boxplot(pressure_data, labels=types, patch_artist=True)
+        bp2 = ax2.boxplot(pressure_data, patch_artist=True)
+        ax2.set_xticks(range(1, len(types) + 1), types)
         for patch in bp2['boxes']:
             patch.set_facecolor('#FBBF24')
             patch.set_alpha(0.6)
@@ -265,7 +315,8 @@ def create_box_plot(statistics):
         ax2.grid(axis='y', alpha=0.3)
         
         # Temperature box plot
-        bp3 = ax3.boxplot(temp_data, labels=types, patch_artist=True)
+        bp3 = ax3.boxplot(temp_data, patch_artist=True)
+        ax3.set_xticks(range(1, len(types) + 1), types)
         for patch in bp3['boxes']:
             patch.set_facecolor('#FF6B6B')
             patch.set_alpha(0.6)
@@ -279,12 +330,11 @@ def create_box_plot(statistics):
         
         # Save to buffer
         img_buffer = BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
+        plt.savefig(img_buffer, format='png', dpi=CHART_DPI, bbox_inches='tight')
         plt.close()
         
-        # Create ReportLab Image
-        img = Image(img_buffer, width=6.5*inch, height=2.8*inch)
+        # Create ReportLab flowable
+        img = ChartImage(img_buffer.getvalue(), width=6.5*inch, height=2.8*inch)
         return img
         
     except Exception as e:
@@ -346,12 +396,11 @@ def create_scatter_plot(statistics):
         
         # Save to buffer
         img_buffer = BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
+        plt.savefig(img_buffer, format='png', dpi=CHART_DPI, bbox_inches='tight')
         plt.close()
         
-        # Create ReportLab Image
-        img = Image(img_buffer, width=6.5*inch, height=2.5*inch)
+        # Create ReportLab flowable
+        img = ChartImage(img_buffer.getvalue(), width=6.5*inch, height=2.5*inch)
         return img
         
     except Exception as e:
@@ -409,12 +458,11 @@ def create_heatmap(statistics):
         
         # Save to buffer
         img_buffer = BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
+        plt.savefig(img_buffer, format='png', dpi=CHART_DPI, bbox_inches='tight')
         plt.close()
         
-        # Create ReportLab Image
-        img = Image(img_buffer, width=4.5*inch, height=3.5*inch)
+        # Create ReportLab flowable
+        img = ChartImage(img_buffer.getvalue(), width=4.5*inch, height=3.5*inch)
         return img
         
     except Exception as e:
@@ -479,12 +527,11 @@ def create_radar_chart(statistics):
         
         # Save to buffer
         img_buffer = BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
+        plt.savefig(img_buffer, format='png', dpi=CHART_DPI, bbox_inches='tight')
         plt.close()
         
-        # Create ReportLab Image
-        img = Image(img_buffer, width=4.5*inch, height=4.5*inch)
+        # Create ReportLab flowable
+        img = ChartImage(img_buffer.getvalue(), width=4.5*inch, height=4.5*inch)
         return img
         
     except Exception as e:
@@ -528,11 +575,10 @@ def create_horizontal_ranking_chart(statistics):
         
         # Save to buffer
         img_buffer = BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
+        plt.savefig(img_buffer, format='png', dpi=CHART_DPI, bbox_inches='tight')
         plt.close()
         
-        img = Image(img_buffer, width=5*inch, height=3.5*inch)
+        img = ChartImage(img_buffer.getvalue(), width=5*inch, height=3.5*inch)
         return img
         
     except Exception as e:
@@ -580,11 +626,10 @@ def create_line_chart(statistics):
         
         # Save to buffer
         img_buffer = BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
+        plt.savefig(img_buffer, format='png', dpi=CHART_DPI, bbox_inches='tight')
         plt.close()
         
-        img = Image(img_buffer, width=5*inch, height=3.3*inch)
+        img = ChartImage(img_buffer.getvalue(), width=5*inch, height=3.3*inch)
         return img
         
     except Exception as e:
@@ -635,11 +680,10 @@ def create_area_chart(statistics):
         
         # Save to buffer
         img_buffer = BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
+        plt.savefig(img_buffer, format='png', dpi=CHART_DPI, bbox_inches='tight')
         plt.close()
         
-        img = Image(img_buffer, width=5*inch, height=3.3*inch)
+        img = ChartImage(img_buffer.getvalue(), width=5*inch, height=3.3*inch)
         return img
         
     except Exception as e:
@@ -657,27 +701,21 @@ def create_violin_plot(statistics):
         
         types = list(by_type.keys())
         
-        # Create synthetic distribution data from min/avg/max
-        flowrate_data = []
-        pressure_data = []
-        temp_data = []
-        
-        for t in types:
-            # Generate distribution approximation
-            f_min, f_avg, f_max = (by_type[t]['flowrate']['min'], 
-                                   by_type[t]['flowrate']['avg'], 
-                                   by_type[t]['flowrate']['max'])
-            flowrate_data.append(np.random.normal(f_avg, (f_max - f_min) / 4, 50))
-            
-            p_min, p_avg, p_max = (by_type[t]['pressure']['min'], 
-                                   by_type[t]['pressure']['avg'], 
-                                   by_type[t]['pressure']['max'])
-            pressure_data.append(np.random.normal(p_avg, (p_max - p_min) / 4, 50))
-            
-            t_min, t_avg, t_max = (by_type[t]['temperature']['min'], 
-                                   by_type[t]['temperature']['avg'], 
-                                   by_type[t]['temperature']['max'])
-            temp_data.append(np.random.normal(t_avg, (t_max - t_min) / 4, 50))
+        # Distribution data from the stored percentiles; statistics without
+        # percentiles fall back to a normal approximation from min/avg/max
+        def violin_data(parameter):
+            data = []
+            for t in types:
+                entry = by_type[t][parameter]
+                sample = _distribution_sample(entry)
+                if sample is None:
+                    sample = np.random.normal(entry['avg'], (entry['max'] - entry['min']) / 4, 50)
+                data.append(sample)
+            return data
+        
+        flowrate_data = violin_data('flowrate')
+        pressure_data = violin_data('pressure')
+        temp_data = violin_data('temperature')
         
         # Create figure with 3 subplots
         fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(8, 3.5))
@@ -723,13 +761,211 @@ def create_violin_plot(statistics):
         
         # Save to buffer
         img_buffer = BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
+        plt.savefig(img_buffer, format='png', dpi=CHART_DPI, bbox_inches='tight')
         plt.close()
         
-        img = Image(img_buffer, width=6.5*inch, height=2.8*inch)
+        img = ChartImage(img_buffer.getvalue(), width=6.5*inch, height=2.8*inch)
         return img
         
     except Exception as e:
         print(f"Error creating violin plot: {e}")
         return None
+
+
+# Charts included in the PDF report, by name
+REPORT_CHARTS = {
+    'bar': create_bar_chart,
+    'pie': create_pie_chart,
+    'line': create_line_chart,
+    'ranking': create_horizontal_ranking_chart,
+    'comparison': create_comparison_chart,
+    'violin': create_violin_plot,
+    'scatter': create_scatter_plot,
+    'area': create_area_chart,
+    'heatmap': create_heatmap,
+    'radar': create_radar_chart,
+}
+
+
+def render_chart_png(name, statistics):
+    """
+    Render one report chart to PNG bytes. Runs inside pool workers, so it
+    returns plain data instead of a ChartImage.
+    
+    Returns:
+        tuple or None: (png bytes, width, height) in points, or None if
+            the chart could not be drawn
+    """
+    image = REPORT_CHARTS[name](statistics)
+    if image is None:
+        return None
+    return image.png, image.drawWidth, image.drawHeight
+
+
+def render_report_charts(statistics, workers=0, names=None):
+    """
+    Render charts from REPORT_CHARTS, reusing memoized renders.
+    
+    Args:
+        statistics: Statistics dict of the dataset
+        workers: Worker processes to render in; 0 or 1 renders in this process
+        names: Optional chart names to render (defaults to all report charts)
+        
+    Returns:
+        dict: {name: ChartImage, or None if the chart could not be drawn}
+    """
+    names = list(names or REPORT_CHARTS)
+    chart_statistics = {key: statistics.get(key) for key in CHART_STATISTICS_KEYS if key in statistics}
+    digest = hashlib.sha256(
+        json.dumps(chart_statistics, sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()
+    cache = _get_chart_cache()
+    
+    results = {name: cache.get((name, digest, CHART_DPI)) for name in names}
+    missing = [name for name in names if results[name] is None]
+    
+    rendered = None
+    if workers > 1 and len(missing) > 1:
+        try:
+            rendered = list(_get_executor(workers).map(
+                render_chart_png, missing, [chart_statistics] * len(missing)
+            ))
+        except (BrokenProcessPool, OSError) as e:
+            # A worker died or processes cannot be started; render here instead
+            logger.warning(f"Chart pool unavailable, rendering in process: {e}")
+            _reset_executor()
+    
+    if rendered is None:
+        rendered = [render_chart_png(name, chart_statistics) for name in missing]
+    
+    for name, result in zip(missing, rendered):
+        results[name] = result
+        if result is not None:
+            cache.put((name, digest, CHART_DPI), result)
+    
+    charts = {}
+    for name in names:
+        if results[name] is None:
+            charts[name] = None
+            continue
+        png, width, height = results[name]
+        if cache.get((name, digest, CHART_DPI)) is results[name]:
+            # Fetched again when drawn, so the report never pins the cached bytes
+            charts[name] = ChartImage(None, width, height, source=partial(_cached_chart_png, name, digest, chart_statistics))
+        else:
+            # Too large for the cache, or already evicted: the chart owns its bytes
+            charts[name] = ChartImage(png, width, height)
+    return charts
+
+
+def _cached_chart_png(name, digest, chart_statistics):
+    """PNG of a chart from the chart cache, rendered again if it was evicted."""
+    cache = _get_chart_cache()
+    result = cache.get((name, digest, CHART_DPI))
+    if result is None:
+        result = render_chart_png(name, chart_statistics)
+        if result is None:
+            return None
+        cache.put((name, digest, CHART_DPI), result)
+    return result[0]
+
+
+class ChartImage(Flowable):
+    """
+    Centered PNG chart of a fixed size in points.
+    
+    The chart either holds its PNG bytes or a `source` callable returning
+    them, such as a chart cache lookup. The PNG is decoded only while the
+    chart is drawn, and the chart drops its bytes afterwards, so charts
+    already placed on a page hold neither the PNG nor its pixels while the
+    rest of the report is laid out.
+    """
+    
+    def __init__(self, png, width, height, source=None):
+        Flowable.__init__(self)
+        self.png = png
+        self.source = source
+        self.drawWidth = width
+        self.drawHeight = height
+        self.hAlign = 'CENTER'
+    
+    def wrap(self, availWidth, availHeight):
+        return self.drawWidth, self.drawHeight
+    
+    def draw(self):
+        png, self.png = self.png, None
+        if png is None and self.source is not None:
+            png = self.source()
+        if png is not None:
+            self.canv.drawImage(ImageReader(BytesIO(png)), 0, 0, self.drawWidth, self.drawHeight, mask='auto')
+
+
+class ChartCache:
+    """
+    Thread-safe LRU of rendered charts, bounded by the total PNG size.
+    
+    Values are (png bytes, width, height) tuples as returned by
+    render_chart_png.
+    """
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Return the cached value for key (marking it recently used), or None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+    
+    def put(self, key, value):
+        """Store a value, evicting least recently used charts beyond max_bytes."""
+        nbytes = len(value[0])
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous[0])
+            self._entries[key] = value
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted[0])
+
+
+def _get_chart_cache():
+    """Return the process-wide chart cache, sized by PDF_CHART_CACHE_BYTES."""
+    global _chart_cache
+    with _executor_lock:
+        if _chart_cache is None:
+            _chart_cache = ChartCache(getattr(settings, 'PDF_CHART_CACHE_BYTES', 64 * 1024 * 1024))
+        return _chart_cache
+
+
+def _get_executor(workers):
+    """Return the shared chart pool, (re)creating it for a new worker count."""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            _executor_workers = workers
+        return _executor
+
+
+def _reset_executor():
+    """Drop a broken pool so that the next report starts a fresh one."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = None
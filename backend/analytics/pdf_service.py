@@ -4,37 +4,56 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
+import os
 from io import BytesIO
 from datetime import datetime
-from .pdf_charts import create_bar_chart, create_pie_chart
+from django.conf import settings
+from .pdf_charts import render_report_charts
+from .pdf_vector_charts import render_vector_charts
 
 
 class PDFReportService:
     """
     Service to generate PDF reports for CSV dataset statistics.
     """
+    # Bump whenever the report layout changes so cached reports are rebuilt
+    TEMPLATE_VERSION = 1
+    # 'raster' embeds matplotlib PNGs, 'vector' draws the charts with reportlab.graphics
+    CHART_FORMATS = ('raster', 'vector')
     
-    def __init__(self, dataset):
+    def __init__(self, dataset, chart_format=None, chart_processes=None):
         """
         Initialize with a CSVDataset instance.
         
         Args:
             dataset: CSVDataset model instance
+            chart_format: One of CHART_FORMATS (defaults to PDF_CHART_FORMAT)
+            chart_processes: Processes rendering raster charts (defaults to
+                PDF_CHART_PROCESSES capped at the CPU count; 1 renders in this process)
         """
         self.dataset = dataset
+        self.chart_processes = chart_processes
+        self.chart_format = chart_format or getattr(settings, 'PDF_CHART_FORMAT', 'raster')
+        if self.chart_format not in self.CHART_FORMATS:
+            raise ValueError(f"Unknown chart format: {self.chart_format}")
         self.buffer = BytesIO()
         self.styles = getSampleStyleSheet()
         
-    def generate(self):
+    def generate(self, output=None):
         """
-        Generate PDF report and return bytes.
+        Generate PDF report.
+        
+        Args:
+            output: Optional binary file object to write the PDF to instead
+                of returning it, so the finished document is never copied
+                into memory
         
         Returns:
-            BytesIO: PDF file buffer
+            bytes: PDF contents, or None when written to output
         """
         # Create PDF document
         doc = SimpleDocTemplate(
-            self.buffer,
+            output if output is not None else self.buffer,
             pagesize=letter,
             rightMargin=72,
             leftMargin=72,
@@ -64,6 +83,13 @@ class PDFReportService:
         
         # PAGE 2: Summary Statistics
         if self.dataset.statistics:
+            # Render all charts up front, concurrently when workers are configured
+            if self.chart_format == 'vector':
+                charts = render_vector_charts(self.dataset.statistics)
+            else:
+                workers = self.chart_processes or min(getattr(settings, 'PDF_CHART_PROCESSES', 4), os.cpu_count() or 1)
+                charts = render_report_charts(self.dataset.statistics, workers)
+            
             elements.append(Paragraph("Summary Statistics", heading_style))
             elements.append(Spacer(1, 12))
             elements.append(self._create_overall_stats())
@@ -74,13 +100,13 @@ class PDFReportService:
             elements.append(Spacer(1, 12))
             
             # Stacked bar chart - composition
-            bar_chart = create_bar_chart(self.dataset.statistics)
+            bar_chart = charts['bar']
             if bar_chart:
                 elements.append(bar_chart)
                 elements.append(Spacer(1, 20))
             
             # Donut chart - ranked distribution
-            pie_chart = create_pie_chart(self.dataset.statistics)
+            pie_chart = charts['pie']
             if pie_chart:
                 elements.append(pie_chart)
             
@@ -91,14 +117,13 @@ class PDFReportService:
             elements.append(Spacer(1, 12))
             
             # Line chart - trends
-            from .pdf_charts import create_line_chart, create_horizontal_ranking_chart
-            line_chart = create_line_chart(self.dataset.statistics)
+            line_chart = charts['line']
             if line_chart:
                 elements.append(line_chart)
                 elements.append(Spacer(1, 20))
             
             # Horizontal ranking chart
-            ranking_chart = create_horizontal_ranking_chart(self.dataset.statistics)
+            ranking_chart = charts['ranking']
             if ranking_chart:
                 elements.append(ranking_chart)
             
@@ -109,14 +134,13 @@ class PDFReportService:
             elements.append(Spacer(1, 12))
             
             # Comparison chart with error bars
-            from .pdf_charts import create_comparison_chart, create_violin_plot
-            comparison_chart = create_comparison_chart(self.dataset.statistics)
+            comparison_chart = charts['comparison']
             if comparison_chart:
                 elements.append(comparison_chart)
                 elements.append(Spacer(1, 20))
             
             # Violin plot - distribution shapes
-            violin_plot = create_violin_plot(self.dataset.statistics)
+            violin_plot = charts['violin']
             if violin_plot:
                 elements.append(violin_plot)
             
@@ -127,14 +151,13 @@ class PDFReportService:
             elements.append(Spacer(1, 12))
             
             # Scatter plot - correlations
-            from .pdf_charts import create_scatter_plot, create_area_chart
-            scatter_plot = create_scatter_plot(self.dataset.statistics)
+            scatter_plot = charts['scatter']
             if scatter_plot:
                 elements.append(scatter_plot)
                 elements.append(Spacer(1, 20))
             
             # Area chart - cumulative
-            area_chart = create_area_chart(self.dataset.statistics)
+            area_chart = charts['area']
             if area_chart:
                 elements.append(area_chart)
             
@@ -145,14 +168,13 @@ class PDFReportService:
             elements.append(Spacer(1, 12))
             
             # Heatmap - intensity matrix
-            from .pdf_charts import create_heatmap, create_radar_chart
-            heatmap = create_heatmap(self.dataset.statistics)
+            heatmap = charts['heatmap']
             if heatmap:
                 elements.append(heatmap)
                 elements.append(Spacer(1, 20))
             
             # Radar chart - performance comparison
-            radar_chart = create_radar_chart(self.dataset.statistics)
+            radar_chart = charts['radar']
             if radar_chart:
                 elements.append(radar_chart)
             
@@ -173,6 +195,8 @@ class PDFReportService:
         
         # Build PDF
         doc.build(elements)
+        if output is not None:
+            return None
         
         # Get PDF bytes
         pdf_bytes = self.buffer.getvalue()
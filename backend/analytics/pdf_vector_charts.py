@@ -0,0 +1,570 @@
+"""
+Vector versions of the PDF report charts, drawn with reportlab.graphics.
+
+The charts mirror those in pdf_charts but are emitted as PDF drawing
+operators instead of rasterized matplotlib PNGs, so they take milliseconds
+to build, add a few kilobytes to the report and stay sharp at any zoom.
+Reports select them with PDFReportService(dataset, chart_format='vector').
+
+Each create_* function returns a Drawing (a flowable, like the raster
+charts' Image) sized like its raster counterpart, or None when the
+statistics have no per-type data.
+"""
+import math
+import logging
+import numpy as np
+from reportlab.lib import colors
+from reportlab.graphics.shapes import Circle, Drawing, Group, Line, Polygon, PolyLine, Rect, String, Wedge
+from .pdf_charts import _distribution_sample
+
+logger = logging.getLogger(__name__)
+
+FONT = 'Helvetica'
+BOLD_FONT = 'Helvetica-Bold'
+
+PARAMETERS = ['flowrate', 'pressure', 'temperature']
+PARAMETER_COLORS = [colors.HexColor('#0EA5E9'), colors.HexColor('#FBBF24'), colors.HexColor('#FF6B6B')]
+TYPE_COLORS = [
+    colors.HexColor(color) for color in (
+        '#FF6B1A', '#D94452', '#7B2C9E', '#0EA5E9', '#10B981',
+        '#F59E0B', '#EF4444', '#8B5CF6', '#06B6D4', '#84CC16'
+    )
+]
+GRID_COLOR = colors.HexColor('#DDDDDD')
+# Color ramps approximating matplotlib's YlOrRd (heatmap) and viridis 0.3-0.9 (ranking)
+HEAT_COLORS = [colors.HexColor('#FFFFCC'), colors.HexColor('#FD8D3C'), colors.HexColor('#800026')]
+RANK_COLORS = [colors.HexColor('#30678D'), colors.HexColor('#22A884'), colors.HexColor('#BDDF26')]
+RADAR_COLORS = PARAMETER_COLORS + [colors.HexColor('#10B981'), colors.HexColor('#8B5CF6'), colors.HexColor('#F59E0B')]
+
+
+class _Axes:
+    """
+    Rectangular plot area mapping data coordinates onto a drawing.
+
+    With categories, x positions are category indexes (0, 1, ...) centred in
+    equal slots, like matplotlib bar positions.
+    """
+
+    def __init__(self, drawing, x, y, width, height, ylim, xlim=None, categories=None):
+        self.drawing = drawing
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.ylim = ylim
+        self.categories = categories
+        self.xlim = xlim if categories is None else (-0.5, len(categories) - 0.5)
+
+    @property
+    def slot(self):
+        """Width of one category slot in points."""
+        return self.width / len(self.categories)
+
+    def px(self, value):
+        low, high = self.xlim
+        return self.x + (value - low) / (high - low) * self.width
+
+    def py(self, value):
+        low, high = self.ylim
+        return self.y + (value - low) / (high - low) * self.height
+
+    def frame(self, yticks, xticks=None, label_size=7, grid_x=False):
+        """Draw gridlines, tick labels and the border of the plot area."""
+        for tick in yticks:
+            y = self.py(tick)
+            self.drawing.add(Line(self.x, y, self.x + self.width, y, strokeColor=GRID_COLOR, strokeWidth=0.5))
+            self.drawing.add(String(self.x - 3, y - label_size / 3, _format(tick),
+                                    fontName=FONT, fontSize=label_size, textAnchor='end'))
+        if self.categories is not None:
+            for i, name in enumerate(self.categories):
+                _slanted_label(self.drawing, self.px(i), self.y - label_size - 1, name, label_size)
+        for tick in xticks or []:
+            x = self.px(tick)
+            if grid_x:
+                self.drawing.add(Line(x, self.y, x, self.y + self.height, strokeColor=GRID_COLOR, strokeWidth=0.5))
+            self.drawing.add(String(x, self.y - label_size - 2, _format(tick),
+                                    fontName=FONT, fontSize=label_size, textAnchor='middle'))
+        self.drawing.add(Rect(self.x, self.y, self.width, self.height,
+                              fillColor=None, strokeColor=colors.grey, strokeWidth=0.5))
+
+
+def create_bar_chart(statistics):
+    """Stacked bars of each type's parameter composition (pressure scaled by 20)."""
+    by_type = statistics.get('by_type') or {}
+    if not by_type:
+        return None
+
+    types = list(by_type)
+    drawing = _drawing(360, 238, 'Parameter Composition by Equipment')
+    axes = _Axes(drawing, 48, 62, 220, 150, (0, 100), categories=types)
+    axes.frame(range(0, 101, 20))
+
+    width = axes.slot * 0.6
+    for i, name in enumerate(types):
+        values = [by_type[name]['flowrate']['avg'], by_type[name]['pressure']['avg'] * 20,
+                  by_type[name]['temperature']['avg']]
+        total = sum(values) or 1
+        bottom = 0
+        for value, color in zip(values, PARAMETER_COLORS):
+            share = value / total * 100
+            drawing.add(Rect(axes.px(i) - width / 2, axes.py(bottom), width, axes.py(bottom + share) - axes.py(bottom),
+                             fillColor=color, strokeColor=None))
+            bottom += share
+
+    _axis_titles(drawing, axes, 'Equipment Type', 'Parameter Composition (%)')
+    _legend(drawing, 276, 205, zip(['Flowrate', 'Pressure (scaled)', 'Temperature'], PARAMETER_COLORS))
+    return drawing
+
+
+def create_pie_chart(statistics):
+    """Donut of equipment counts per type, largest first."""
+    by_type = statistics.get('by_type') or {}
+    if not by_type:
+        return None
+
+    ranked = sorted(by_type.items(), key=lambda item: item[1]['count'], reverse=True)
+    count = sum(entry['count'] for _, entry in ranked)
+    total = count or 1
+    drawing = _drawing(360, 238, 'Equipment Count Distribution (Ranked)')
+    cx, cy, radius = 120, 108, 90
+
+    start = 90.0
+    legend = []
+    for i, (name, entry) in enumerate(ranked):
+        color = TYPE_COLORS[i % len(TYPE_COLORS)]
+        extent = 360.0 * entry['count'] / total
+        if extent >= 359.99:
+            drawing.add(Circle(cx, cy, radius, fillColor=color, strokeColor=None))
+        elif extent > 0:
+            drawing.add(Wedge(cx, cy, radius, start - extent, start, fillColor=color,
+                              strokeColor=colors.white, strokeWidth=1))
+        if extent >= 12:
+            angle = math.radians(start - extent / 2)
+            drawing.add(String(cx + math.cos(angle) * radius * 0.85, cy + math.sin(angle) * radius * 0.85 - 3,
+                               f"{extent / 3.6:.1f}%", fontName=BOLD_FONT, fontSize=7, textAnchor='middle'))
+        legend.append((f"{name} ({entry['count']})", color))
+        start -= extent
+
+    drawing.add(Circle(cx, cy, radius * 0.7, fillColor=colors.white, strokeColor=None))
+    for offset, line in zip((8, -4, -16), (str(count), 'Total', 'Equipment')):
+        drawing.add(String(cx, cy + offset, line, fontName=BOLD_FONT, fontSize=10, textAnchor='middle'))
+
+    _legend(drawing, 232, 200, legend[:14])
+    return drawing
+
+
+def create_comparison_chart(statistics):
+    """Average of each parameter per type with min-max whiskers, one panel per parameter."""
+    by_type = statistics.get('by_type') or {}
+    if not by_type:
+        return None
+
+    types = list(by_type)
+    drawing = _drawing(468, 180, 'Parameter Range Analysis (Min-Avg-Max)')
+    titles = ['Flowrate (L/min)', 'Pressure (bar)', 'Temperature (°C)']
+
+    for (x, width), parameter, color, title in zip(_panels(468, 3), PARAMETERS, PARAMETER_COLORS, titles):
+        entries = [by_type[name][parameter] for name in types]
+        ticks = _ticks(min(0, *(entry['min'] for entry in entries)), max(entry['max'] for entry in entries))
+        axes = _Axes(drawing, x, 50, width, 100, (ticks[0], ticks[-1]), categories=types)
+        axes.frame(ticks, label_size=6)
+        _panel_title(drawing, axes, title)
+
+        bar = axes.slot * 0.6
+        for i, entry in enumerate(entries):
+            center = axes.px(i)
+            drawing.add(Rect(center - bar / 2, axes.py(0), bar, axes.py(entry['avg']) - axes.py(0),
+                             fillColor=color, strokeColor=None))
+            low, high = axes.py(entry['min']), axes.py(entry['max'])
+            cap = min(3, bar / 3)
+            for shape in (Line(center, low, center, high), Line(center - cap, low, center + cap, low),
+                          Line(center - cap, high, center + cap, high)):
+                shape.strokeColor = colors.black
+                shape.strokeWidth = 0.6
+                drawing.add(shape)
+    return drawing
+
+
+def create_violin_plot(statistics):
+    """Distribution shapes per type from the stored percentiles, one panel per parameter."""
+    by_type = statistics.get('by_type') or {}
+    if not by_type:
+        return None
+
+    types = list(by_type)
+    drawing = _drawing(468, 202, 'Distribution Shape Analysis (Violin Plot)')
+    units = ['L/min', 'bar', '°C']
+    titles = ['Flowrate Distribution', 'Pressure Distribution', 'Temperature Distribution']
+
+    for (x, width), parameter, color, title, unit in zip(_panels(468, 3), PARAMETERS, PARAMETER_COLORS, titles, units):
+        entries = [by_type[name][parameter] for name in types]
+        ticks = _ticks(min(entry['min'] for entry in entries), max(entry['max'] for entry in entries))
+        axes = _Axes(drawing, x, 50, width, 120, (ticks[0], ticks[-1]), categories=types)
+        axes.frame(ticks, label_size=6)
+        _panel_title(drawing, axes, title)
+        drawing.add(String(x - 22, 50 + 60, unit, fontName=BOLD_FONT, fontSize=7, textAnchor='middle'))
+
+        for i, entry in enumerate(entries):
+            sample = _distribution_sample(entry)
+            if sample is None:
+                # Statistics without percentiles: spread linearly through min, avg and max
+                sample = np.interp(np.linspace(0, 1, 101), [0, 0.5, 1], [entry['min'], entry['avg'], entry['max']])
+            _violin(drawing, axes, i, sample, entry['avg'], color)
+    return drawing
+
+
+def create_scatter_plot(statistics):
+    """Type averages plotted pairwise for each combination of parameters."""
+    by_type = statistics.get('by_type') or {}
+    if not by_type:
+        return None
+
+    types = list(by_type)
+    averages = {parameter: [by_type[name][parameter]['avg'] for name in types] for parameter in PARAMETERS}
+    labels = {'flowrate': 'Flowrate (L/min)', 'pressure': 'Pressure (bar)', 'temperature': 'Temperature (°C)'}
+    pairs = [('flowrate', 'pressure'), ('flowrate', 'temperature'), ('pressure', 'temperature')]
+    drawing = _drawing(468, 180, 'Parameter Correlation Analysis')
+
+    for (x, width), (x_parameter, y_parameter) in zip(_panels(400, 3), pairs):
+        xticks = _ticks(min(averages[x_parameter]), max(averages[x_parameter]), count=4)
+        yticks = _ticks(min(averages[y_parameter]), max(averages[y_parameter]), count=4)
+        axes = _Axes(drawing, x, 48, width, 100, (yticks[0], yticks[-1]), xlim=(xticks[0], xticks[-1]))
+        axes.frame(yticks, xticks=xticks, label_size=6, grid_x=True)
+        _panel_title(drawing, axes, f"{labels[x_parameter].split(' ')[0]} vs {labels[y_parameter].split(' ')[0]}")
+        drawing.add(String(x + width / 2, 24, labels[x_parameter], fontName=BOLD_FONT, fontSize=7, textAnchor='middle'))
+
+        for i, (x_value, y_value) in enumerate(zip(averages[x_parameter], averages[y_parameter])):
+            drawing.add(Circle(axes.px(x_value), axes.py(y_value), 3.5, fillColor=TYPE_COLORS[i % len(TYPE_COLORS)],
+                               fillOpacity=0.7, strokeColor=colors.black, strokeWidth=0.5))
+
+    _legend(drawing, 404, 150, [(name, TYPE_COLORS[i % len(TYPE_COLORS)]) for i, name in enumerate(types[:12])],
+            size=6)
+    return drawing
+
+
+def create_area_chart(statistics):
+    """Cumulative parameter averages (pressure scaled by 20), types sorted by their sum."""
+    by_type = statistics.get('by_type') or {}
+    if not by_type:
+        return None
+
+    ranked = sorted(by_type.items(), key=lambda item: sum(item[1][parameter]['avg'] for parameter in PARAMETERS))
+    types = [name for name, _ in ranked]
+    layers = np.array([
+        [entry['flowrate']['avg'] for _, entry in ranked],
+        [entry['pressure']['avg'] * 20 for _, entry in ranked],
+        [entry['temperature']['avg'] for _, entry in ranked],
+    ])
+    tops = np.cumsum(layers, axis=0)
+
+    drawing = _drawing(360, 238, 'Cumulative Parameter Analysis')
+    ticks = _ticks(0, float(tops[-1].max()))
+    axes = _Axes(drawing, 52, 62, 290, 150, (ticks[0], ticks[-1]), categories=types)
+    axes.frame(ticks)
+    if len(types) == 1:
+        # A single category has no width to fill; widen it to its slot
+        positions = [-0.3, 0.3]
+        tops = np.repeat(tops, 2, axis=1)
+    else:
+        positions = list(range(len(types)))
+
+    bottom = np.zeros(len(positions))
+    for top, color in zip(tops, PARAMETER_COLORS):
+        points = []
+        for position, value in zip(positions, top):
+            points += [axes.px(position), axes.py(value)]
+        for position, value in reversed(list(zip(positions, bottom))):
+            points += [axes.px(position), axes.py(value)]
+        drawing.add(Polygon(points, fillColor=color, fillOpacity=0.6, strokeColor=None))
+        bottom = top
+
+    _axis_titles(drawing, axes, 'Equipment Type (sorted by total)', 'Cumulative Parameter Values')
+    _legend(drawing, 58, 205, zip(['Flowrate', 'Pressure (×20)', 'Temperature'], PARAMETER_COLORS))
+    return drawing
+
+
+def create_heatmap(statistics):
+    """Type averages colored by their position within each parameter's range."""
+    by_type = statistics.get('by_type') or {}
+    if not by_type:
+        return None
+
+    types = list(by_type)
+    values = np.array([[by_type[name][parameter]['avg'] for parameter in PARAMETERS] for name in types])
+    normalized = _normalize(values)
+
+    drawing = _drawing(324, 252, 'Equipment Parameter Heatmap')
+    left, bottom, width, height = 80, 24, 180, 196
+    cell_width, cell_height = width / 3, height / len(types)
+    for row, name in enumerate(types):
+        y = bottom + height - (row + 1) * cell_height
+        drawing.add(String(left - 3, y + cell_height / 2 - 2.5, _truncate(name), fontName=FONT,
+                           fontSize=min(7, cell_height), textAnchor='end'))
+        for column in range(3):
+            x = left + column * cell_width
+            drawing.add(Rect(x, y, cell_width, cell_height, fillColor=_ramp(HEAT_COLORS, normalized[row, column]),
+                             strokeColor=None))
+            if cell_height >= 8:
+                drawing.add(String(x + cell_width / 2, y + cell_height / 2 - 2.5, f"{values[row, column]:.1f}",
+                                   fontName=BOLD_FONT, fontSize=7, textAnchor='middle'))
+    for column, label in enumerate(['Flowrate', 'Pressure', 'Temperature']):
+        drawing.add(String(left + (column + 0.5) * cell_width, bottom - 11, label, fontName=BOLD_FONT,
+                           fontSize=8, textAnchor='middle'))
+
+    # Color bar
+    steps = 20
+    for step in range(steps):
+        drawing.add(Rect(272, bottom + step * height / steps, 10, height / steps + 0.2,
+                         fillColor=_ramp(HEAT_COLORS, (step + 0.5) / steps), strokeColor=None))
+    for tick in (0, 0.5, 1):
+        drawing.add(String(286, bottom + tick * height - 2.5, f"{tick:g}", fontName=FONT, fontSize=6))
+    label = Group(String(0, 0, 'Normalized Value', fontName=BOLD_FONT, fontSize=7, textAnchor='middle'))
+    label.transform = (0, -1, 1, 0, 306, bottom + height / 2)
+    drawing.add(label)
+    return drawing
+
+
+def create_radar_chart(statistics):
+    """Normalized parameter averages of up to six types on three spokes."""
+    by_type = statistics.get('by_type') or {}
+    if not by_type or len(by_type) > 6:  # Limit to 6 types for clarity
+        return None
+
+    types = list(by_type)
+    normalized = _normalize(np.array([[by_type[name][parameter]['avg'] for parameter in PARAMETERS]
+                                      for name in types])) * 100
+    drawing = _drawing(324, 324, 'Equipment Performance Radar Chart')
+    cx, cy, radius = 140, 150, 110
+    angles = [2 * math.pi * k / 3 for k in range(3)]
+
+    for ring in (25, 50, 75, 100):
+        drawing.add(Circle(cx, cy, radius * ring / 100, fillColor=None, strokeColor=GRID_COLOR, strokeWidth=0.5))
+        drawing.add(String(cx + 2, cy + radius * ring / 100 + 2, str(ring), fontName=FONT, fontSize=6))
+    for angle, label in zip(angles, ['Flowrate', 'Pressure', 'Temperature']):
+        drawing.add(Line(cx, cy, cx + math.cos(angle) * radius, cy + math.sin(angle) * radius,
+                         strokeColor=GRID_COLOR, strokeWidth=0.5))
+        anchor = 'start' if math.cos(angle) > 0.1 else 'end' if math.cos(angle) < -0.1 else 'middle'
+        drawing.add(String(cx + math.cos(angle) * (radius + 8), cy + math.sin(angle) * (radius + 8) - 3, label,
+                           fontName=BOLD_FONT, fontSize=9, textAnchor=anchor))
+
+    for i, (name, values) in enumerate(zip(types, normalized)):
+        color = RADAR_COLORS[i]
+        points = []
+        for angle, value in zip(angles, values):
+            points += [cx + math.cos(angle) * radius * value / 100, cy + math.sin(angle) * radius * value / 100]
+        drawing.add(Polygon(points, fillColor=color, fillOpacity=0.15, strokeColor=color, strokeWidth=1.5))
+        for x, y in zip(points[::2], points[1::2]):
+            drawing.add(Circle(x, y, 2.5, fillColor=color, strokeColor=None))
+
+    _legend(drawing, 262, 290, zip(types, RADAR_COLORS))
+    return drawing
+
+
+def create_horizontal_ranking_chart(statistics):
+    """Types ranked by average flowrate, highest on top."""
+    by_type = statistics.get('by_type') or {}
+    if not by_type:
+        return None
+
+    ranked = sorted(by_type.items(), key=lambda item: item[1]['flowrate']['avg'], reverse=True)
+    flowrates = [entry['flowrate']['avg'] for _, entry in ranked]
+    ticks = _ticks(min(0, min(flowrates)), max(flowrates) * 1.12)
+
+    drawing = _drawing(360, 252, 'Equipment Ranked by Flowrate Performance')
+    axes = _Axes(drawing, 80, 40, 265, 185, (0, len(ranked)), xlim=(ticks[0], ticks[-1]))
+    axes.frame([], xticks=ticks, grid_x=True)
+
+    bar = axes.height / len(ranked) * 0.7
+    for i, ((name, _), value) in enumerate(zip(ranked, flowrates)):
+        center = axes.py(len(ranked) - i - 0.5)
+        fraction = i / (len(ranked) - 1) if len(ranked) > 1 else 0
+        drawing.add(Rect(axes.px(0), center - bar / 2, axes.px(value) - axes.px(0), bar,
+                         fillColor=_ramp(RANK_COLORS, fraction), strokeColor=colors.black, strokeWidth=0.5))
+        drawing.add(String(axes.x - 3, center - 2.5, _truncate(name), fontName=FONT, fontSize=min(8, bar + 1),
+                           textAnchor='end'))
+        drawing.add(String(axes.px(value) + 3, center - 2.5, f"{value:.1f}", fontName=BOLD_FONT,
+                           fontSize=min(8, bar + 1)))
+
+    drawing.add(String(axes.x + axes.width / 2, 12, 'Average Flowrate (L/min)', fontName=BOLD_FONT,
+                       fontSize=9, textAnchor='middle'))
+    return drawing
+
+
+def create_line_chart(statistics):
+    """Parameter averages across types in alphabetical order."""
+    by_type = statistics.get('by_type') or {}
+    if not by_type:
+        return None
+
+    types = sorted(by_type)
+    series = [[by_type[name][parameter]['avg'] for name in types] for parameter in PARAMETERS]
+    ticks = _ticks(min(min(values) for values in series), max(max(values) for values in series))
+
+    drawing = _drawing(360, 238, 'Parameter Trends Across Equipment Types')
+    axes = _Axes(drawing, 52, 62, 225, 150, (ticks[0], ticks[-1]), categories=types)
+    axes.frame(ticks)
+
+    for values, color, marker in zip(series, PARAMETER_COLORS, ('circle', 'square', 'triangle')):
+        points = []
+        for i, value in enumerate(values):
+            points += [axes.px(i), axes.py(value)]
+        drawing.add(PolyLine(points, strokeColor=color, strokeWidth=2))
+        for x, y in zip(points[::2], points[1::2]):
+            drawing.add(_marker(marker, x, y, color))
+
+    _axis_titles(drawing, axes, 'Equipment Type', 'Parameter Value')
+    _legend(drawing, 285, 205, zip(['Flowrate', 'Pressure', 'Temperature'], PARAMETER_COLORS))
+    return drawing
+
+
+# Charts included in the PDF report, by name (same names as pdf_charts.REPORT_CHARTS)
+VECTOR_CHARTS = {
+    'bar': create_bar_chart,
+    'pie': create_pie_chart,
+    'line': create_line_chart,
+    'ranking': create_horizontal_ranking_chart,
+    'comparison': create_comparison_chart,
+    'violin': create_violin_plot,
+    'scatter': create_scatter_plot,
+    'area': create_area_chart,
+    'heatmap': create_heatmap,
+    'radar': create_radar_chart,
+}
+
+
+def render_vector_charts(statistics, names=None):
+    """
+    Build vector charts from VECTOR_CHARTS.
+
+    Args:
+        statistics: Statistics dict of the dataset
+        names: Optional chart names to build (defaults to all report charts)
+
+    Returns:
+        dict: {name: Drawing, or None if the chart could not be drawn}
+    """
+    charts = {}
+    for name in names or VECTOR_CHARTS:
+        try:
+            charts[name] = VECTOR_CHARTS[name](statistics)
+        except Exception:
+            logger.exception(f"Error creating vector {name} chart")
+            charts[name] = None
+    return charts
+
+
+def _drawing(width, height, title):
+    """Centered drawing with a bold title along its top edge."""
+    drawing = Drawing(width, height)
+    drawing.hAlign = 'CENTER'
+    drawing.add(String(width / 2, height - 12, title, fontName=BOLD_FONT, fontSize=11, textAnchor='middle'))
+    return drawing
+
+
+def _panels(width, count, left=30, gap=36):
+    """(x, width) of count side-by-side panels spanning width."""
+    panel = (width - left - gap * (count - 1) - 6) / count
+    return [(left + i * (panel + gap), panel) for i in range(count)]
+
+
+def _panel_title(drawing, axes, title):
+    drawing.add(String(axes.x + axes.width / 2, axes.y + axes.height + 4, title, fontName=BOLD_FONT,
+                       fontSize=8, textAnchor='middle'))
+
+
+def _axis_titles(drawing, axes, x_title, y_title):
+    drawing.add(String(axes.x + axes.width / 2, 4, x_title, fontName=BOLD_FONT, fontSize=8, textAnchor='middle'))
+    label = Group(String(0, 0, y_title, fontName=BOLD_FONT, fontSize=8, textAnchor='middle'))
+    label.transform = (0, 1, -1, 0, 10, axes.y + axes.height / 2)
+    drawing.add(label)
+
+
+def _legend(drawing, x, y, items, size=7):
+    """Vertical legend of (label, color) swatches whose first row starts at (x, y)."""
+    for row, (label, color) in enumerate(items):
+        top = y - row * (size + 4)
+        drawing.add(Rect(x, top, size, size, fillColor=color, strokeColor=None))
+        drawing.add(String(x + size + 3, top + 1, _truncate(label, 22), fontName=FONT, fontSize=size))
+
+
+def _slanted_label(drawing, x, y, text, size):
+    """Category label rotated 45 degrees, ending just below the tick at x."""
+    label = Group(String(0, 0, _truncate(text), fontName=FONT, fontSize=size, textAnchor='end'))
+    label.transform = (math.cos(math.pi / 4), math.sin(math.pi / 4), -math.sin(math.pi / 4),
+                       math.cos(math.pi / 4), x, y)
+    drawing.add(label)
+
+
+def _violin(drawing, axes, position, sample, mean, color):
+    """Mirrored density outline of a sample at a category position, with mean and median ticks."""
+    counts, edges = np.histogram(sample, bins=16)
+    if counts.max() == 0 or edges[-1] == edges[0]:
+        counts, edges = np.ones(1), np.array([sample.min(), sample.max()])
+    # Light smoothing so the outline reads as a shape rather than a histogram
+    density = np.convolve(counts, [0.25, 0.5, 0.25], mode='same')
+    half = density / density.max() * axes.slot * 0.4
+    centers = (edges[:-1] + edges[1:]) / 2
+    levels = np.concatenate([[edges[0]], centers, [edges[-1]]])
+    widths = np.concatenate([[0], half, [0]])
+
+    center = axes.px(position)
+    points = []
+    for level, width in zip(levels, widths):
+        points += [center + width, axes.py(level)]
+    for level, width in zip(levels[::-1], widths[::-1]):
+        points += [center - width, axes.py(level)]
+    drawing.add(Polygon(points, fillColor=color, fillOpacity=0.6, strokeColor=color, strokeWidth=0.5))
+
+    reach = axes.slot * 0.2
+    drawing.add(Line(center, axes.py(sample.min()), center, axes.py(sample.max()), strokeColor=color, strokeWidth=0.6))
+    for value, dash in ((mean, None), (float(np.median(sample)), [1.5, 1])):
+        drawing.add(Line(center - reach, axes.py(value), center + reach, axes.py(value),
+                         strokeColor=colors.black, strokeWidth=0.7, strokeDashArray=dash))
+
+
+def _marker(kind, x, y, color, size=3.5):
+    """White-filled line chart marker outlined in the series color."""
+    style = {'fillColor': colors.white, 'strokeColor': color, 'strokeWidth': 1.5}
+    if kind == 'square':
+        return Rect(x - size, y - size, 2 * size, 2 * size, **style)
+    if kind == 'triangle':
+        return Polygon([x - size, y - size, x + size, y - size, x, y + size], **style)
+    return Circle(x, y, size, **style)
+
+
+def _ticks(low, high, count=5):
+    """Round tick values covering [low, high]."""
+    if not math.isfinite(low) or not math.isfinite(high):
+        return [0, 1]
+    if high <= low:
+        low, high = low - 1, high + 1
+    raw = (high - low) / count
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    start = math.floor(low / step)
+    stop = math.ceil(high / step)
+    return [round(i * step, 10) for i in range(start, stop + 1)]
+
+
+def _format(value):
+    return f"{value:,.0f}" if abs(value) >= 10000 else f"{value:g}"
+
+
+def _truncate(text, length=16):
+    text = str(text)
+    return text if len(text) <= length else text[:length - 1] + '…'
+
+
+def _normalize(values):
+    """Scale each column to 0-1 across rows; constant columns map to 0."""
+    low = values.min(axis=0)
+    span = values.max(axis=0) - low
+    return (values - low) / np.where(span == 0, 1, span)
+
+
+def _ramp(stops, fraction):
+    """Color at fraction (0-1) along evenly spaced color stops."""
+    fraction = min(max(float(fraction), 0.0), 1.0)
+    scaled = fraction * (len(stops) - 1)
+    index = min(int(scaled), len(stops) - 2)
+    return colors.linearlyInterpolatedColor(stops[index], stops[index + 1], index, index + 1, scaled)
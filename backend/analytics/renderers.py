@@ -0,0 +1,177 @@
+"""
+Additional response renderers for the analytics API.
+"""
+import json
+import pyarrow as pa
+import pyarrow.parquet as pq
+from rest_framework import status
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline-delimited JSON: one JSON document per line.
+
+    Dataset rows are streamed directly by the view in this format; the
+    renderer covers ordinary Response payloads (such as error messages)
+    for clients that asked for NDJSON.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(encode_ndjson(rows))
+
+
+class ColumnarRenderer(BaseRenderer):
+    """
+    Base for the binary columnar formats.
+
+    Only successful payloads are encoded as a table (see `encode`). Error
+    responses fall back to JSONRenderer and are sent as application/json,
+    so clients never have to decode an error message from a data file.
+    """
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if response is not None and not status.is_success(response.status_code):
+            response['Content-Type'] = JSONRenderer.media_type
+            return JSONRenderer().render(data, JSONRenderer.media_type, renderer_context)
+        if data is None:
+            return b''
+        return b''.join(self.encode([_payload_batch(data)]))
+
+    def encode(self, batches):
+        raise NotImplementedError('ColumnarRenderer subclasses must implement encode()')
+
+
+class ArrowStreamRenderer(ColumnarRenderer):
+    """
+    Apache Arrow IPC streaming format.
+
+    Numeric columns go over the wire as typed binary buffers, so clients
+    skip JSON encoding and decoding entirely.
+    """
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+
+    def encode(self, batches):
+        return stream_arrow(batches)
+
+
+class ParquetRenderer(ColumnarRenderer):
+    """
+    Apache Parquet file format, for clients that want a compressed
+    columnar file rather than a stream.
+    """
+    media_type = 'application/vnd.apache.parquet'
+    format = 'parquet'
+
+    def encode(self, batches):
+        return stream_parquet(batches)
+
+
+def _payload_batch(data):
+    """Convert a Response payload (dict or list of dicts) to a RecordBatch."""
+    rows = data if isinstance(data, list) else [data]
+    return pa.RecordBatch.from_pylist(rows)
+
+
+class _ChunkSink:
+    """
+    Write-only file object that collects what pyarrow writes so a
+    generator can hand it to the response as it is produced.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        """Return and forget everything written since the last drain."""
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _stream_with(open_writer, batches):
+    """
+    Write batches through a pyarrow writer, yielding output after each one.
+
+    The writer's schema is taken from the first batch, so `batches` must
+    yield at least one (possibly empty) batch.
+    """
+    batches = iter(batches)
+    first = next(batches, None)
+    if first is None:
+        return
+
+    sink = _ChunkSink()
+    writer = open_writer(sink, first.schema)
+    try:
+        writer.write_batch(first)
+        yield sink.drain()
+        for batch in batches:
+            writer.write_batch(batch)
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def stream_arrow(batches):
+    """Encode pyarrow RecordBatches as an Arrow IPC stream, one batch at a time."""
+    return _stream_with(pa.ipc.new_stream, batches)
+
+
+def stream_parquet(batches):
+    """Encode pyarrow RecordBatches as a Parquet file, one row group at a time."""
+    return _stream_with(
+        lambda sink, schema: pq.ParquetWriter(sink, schema, compression='zstd'),
+        batches
+    )
+
+
+def encode_ndjson(rows):
+    """Yield each row dict as one UTF-8 encoded JSON line."""
+    for row in rows:
+        yield json.dumps(row).encode('utf-8') + b'\n'
+
+
+def stream_ndjson(batches):
+    """
+    Encode pyarrow RecordBatches as NDJSON, one batch at a time.
+
+    Yields:
+        bytes: The encoded lines of one batch
+    """
+    for batch in batches:
+        if batch.num_rows:
+            yield b''.join(encode_ndjson(batch.to_pylist()))
@@ -0,0 +1,159 @@
+"""
+On-disk cache of generated PDF reports.
+
+A report is a pure function of the dataset fields it prints and of the
+report template, so finished PDFs are stored under a digest of exactly
+those inputs. The digest doubles as the download's ETag. When statistics
+are recomputed or the template version changes, the digest changes and
+the old file is replaced the next time the report is requested.
+
+Model imports are deferred to function bodies, as in jobs.py, because the
+retention sweep imports this module from the worker loop.
+"""
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def report_digest(dataset, version, chart_format='raster'):
+    """
+    Hash everything a report for the dataset is rendered from.
+
+    Args:
+        dataset: Completed CSVDataset instance
+        version: Report template version (PDFReportService.TEMPLATE_VERSION)
+        chart_format: Chart format the report is rendered with
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    inputs = {
+        'version': version,
+        'chart_format': chart_format,
+        'file_name': dataset.file_name,
+        'uploaded_by': dataset.uploaded_by.username,
+        'uploaded_at': dataset.uploaded_at.isoformat(),
+        'status': dataset.status,
+        'statistics': dataset.statistics,
+    }
+    payload = json.dumps(inputs, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_or_render(dataset_id, digest, render, variant='raster'):
+    """
+    Return the path of a cached report, rendering and storing it on a miss.
+
+    Args:
+        dataset_id: ID of the dataset the report belongs to
+        digest: Digest from report_digest
+        render: Callable writing the PDF to the binary file object it is given
+        variant: Report variant (chart format); each variant keeps its latest render
+
+    Returns:
+        str: Path of the cached PDF file
+    """
+    path = _report_path(dataset_id, variant, digest)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(_cache_dir(), exist_ok=True)
+
+    # Render straight to disk under a unique name and rename, so concurrent
+    # requests (threads or processes) never share or serve a partial file
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix='.tmp', dir=_cache_dir())
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            render(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        _remove(tmp_path)
+        raise
+
+    # Older renders of this variant can no longer be requested
+    clear(dataset_id, variant=variant, keep=path)
+    return path
+
+
+def cached_path(dataset_id, digest, variant='raster'):
+    """
+    Return the path of a cached report, or None if it is not (or no longer) cached.
+
+    Args:
+        dataset_id: ID of the dataset the report belongs to
+        digest: Digest from report_digest
+        variant: Report variant (chart format)
+    """
+    path = _report_path(dataset_id, variant, digest)
+    return path if os.path.exists(path) else None
+
+
+def clear(dataset_id, variant=None, keep=None):
+    """
+    Delete cached reports of a dataset.
+
+    Args:
+        dataset_id: ID of the dataset
+        variant: Optional variant to limit the deletion to
+        keep: Optional path to leave in place
+    """
+    prefix = f"{dataset_id}-{variant}-" if variant else f"{dataset_id}-"
+    for entry in _entries():
+        if entry.name.startswith(prefix) and entry.path != keep:
+            _remove(entry.path)
+
+
+def prune():
+    """
+    Delete cached reports of datasets that no longer exist.
+
+    Returns:
+        int: Number of files removed
+    """
+    from .models import CSVDataset
+
+    by_dataset = {}
+    for entry in _entries():
+        dataset_id = entry.name.split('-', 1)[0]
+        if dataset_id.isdigit():
+            by_dataset.setdefault(int(dataset_id), []).append(entry.path)
+    if not by_dataset:
+        return 0
+
+    existing = set(CSVDataset.objects.filter(pk__in=by_dataset).values_list('pk', flat=True))
+    removed = 0
+    for dataset_id, paths in by_dataset.items():
+        if dataset_id not in existing:
+            for path in paths:
+                removed += _remove(path)
+    return removed
+
+
+def _cache_dir():
+    return str(getattr(settings, 'PDF_REPORT_CACHE_DIR', os.path.join(settings.MEDIA_ROOT, 'report_cache')))
+
+
+def _report_path(dataset_id, variant, digest):
+    return os.path.join(_cache_dir(), f"{dataset_id}-{variant}-{digest}.pdf")
+
+
+def _entries():
+    """Cached report files (not temporary files still being written)."""
+    try:
+        with os.scandir(_cache_dir()) as entries:
+            return [entry for entry in entries if entry.name.endswith('.pdf')]
+    except FileNotFoundError:
+        return []
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return 1
+    except FileNotFoundError:
+        return 0
@@ -1,5 +1,6 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import CSVDataset
+from .models import CSVDataset, ReportJob
 
 
 class CSVDatasetSerializer(serializers.ModelSerializer):
@@ -36,6 +37,35 @@ class CSVDatasetSerializer(serializers.ModelSerializer):
         ]
 
 
+class CSVDatasetSummarySerializer(serializers.ModelSerializer):
+    """
+    Lightweight serializer for dataset lists.
+    Leaves out the statistics JSON and error log.
+    """
+    uploaded_by_username = serializers.CharField(source='uploaded_by.username', read_only=True)
+    
+    SUMMARY_FIELDS = [
+        'id',
+        'file_name',
+        'uploaded_at',
+        'row_count',
+        'status',
+        'uploaded_by__username'
+    ]
+    
+    class Meta:
+        model = CSVDataset
+        fields = [
+            'id',
+            'file_name',
+            'uploaded_by_username',
+            'uploaded_at',
+            'row_count',
+            'status'
+        ]
+        read_only_fields = fields
+
+
 class CSVUploadSerializer(serializers.Serializer):
     """
     Serializer for CSV file upload.
@@ -49,13 +79,59 @@ class CSVUploadSerializer(serializers.Serializer):
         if not value.name.endswith('.csv'):
             raise serializers.ValidationError("Only CSV files are allowed.")
         
-        # Check file size (max 10MB)
-        if value.size > 10 * 1024 * 1024:
-            raise serializers.ValidationError("File size cannot exceed 10MB.")
+        # Check file size (large files are processed in streaming mode)
+        max_size = getattr(settings, 'CSV_MAX_UPLOAD_SIZE', 200 * 1024 * 1024)
+        if value.size > max_size:
+            raise serializers.ValidationError(
+                f"File size cannot exceed {max_size // (1024 * 1024)}MB."
+            )
         
         return value
 
 
+class CSVDatasetStatusSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the processing status of a dataset.
+    Only reads the status and progress columns, never the statistics blob.
+    """
+    progress = serializers.SerializerMethodField()
+    
+    STATUS_FIELDS = [
+        'id',
+        'status',
+        'phase',
+        'rows_processed',
+        'bytes_read',
+        'bytes_total',
+        'error_log',
+        'processed_at'
+    ]
+    
+    class Meta:
+        model = CSVDataset
+        fields = [
+            'id',
+            'status',
+            'phase',
+            'progress',
+            'rows_processed',
+            'bytes_read',
+            'bytes_total',
+            'error_log',
+            'processed_at'
+        ]
+    
+    def get_progress(self, obj):
+        """
+        Percentage of the file processed, based on bytes read.
+        """
+        if obj.phase == 'done':
+            return 100.0
+        if not obj.bytes_total:
+            return 0.0
+        return round(min(obj.bytes_read / obj.bytes_total, 1.0) * 100, 1)
+
+
 class StatisticsSerializer(serializers.Serializer):
     """
     Serializer for combined statistics response.
@@ -63,3 +139,31 @@ class StatisticsSerializer(serializers.Serializer):
     total_datasets = serializers.IntegerField()
     total_equipment_count = serializers.IntegerField()
     datasets = CSVDatasetSerializer(many=True)
+
+
+class ReportJobCreateSerializer(serializers.Serializer):
+    """
+    Serializer for the optional body of a report job request.
+    """
+    charts = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for queued PDF report jobs.
+    """
+    dataset_id = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id',
+            'dataset_id',
+            'chart_format',
+            'status',
+            'error_log',
+            'created_at',
+            'started_at',
+            'completed_at'
+        ]
+        read_only_fields = fields
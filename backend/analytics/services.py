@@ -1,12 +1,520 @@
+import os
+import math
+import time
 import pandas as pd
 import logging
 from django.conf import settings
 from django.utils import timezone
-from .models import CSVDataset
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Max, Min, Sum
+from django.db.models.functions import Cast, Coalesce
+from .models import CSVDataset, TypeStatistic, enforce_dataset_limit
+from .columnar import SidecarWriter, has_sidecar, iter_frames
+from .sketches import TypeHistograms, TypeQuantiles
 
 logger = logging.getLogger(__name__)
 
 
+def summarize_moments(count, total, m2, low, high):
+    """
+    Build one parameter's statistics entry from its moments.
+    
+    Args:
+        count: Number of values
+        total: Sum of the values
+        m2: Sum of squared deviations from the mean (None if unknown)
+        low: Minimum value
+        high: Maximum value
+        
+    Returns:
+        dict: {'avg', 'min', 'max', 'std', 'sum', 'm2'}; avg/min/max/std are
+            rounded for display, sum and m2 are kept exact for merging.
+            std is the sample standard deviation, as pandas computes it.
+    """
+    return {
+        'avg': round(total / count, 2),
+        'min': round(low, 2),
+        'max': round(high, 2),
+        'std': _sample_std(count, m2),
+        'sum': total,
+        'm2': m2,
+    }
+
+
+def combine_moments(count_a, sum_a, m2_a, count_b, sum_b, m2_b):
+    """
+    Merge two sets of (count, sum, M2) moments (Chan et al.'s parallel
+    variance update). Works elementwise on aligned pandas objects, where a
+    count of zero on either side contributes no correction term.
+    
+    Returns:
+        tuple: (count, sum, m2)
+    """
+    count = count_a + count_b
+    delta = sum_b / count_b - sum_a / count_a
+    correction = delta ** 2 * count_a * count_b / count
+    if isinstance(correction, (pd.Series, pd.DataFrame)):
+        correction = correction.fillna(0.0)
+    return count, sum_a + sum_b, m2_a + m2_b + correction
+
+
+def build_type_statistics(counts, sums, m2s, mins, maxs):
+    """
+    Build the per-type `by_type` dict from aggregate frames.
+    
+    Args:
+        counts: Series of row counts indexed by equipment type
+        sums: DataFrame of sums (types x numeric columns)
+        m2s: DataFrame of sums of squared deviations (types x numeric columns)
+        mins: DataFrame of minimums (types x numeric columns)
+        maxs: DataFrame of maximums (types x numeric columns)
+        
+    Returns:
+        dict: {type: {'count': n, 'flowrate': {'avg', 'min', 'max', 'std', 'sum', 'm2'}, ...}}
+    """
+    keys = [col.lower() for col in sums.columns]
+    rows = zip(
+        counts.index,
+        counts.tolist(),
+        sums.to_numpy(dtype=float).tolist(),
+        m2s.to_numpy(dtype=float).tolist(),
+        mins.to_numpy(dtype=float).tolist(),
+        maxs.to_numpy(dtype=float).tolist(),
+    )
+    
+    type_statistics = {}
+    for equipment_type, count, sum_row, m2_row, min_row, max_row in rows:
+        entry = {'count': int(count)}
+        for key, total, m2, low, high in zip(keys, sum_row, m2_row, min_row, max_row):
+            entry[key] = summarize_moments(count, total, m2, low, high)
+        type_statistics[equipment_type] = entry
+    
+    return type_statistics
+
+
+def build_overall_statistics(count, sums, m2s):
+    """
+    Build the overall averages, standard deviations and moments.
+    
+    Args:
+        count: Total number of rows
+        sums: Series of column sums indexed by numeric column
+        m2s: Series of sums of squared deviations indexed by numeric column
+        
+    Returns:
+        dict: 'overall_averages', 'overall_std' and 'overall_moments' entries
+    """
+    averages = {}
+    stds = {}
+    moments = {'count': int(count)}
+    for col in sums.index:
+        key = col.lower()
+        total, m2 = float(sums[col]), float(m2s[col])
+        averages[key] = round(total / count, 2)
+        stds[key] = _sample_std(count, m2)
+        moments[key] = {'sum': total, 'm2': m2}
+    
+    return {
+        'overall_averages': averages,
+        'overall_std': stds,
+        'overall_moments': moments
+    }
+
+
+def attach_distributions(statistics, quantiles):
+    """
+    Add percentiles from quantile sketches to a statistics dict in place.
+    
+    Args:
+        statistics: Statistics dict with a 'by_type' mapping
+        quantiles: TypeQuantiles filled with the same rows
+        
+    Returns:
+        dict: The same statistics dict, with a 'quantiles' entry under each
+            type's parameters and an 'overall_quantiles' entry
+    """
+    for equipment_type, parameters in quantiles.by_type().items():
+        entry = statistics['by_type'].get(equipment_type)
+        if entry is None:
+            continue
+        for key, percentiles in parameters.items():
+            entry[key]['quantiles'] = percentiles
+    statistics['overall_quantiles'] = quantiles.overall()
+    return statistics
+
+
+class StatisticsAccumulator:
+    """
+    Running per-type moments that CSV chunks are folded into.
+
+    Only counts, sums, sums of squared deviations (M2) and extrema are
+    kept, so memory is bounded by the number of distinct equipment types
+    rather than by the number of rows.
+    """
+
+    def __init__(self, numeric_columns):
+        self.numeric_columns = list(numeric_columns)
+        self.row_count = 0
+        self.totals = pd.Series(0.0, index=self.numeric_columns)
+        self.total_m2 = pd.Series(0.0, index=self.numeric_columns)
+        self.counts = None
+        self.sums = None
+        self.m2s = None
+        self.mins = None
+        self.maxs = None
+        self.quantiles = TypeQuantiles(self.numeric_columns)
+
+    def add(self, df):
+        """
+        Fold a validated chunk into the running moments.
+
+        Args:
+            df: pandas DataFrame chunk with numeric columns already coerced
+        """
+        self.quantiles.add(df)
+
+        values = df[self.numeric_columns]
+        chunk_m2 = values.var(ddof=0).fillna(0.0) * len(df)
+        self.row_count, self.totals, self.total_m2 = combine_moments(
+            self.row_count, self.totals, self.total_m2,
+            len(df), values.sum(), chunk_m2
+        )
+
+        grouped = df.groupby('Type')[self.numeric_columns]
+        counts = grouped.count()
+        sums = grouped.sum()
+        m2s = grouped.var(ddof=0).fillna(0.0) * counts
+        mins = grouped.min()
+        maxs = grouped.max()
+
+        if self.counts is None:
+            self.counts, self.sums, self.m2s, self.mins, self.maxs = counts, sums, m2s, mins, maxs
+            return
+
+        index = self.counts.index.union(counts.index)
+        self.counts, self.sums, self.m2s = combine_moments(
+            self.counts.reindex(index, fill_value=0), self.sums.reindex(index, fill_value=0.0),
+            self.m2s.reindex(index, fill_value=0.0),
+            counts.reindex(index, fill_value=0), sums.reindex(index, fill_value=0.0),
+            m2s.reindex(index, fill_value=0.0)
+        )
+        self.mins = pd.concat([self.mins, mins]).groupby(level=0).min()
+        self.maxs = pd.concat([self.maxs, maxs]).groupby(level=0).max()
+
+    def statistics(self):
+        """
+        Build the statistics dict in the same shape as compute_statistics.
+
+        Returns:
+            dict: Computed statistics
+        """
+        type_statistics = {}
+        if self.counts is not None:
+            index = self.counts.index.sort_values()
+            type_statistics = build_type_statistics(
+                self.counts.loc[index, self.numeric_columns[0]],
+                self.sums.loc[index],
+                self.m2s.loc[index],
+                self.mins.loc[index],
+                self.maxs.loc[index],
+            )
+
+        statistics = {
+            'total_equipment_count': self.row_count,
+            'by_type': type_statistics,
+            **build_overall_statistics(self.row_count, self.totals, self.total_m2)
+        }
+        return attach_distributions(statistics, self.quantiles)
+
+
+def merge_statistics(*statistics):
+    """
+    Combine statistics dicts of several chunks, workers or datasets into
+    the statistics of their union, in O(number of types).
+    
+    Averages and standard deviations are exact because they are derived
+    from the stored sums and M2 moments. Statistics computed before
+    moments were stored only yield an approximate sum (avg x count) and no
+    standard deviation. Percentiles are dropped, since merging them needs
+    the stored quantile sketches.
+    
+    Args:
+        *statistics: Statistics dicts as stored on CSVDataset
+        
+    Returns:
+        dict: Statistics dict of the combined data
+    """
+    merged_types = {}
+    overall = {}
+    total_count = 0
+    
+    for stats in statistics:
+        if not stats:
+            continue
+        count = stats.get('total_equipment_count', 0)
+        total_count += count
+        
+        for equipment_type, entry in stats.get('by_type', {}).items():
+            merged = merged_types.setdefault(equipment_type, {})
+            for key, value in entry.items():
+                if key == 'count':
+                    continue
+                moments = (
+                    entry['count'],
+                    value.get('sum', value['avg'] * entry['count']),
+                    value.get('m2'),
+                    value['min'],
+                    value['max'],
+                )
+                merged[key] = _merge_moments(merged[key], moments) if key in merged else moments
+        
+        stored = stats.get('overall_moments', {})
+        for key, avg in stats.get('overall_averages', {}).items():
+            value = stored.get(key, {'sum': avg * count, 'm2': None})
+            moments = (count, value['sum'], value['m2'], None, None)
+            overall[key] = _merge_moments(overall[key], moments) if key in overall else moments
+    
+    by_type = {}
+    for equipment_type in sorted(merged_types):
+        parameters = merged_types[equipment_type]
+        entry = {'count': next(iter(parameters.values()))[0]}
+        for key, moments in parameters.items():
+            entry[key] = summarize_moments(*moments)
+        by_type[equipment_type] = entry
+    
+    result = {'total_equipment_count': total_count, 'by_type': by_type}
+    if total_count:
+        result['overall_averages'] = {key: round(total / count, 2) for key, (count, total, _, _, _) in overall.items()}
+        result['overall_std'] = {key: _sample_std(count, m2) for key, (count, _, m2, _, _) in overall.items()}
+        result['overall_moments'] = {'count': total_count}
+        result['overall_moments'].update(
+            {key: {'sum': total, 'm2': m2} for key, (_, total, m2, _, _) in overall.items()}
+        )
+    return result
+
+
+def _merge_moments(a, b):
+    """Merge two (count, sum, m2, min, max) tuples; m2 is None if unknown."""
+    count_a, sum_a, m2_a, min_a, max_a = a
+    count_b, sum_b, m2_b, min_b, max_b = b
+    if not count_a:
+        return b
+    if not count_b:
+        return a
+    
+    count, total, m2 = combine_moments(count_a, sum_a, m2_a or 0.0, count_b, sum_b, m2_b or 0.0)
+    if m2_a is None or m2_b is None:
+        m2 = None
+    low = min(min_a, min_b) if min_a is not None else None
+    high = max(max_a, max_b) if max_a is not None else None
+    return count, total, m2, low, high
+
+
+def _sample_std(count, m2):
+    """Sample standard deviation from moments, rounded; None if m2 is unknown."""
+    if m2 is None:
+        return None
+    if count < 2:
+        return 0.0
+    return round(math.sqrt(max(m2, 0.0) / (count - 1)), 2)
+
+
+def save_type_statistics(dataset, statistics, sketches=None, histograms=None):
+    """
+    Replace a dataset's TypeStatistic rows with the given statistics.
+    
+    Args:
+        dataset: CSVDataset model instance
+        statistics: Statistics dict as stored on the dataset
+        sketches: Optional {type: serialized quantile sketches} mapping
+        histograms: Optional {type: histograms} mapping
+    """
+    TypeStatistic.objects.filter(dataset=dataset).delete()
+    TypeStatistic.objects.bulk_create(
+        TypeStatistic.from_statistics(dataset, statistics, sketches, histograms),
+        batch_size=1000
+    )
+
+
+def aggregate_type_statistics(user, types=None, last=None):
+    """
+    Aggregate per-type statistics across a user's completed datasets in SQL.
+    
+    Sums, counts and M2 moments are added up by the database, so averages
+    and standard deviations are those of all the underlying rows. The
+    combined M2 is sum(M2_i) + sum(sum_i^2 / n_i) - (sum of sums)^2 / N.
+    Rows stored before moments existed fall back to mean x count for the
+    sum and report no standard deviation.
+    
+    Args:
+        user: Owner of the datasets
+        types: Optional list of equipment types to include
+        last: Optional number of most recent completed datasets to include
+        
+    Returns:
+        dict: {
+            'dataset_count': n,
+            'by_type': {type: {'count', 'dataset_count', 'flowrate': {'avg', 'min', 'max', 'std', 'sum', 'm2'}, ...}}
+        }
+    """
+    datasets = CSVDataset.objects.filter(
+        uploaded_by=user,
+        status='completed'
+    ).order_by('-uploaded_at', '-id').values_list('pk', flat=True)
+    dataset_ids = list(datasets[:last] if last else datasets)
+    
+    rows = TypeStatistic.objects.filter(dataset_id__in=dataset_ids)
+    if types:
+        rows = rows.filter(equipment_type__in=types)
+    
+    count = Cast(F('count'), FloatField())
+    aggregates = {
+        'total': Sum('count'),
+        'datasets': Count('dataset'),
+    }
+    for parameter in TypeStatistic.PARAMETERS:
+        total = Coalesce(F(f'{parameter}_sum'), count * F(f'{parameter}_mean'))
+        aggregates[f'{parameter}_total'] = Sum(total, output_field=FloatField())
+        aggregates[f'{parameter}_squares'] = Sum(total * total / count, output_field=FloatField())
+        aggregates[f'{parameter}_m2_total'] = Sum(f'{parameter}_m2')
+        aggregates[f'{parameter}_m2_known'] = Count(f'{parameter}_m2')
+        aggregates[f'{parameter}_lowest'] = Min(f'{parameter}_min')
+        aggregates[f'{parameter}_highest'] = Max(f'{parameter}_max')
+    
+    by_type = {}
+    for row in rows.values('equipment_type').annotate(**aggregates).order_by('equipment_type'):
+        entry = {'count': row['total'], 'dataset_count': row['datasets']}
+        for parameter in TypeStatistic.PARAMETERS:
+            total = row[f'{parameter}_total']
+            m2 = None
+            if row[f'{parameter}_m2_known'] == row['datasets']:
+                m2 = row[f'{parameter}_m2_total'] + row[f'{parameter}_squares'] - total * total / row['total']
+            entry[parameter] = summarize_moments(
+                row['total'], total, m2, row[f'{parameter}_lowest'], row[f'{parameter}_highest']
+            )
+        by_type[row['equipment_type']] = entry
+    
+    return {
+        'dataset_count': len(dataset_ids),
+        'by_type': by_type
+    }
+
+
+def reuse_processed_upload(user, file_name, content_hash):
+    """
+    Create a completed dataset from an earlier upload with identical content.
+    
+    The new dataset points at the existing stored CSV (and therefore its
+    Parquet sidecar) and copies its statistics, so nothing is written to
+    storage or parsed again. Identical bytes imply an identical header, so
+    a hash match is also a schema match.
+    
+    Args:
+        user: Uploading user; only their own datasets are considered
+        file_name: Original name of the new upload
+        content_hash: SHA-256 hex digest of the uploaded file
+        
+    Returns:
+        CSVDataset or None: The new dataset, or None if there is no match
+    """
+    if not content_hash:
+        return None
+    
+    source = CSVDataset.objects.filter(
+        uploaded_by=user,
+        content_hash=content_hash,
+        status='completed'
+    ).order_by('-uploaded_at').first()
+    
+    if source is None or not source.file or not os.path.exists(source.file.path):
+        return None
+    
+    with transaction.atomic():
+        dataset = CSVDataset.objects.create(
+            file_name=file_name,
+            file=source.file.name,
+            uploaded_by=user,
+            status='completed',
+            phase='done',
+            row_count=source.row_count,
+            statistics=source.statistics,
+            rows_processed=source.row_count,
+            bytes_read=source.bytes_total or 0,
+            bytes_total=source.bytes_total,
+            content_hash=content_hash,
+            processed_at=timezone.now()
+        )
+        rows = source.type_statistics.values_list('equipment_type', 'sketch', 'histograms')
+        sketches = {equipment_type: sketch for equipment_type, sketch, _ in rows}
+        histograms = {equipment_type: histogram for equipment_type, _, histogram in rows}
+        save_type_statistics(dataset, source.statistics, sketches, histograms)
+    
+    logger.info(f"Dataset {dataset.id} reuses results of dataset {source.id}")
+    return dataset
+
+
+class DatasetDeleted(Exception):
+    """Raised when the dataset being processed has been deleted, e.g. by the retention limit."""
+
+
+class ProgressReporter:
+    """
+    Persist processing progress on the dataset row while a file is read.
+
+    Progress is written with a narrow UPDATE of the progress columns, never
+    a full save, and row/byte counters are written at most once every
+    CSV_PROGRESS_INTERVAL seconds so that chunked reads are not slowed down
+    by database writes. A write that finds the row gone raises
+    DatasetDeleted, so processing stops at the next progress update.
+
+    Every write also refreshes processing_started_at, the worker's
+    heartbeat: a dataset is only reclaimed as abandoned once it has gone
+    CSV_JOB_STALE_AFTER seconds without progress (see analytics.jobs).
+    """
+
+    def __init__(self, dataset, interval=None):
+        self.dataset = dataset
+        self.interval = interval if interval is not None else getattr(settings, 'CSV_PROGRESS_INTERVAL', 1.0)
+        self.last_write = 0.0
+
+    def start(self, bytes_total):
+        """Reset the counters at the beginning of a processing run."""
+        self._write(phase='reading', rows_processed=0, bytes_read=0, bytes_total=bytes_total)
+
+    def set_phase(self, phase):
+        """Record that processing has moved on to another phase."""
+        self._write(phase=phase)
+
+    def update(self, rows_processed=None, bytes_read=None, force=False):
+        """
+        Record how far through the file processing has got.
+
+        Args:
+            rows_processed: Rows read and validated so far
+            bytes_read: Source bytes consumed so far
+            force: Write even if the last write was less than `interval` ago
+        """
+        fields = {}
+        if rows_processed is not None:
+            fields['rows_processed'] = rows_processed
+        if bytes_read is not None:
+            fields['bytes_read'] = bytes_read
+
+        if force or time.monotonic() - self.last_write >= self.interval:
+            self._write(**fields)
+        else:
+            for name, value in fields.items():
+                setattr(self.dataset, name, value)
+
+    def _write(self, **fields):
+        fields['processing_started_at'] = timezone.now()
+        for name, value in fields.items():
+            setattr(self.dataset, name, value)
+        if not CSVDataset.objects.filter(pk=self.dataset.pk).update(**fields):
+            raise DatasetDeleted(f"Dataset {self.dataset.pk} no longer exists.")
+        self.last_write = time.monotonic()
+
+
 class CSVProcessingService:
     """
     Service class to handle CSV file processing and statistics computation.
@@ -15,14 +523,20 @@ class CSVProcessingService:
     REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
     NUMERIC_COLUMNS = ['Flowrate', 'Pressure', 'Temperature']
     
-    def __init__(self, dataset_instance):
+    def __init__(self, dataset_instance, chunk_size=None):
         """
         Initialize the service with a CSVDataset instance.
         
         Args:
             dataset_instance: CSVDataset model instance
+            chunk_size: Rows per chunk in streaming mode (defaults to CSV_CHUNK_SIZE)
         """
         self.dataset = dataset_instance
+        self.chunk_size = chunk_size or getattr(settings, 'CSV_CHUNK_SIZE', 100000)
+        self.progress = ProgressReporter(dataset_instance)
+        # Quantile sketches and histograms behind the last computed statistics
+        self.quantiles = None
+        self.histograms = None
     
     def validate_csv(self, df):
         """
@@ -72,88 +586,231 @@ class CSVProcessingService:
         # Total equipment count
         total_count = len(df)
         
-        # Group by Type
-        grouped = df.groupby('Type')
+        # Count/sum/variance/min/max for every numeric column in one grouped pass
+        aggregated = df.groupby('Type')[self.NUMERIC_COLUMNS].agg(['count', 'sum', 'var', 'min', 'max'])
+        counts = aggregated.xs('count', axis=1, level=1)
         
         # Statistics by type
-        type_statistics = {}
-        for equipment_type, group in grouped:
-            type_statistics[equipment_type] = {
-                'count': len(group),
-                'flowrate': {
-                    'avg': round(float(group['Flowrate'].mean()), 2),
-                    'min': round(float(group['Flowrate'].min()), 2),
-                    'max': round(float(group['Flowrate'].max()), 2),
-                },
-                'pressure': {
-                    'avg': round(float(group['Pressure'].mean()), 2),
-                    'min': round(float(group['Pressure'].min()), 2),
-                    'max': round(float(group['Pressure'].max()), 2),
-                },
-                'temperature': {
-                    'avg': round(float(group['Temperature'].mean()), 2),
-                    'min': round(float(group['Temperature'].min()), 2),
-                    'max': round(float(group['Temperature'].max()), 2),
-                }
-            }
-        
-        # Overall averages
-        overall_averages = {
-            'flowrate': round(float(df['Flowrate'].mean()), 2),
-            'pressure': round(float(df['Pressure'].mean()), 2),
-            'temperature': round(float(df['Temperature'].mean()), 2),
-        }
+        type_statistics = build_type_statistics(
+            counts[self.NUMERIC_COLUMNS[0]],
+            aggregated.xs('sum', axis=1, level=1),
+            aggregated.xs('var', axis=1, level=1).fillna(0.0) * (counts - 1),
+            aggregated.xs('min', axis=1, level=1),
+            aggregated.xs('max', axis=1, level=1),
+        )
+        
+        # Overall averages, standard deviations and moments
+        values = df[self.NUMERIC_COLUMNS]
+        overall = build_overall_statistics(
+            total_count,
+            values.sum(),
+            values.var().fillna(0.0) * (total_count - 1)
+        )
         
-        return {
+        # Percentiles per type and overall
+        self.quantiles = TypeQuantiles(self.NUMERIC_COLUMNS)
+        self.quantiles.add(df)
+        statistics = attach_distributions({
             'total_equipment_count': total_count,
             'by_type': type_statistics,
-            'overall_averages': overall_averages
-        }
+            **overall
+        }, self.quantiles)
+        
+        # Exact histograms over each type's range; per-type ones are stored on TypeStatistic
+        self.histograms = TypeHistograms(
+            self.NUMERIC_COLUMNS,
+            aggregated.xs('min', axis=1, level=1),
+            aggregated.xs('max', axis=1, level=1)
+        )
+        self.histograms.add(df)
+        statistics['overall_histograms'] = self.histograms.overall()
+        return statistics
     
-    def process(self):
+    def use_streaming(self):
+        """
+        Decide whether the file is large enough to be read in chunks.
+        
+        Returns:
+            bool: True when the file exceeds CSV_STREAMING_THRESHOLD bytes
+        """
+        threshold = getattr(settings, 'CSV_STREAMING_THRESHOLD', 10 * 1024 * 1024)
+        return self.dataset.file.size > threshold
+    
+    def compute_in_memory(self, sidecar=None):
+        """
+        Read the whole CSV into one DataFrame, validate it and compute statistics.
+        
+        Args:
+            sidecar: Optional SidecarWriter that receives the validated rows
+        
+        Returns:
+            tuple: (row_count, statistics, error_message)
+        """
+        # Type labels stay strings, as in compute_streaming, even when they look numeric
+        df = pd.read_csv(self.dataset.file.path, dtype={'Type': str})
+        self.progress.update(rows_processed=len(df), bytes_read=self.dataset.bytes_total, force=True)
+        
+        is_valid, error_message = self.validate_csv(df)
+        if not is_valid:
+            return None, None, error_message
+        
+        if sidecar:
+            sidecar.write(df)
+        
+        self.progress.set_phase('computing')
+        return len(df), self.compute_statistics(df), None
+    
+    def compute_streaming(self, sidecar=None):
+        """
+        Read the dataset in bounded chunks, validating each chunk and folding
+        it into running per-type accumulators. Peak memory is set by
+        chunk_size and the number of equipment types, not by the file size.
+        
+        Args:
+            sidecar: Optional SidecarWriter that receives each validated chunk
+        
+        Returns:
+            tuple: (row_count, statistics, error_message)
+        """
+        accumulator = StatisticsAccumulator(self.NUMERIC_COLUMNS)
+        
+        chunks = iter_frames(
+            self.dataset,
+            self.chunk_size,
+            dtype={'Type': str},
+            on_progress=lambda bytes_read: self.progress.update(accumulator.row_count, bytes_read)
+        )
+        
+        for chunk in chunks:
+            is_valid, error_message = self.validate_csv(chunk)
+            if not is_valid:
+                return None, None, error_message
+            if sidecar:
+                sidecar.write(chunk)
+            accumulator.add(chunk)
+        
+        if accumulator.row_count == 0:
+            return None, None, "CSV file is empty."
+        
+        # The histogram pass below reads the finished sidecar
+        if sidecar:
+            sidecar.commit()
+        
+        self.progress.update(rows_processed=accumulator.row_count, force=True)
+        self.progress.set_phase('computing')
+        self.quantiles = accumulator.quantiles
+        statistics = accumulator.statistics()
+        
+        # Histogram bins span each type's range, which is known only now:
+        # count them exactly in a second pass, over the sidecar when there is one
+        self.histograms = TypeHistograms(self.NUMERIC_COLUMNS, accumulator.mins, accumulator.maxs)
+        for chunk in iter_frames(self.dataset, self.chunk_size, columns=['Type'] + self.NUMERIC_COLUMNS,
+                                 dtype={'Type': str}):
+            self.histograms.add(chunk)
+        statistics['overall_histograms'] = self.histograms.overall()
+        return accumulator.row_count, statistics, None
+    
+    def process(self, streaming=None):
         """
         Process the CSV file: validate, compute statistics, and update the dataset.
         
+        Args:
+            streaming: Force chunked (True) or in-memory (False) reading.
+                Defaults to streaming for files above CSV_STREAMING_THRESHOLD.
+        
         Returns:
             tuple: (success, error_message)
         """
         try:
             # Update status to processing
-            self.dataset.status = 'processing'
-            self.dataset.save()
+            self._save(status='processing')
             
-            # Read CSV file
-            df = pd.read_csv(self.dataset.file.path)
+            # Reprocessing reads the existing sidecar in batches instead of the CSV
+            reprocessing = has_sidecar(self.dataset)
+            if streaming is None:
+                streaming = reprocessing or self.use_streaming()
             
-            # Validate CSV
-            is_valid, error_message = self.validate_csv(df)
-            if not is_valid:
-                self.dataset.status = 'failed'
-                self.dataset.error_log = error_message
-                self.dataset.processed_at = timezone.now()
-                self.dataset.save()
-                return False, error_message
+            source_path = self.dataset.sidecar_path if reprocessing else self.dataset.file.path
+            self.progress.start(os.path.getsize(source_path))
             
-            # Compute statistics
-            statistics = self.compute_statistics(df)
+            # Read, validate and aggregate the CSV file, writing the sidecar as we go
+            with SidecarWriter(self.dataset.sidecar_path) as sidecar:
+                if reprocessing:
+                    row_count, statistics, error_message = self.compute_streaming()
+                elif streaming:
+                    row_count, statistics, error_message = self.compute_streaming(sidecar)
+                else:
+                    row_count, statistics, error_message = self.compute_in_memory(sidecar)
+                
+                if error_message:
+                    sidecar.discard()
+                else:
+                    self.progress.set_phase('saving')
+                    sidecar.commit()
+            
+            if error_message:
+                self._save(
+                    status='failed',
+                    phase='done',
+                    error_log=error_message,
+                    processed_at=timezone.now()
+                )
+                return False, error_message
             
             # Update dataset
-            self.dataset.row_count = len(df)
-            self.dataset.statistics = statistics
-            self.dataset.status = 'completed'
-            self.dataset.processed_at = timezone.now()
-            self.dataset.save()
+            with transaction.atomic():
+                self._save(
+                    row_count=row_count,
+                    statistics=statistics,
+                    status='completed',
+                    phase='done',
+                    processed_at=timezone.now()
+                )
+                save_type_statistics(
+                    self.dataset,
+                    statistics,
+                    self.quantiles.dumps(),
+                    self.histograms.by_type()
+                )
             
             logger.info(f"Successfully processed dataset {self.dataset.id}")
             return True, None
+        
+        except DatasetDeleted:
+            logger.info(f"Dataset {self.dataset.id} was deleted while it was being processed")
+            # The sidecar may have been committed after the retention sweep ran
+            self.dataset.delete_files()
+            return False, 'Dataset no longer exists.'
             
         except Exception as e:
             error_message = f"Error processing CSV: {str(e)}"
             logger.error(error_message)
             
-            self.dataset.status = 'failed'
-            self.dataset.error_log = error_message
-            self.dataset.processed_at = timezone.now()
-            self.dataset.save()
+            try:
+                self._save(
+                    status='failed',
+                    phase='done',
+                    error_log=error_message,
+                    processed_at=timezone.now()
+                )
+            except DatasetDeleted:
+                pass
             
             return False, error_message
+        
+        finally:
+            # Datasets still processing are spared by the retention limit until now
+            enforce_dataset_limit(self.dataset.uploaded_by_id)
+    
+    def _save(self, **fields):
+        """
+        Write dataset fields with a narrow UPDATE instead of a full save, so
+        a dataset deleted while it is processed is never inserted again.
+        
+        Raises:
+            DatasetDeleted: If the dataset row no longer exists
+        """
+        for name, value in fields.items():
+            setattr(self.dataset, name, value)
+        if not CSVDataset.objects.filter(pk=self.dataset.pk).update(**fields):
+            raise DatasetDeleted(f"Dataset {self.dataset.pk} no longer exists.")
@@ -0,0 +1,548 @@
+"""
+Mergeable quantile sketches for per-type percentiles.
+
+Each equipment type and numeric column gets a KLL sketch (Karnin, Lang and
+Liberty, 2016). A sketch keeps a few hundred values however many rows it
+has seen, answers any percentile with a rank error of about 1% at the
+default size, is exact while it has seen fewer values than its size, and
+two sketches can be merged into the sketch of their union. Sketches are
+stored on the TypeStatistic rows so that percentiles never require
+rereading a CSV.
+
+The percentiles reported for one dataset are computed exactly from the
+rows while a file has at most CSV_QUANTILE_EXACT_ROWS rows, and come from
+the sketches only for larger files (see TypeQuantiles).
+
+Fixed-bin histograms (TypeHistograms) are counted exactly instead: bins
+span each type's [min, max], so they are filled once the ranges are known,
+from the in-memory frame or in a second pass over the Parquet sidecar.
+"""
+import math
+import random
+import struct
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+# Percentiles reported for every type and numeric column
+QUANTILES = {
+    'p5': 0.05,
+    'p25': 0.25,
+    'p50': 0.5,
+    'p75': 0.75,
+    'p90': 0.9,
+    'p95': 0.95,
+    'p99': 0.99,
+}
+
+# Capacity of each level relative to the level above it
+LEVEL_DECAY = 2 / 3
+
+_HEADER = struct.Struct('<IqH')
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch over float values.
+
+    Values are held in levels; an item on level h stands for 2**h input
+    values. When a level outgrows its capacity it is sorted and every other
+    item (from a random offset) is promoted to the level above, halving the
+    number of stored items while keeping the total weight equal to `count`.
+    """
+
+    def __init__(self, k=None):
+        """
+        Args:
+            k: Capacity of the top level; higher is more accurate and larger.
+                Defaults to CSV_QUANTILE_SKETCH_K.
+        """
+        self.k = k or getattr(settings, 'CSV_QUANTILE_SKETCH_K', 200)
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._random = None
+
+    @classmethod
+    def exact(cls, values, k=None):
+        """
+        Build a sketch holding `values` verbatim (at most k of them).
+
+        Args:
+            values: Array-like of numbers
+            k: Sketch size, as for the constructor
+
+        Returns:
+            QuantileSketch
+        """
+        sketch = cls(k)
+        sketch.levels[0] = np.asarray(values, dtype=float).ravel()
+        sketch.count = sketch.levels[0].size
+        return sketch
+
+    def update(self, values):
+        """
+        Add a batch of values to the sketch.
+
+        Args:
+            values: Array-like of numbers
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        if not values.size:
+            return
+        self.count += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        """
+        Fold another sketch into this one.
+
+        Args:
+            other: QuantileSketch built over different values
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def quantiles(self, fractions):
+        """
+        Estimate the values at the given fractions of the distribution.
+
+        While no level has been compacted the values are exact and
+        interpolated as pandas does; afterwards the nearest rank is used.
+
+        Args:
+            fractions: Iterable of numbers between 0 and 1
+
+        Returns:
+            list: One float per fraction (empty if the sketch is empty)
+        """
+        fractions = np.asarray(list(fractions), dtype=float)
+        if not self.count:
+            return []
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], fractions).tolist()
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(level_items.size, 2 ** level, dtype=np.int64)
+            for level, level_items in enumerate(self.levels)
+        ])
+        order = np.argsort(items, kind='stable')
+        ranks = np.cumsum(weights[order])
+        positions = np.searchsorted(ranks, fractions * ranks[-1], side='left')
+        return items[order][np.minimum(positions, items.size - 1)].tolist()
+
+    def to_bytes(self):
+        """
+        Serialize the sketch.
+
+        Returns:
+            bytes: Header, level sizes and float64 items
+        """
+        sizes = [items.size for items in self.levels]
+        return b''.join([
+            _HEADER.pack(self.k, self.count, len(sizes)),
+            struct.pack(f'<{len(sizes)}I', *sizes),
+            *(items.astype('<f8').tobytes() for items in self.levels),
+        ])
+
+    @classmethod
+    def from_bytes(cls, data, offset=0):
+        """
+        Deserialize a sketch written by to_bytes.
+
+        Args:
+            data: Bytes holding one or more serialized sketches
+            offset: Position of the sketch within `data`
+
+        Returns:
+            tuple: (QuantileSketch, offset just past the sketch)
+        """
+        k, count, level_count = _HEADER.unpack_from(data, offset)
+        offset += _HEADER.size
+        sizes = struct.unpack_from(f'<{level_count}I', data, offset)
+        offset += 4 * level_count
+
+        sketch = cls(k)
+        sketch.count = count
+        sketch.levels = []
+        for size in sizes:
+            sketch.levels.append(np.frombuffer(data, dtype='<f8', count=size, offset=offset).astype(float))
+            offset += 8 * size
+        return sketch, offset
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * LEVEL_DECAY ** depth)))
+
+    def _compress(self):
+        # Compact the lowest overfull level until the sketch fits its budget
+        while sum(items.size for items in self.levels) > sum(map(self._capacity, range(len(self.levels)))):
+            level = next(
+                level for level, items in enumerate(self.levels)
+                if items.size > self._capacity(level)
+            )
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            if self._random is None:
+                self._random = random.Random(self.count)
+            items = np.sort(self.levels[level])
+
+            # An odd item out stays behind so that the promoted weight is exact
+            kept = np.empty(0)
+            if items.size % 2:
+                if self._random.random() < 0.5:
+                    kept, items = items[:1], items[1:]
+                else:
+                    kept, items = items[-1:], items[:-1]
+
+            promoted = items[self._random.randrange(2)::2]
+            self.levels[level] = kept
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+
+class TypeQuantiles:
+    """
+    Quantile sketches for every equipment type and numeric column.
+
+    Rows are buffered verbatim until more than max_exact_rows have been
+    added. Up to that point every percentile, per type and overall, is
+    computed exactly from the buffer when results are read, so it depends
+    only on the rows and not on how they were split into chunks: reading a
+    file in memory or in chunks gives the same statistics.
+
+    Past that point the largest types move to a QuantileSketch per column,
+    and overall percentiles come from a sketch per column that is seeded
+    with the buffered rows and then fed every chunk. Those percentiles are
+    approximate (about 1% rank error) and depend on the chunking. Types
+    that stay in the buffer are still exact.
+
+    Chunks are collected in a list and concatenated only when the buffer
+    overflows or when results are read, so each row is copied a bounded
+    number of times.
+    """
+
+    def __init__(self, numeric_columns, k=None, max_exact_rows=None):
+        self.numeric_columns = list(numeric_columns)
+        self.k = k or getattr(settings, 'CSV_QUANTILE_SKETCH_K', 200)
+        self.max_exact_rows = max_exact_rows or getattr(settings, 'CSV_QUANTILE_EXACT_ROWS', 500000)
+        self.sketches = {}
+        self.exact = None
+        self.pending = []
+        self.pending_rows = 0
+        # Created when the buffer first overflows
+        self.overall_sketches = None
+
+    def add(self, df):
+        """
+        Add a validated chunk to the sketches.
+
+        Args:
+            df: pandas DataFrame chunk with numeric columns already coerced
+        """
+        frame = df[['Type'] + self.numeric_columns]
+        if self.overall_sketches is not None:
+            for sketch, values in zip(self.overall_sketches, frame[self.numeric_columns].to_numpy(dtype=float).T):
+                sketch.update(values)
+            # Untyped rows only count towards the overall percentiles
+            frame = frame[frame['Type'].notna()]
+
+        sketched = frame['Type'].isin(list(self.sketches))
+        if sketched.any():
+            self._update(frame[sketched])
+
+        exact = frame[~sketched]
+        if not exact.empty:
+            self.pending.append(exact)
+            self.pending_rows += len(exact)
+
+        exact_rows = self.pending_rows + (0 if self.exact is None else len(self.exact))
+        if exact_rows > self.max_exact_rows:
+            self._consolidate()
+
+    def by_type(self):
+        """
+        Returns:
+            dict: {type: {'flowrate': {'p5', 'p25', ..., 'p99'}, ...}}
+        """
+        self._concatenate()
+        described = {
+            equipment_type: self._describe(sketches)
+            for equipment_type, sketches in self.sketches.items()
+        }
+        if self.exact is None or self.exact['Type'].notna().sum() == 0:
+            return described
+
+        fractions = list(QUANTILES.values())
+        table = self.exact.groupby('Type')[self.numeric_columns].quantile(fractions)
+        types = table.index.get_level_values(0)[::len(fractions)]
+        values = table.to_numpy(dtype=float).round(2).reshape(len(types), len(fractions), -1)
+        keys = [column.lower() for column in self.numeric_columns]
+        for equipment_type, rows in zip(types, values.transpose(0, 2, 1).tolist()):
+            described[equipment_type] = {
+                key: dict(zip(QUANTILES, row)) for key, row in zip(keys, rows)
+            }
+        return described
+
+    def overall(self):
+        """
+        Returns:
+            dict: {'flowrate': {'p5', 'p25', ..., 'p99'}, ...} over all rows
+        """
+        self._concatenate()
+        if self.overall_sketches is not None:
+            return self._describe(self.overall_sketches)
+
+        keys = [column.lower() for column in self.numeric_columns]
+        if self.exact is None or self.exact.empty:
+            return {key: {} for key in keys}
+        values = self.exact[self.numeric_columns].to_numpy(dtype=float)
+        table = np.quantile(values, list(QUANTILES.values()), axis=0).round(2)
+        return {
+            key: dict(zip(QUANTILES, column)) for key, column in zip(keys, table.T.tolist())
+        }
+
+    def dumps(self):
+        """
+        Serialize each type's sketches for storage.
+
+        Buffered types with more than k rows are sketched here in a single
+        update, so the stored sketch depends only on the type's rows.
+
+        Returns:
+            dict: {type: bytes holding one sketch per column}
+        """
+        self._concatenate()
+        blobs = {
+            equipment_type: dump_sketches(sketches)
+            for equipment_type, sketches in self.sketches.items()
+        }
+        if self.exact is not None:
+            values = self.exact[self.numeric_columns].to_numpy(dtype=float)
+            for equipment_type, positions in self.exact.groupby('Type').indices.items():
+                rows = values[positions]
+                blobs[equipment_type] = dump_sketches(
+                    self._sketch(rows[:, column]) for column in range(len(self.numeric_columns))
+                )
+        return blobs
+
+    def _sketch(self, values):
+        if values.size <= self.k:
+            return QuantileSketch.exact(values, self.k)
+        sketch = QuantileSketch(self.k)
+        sketch.update(values)
+        return sketch
+
+    def _concatenate(self):
+        """Concatenate pending chunks into the buffered rows."""
+        if self.pending:
+            frames = self.pending if self.exact is None else [self.exact] + self.pending
+            self.exact = pd.concat(frames, ignore_index=True)
+            self.pending = []
+            self.pending_rows = 0
+
+    def _consolidate(self):
+        """
+        Make room in an overflowing buffer. On the first overflow the
+        overall sketches are seeded with every buffered row. Then types
+        with more than k values move to sketches, and if the buffer still
+        exceeds half of max_exact_rows, so do the largest remaining types,
+        leaving room for further chunks before the next concatenation.
+        """
+        self._concatenate()
+        if self.exact is None or self.exact.empty:
+            return
+
+        if self.overall_sketches is None:
+            self.overall_sketches = [
+                self._sketch(values) for values in self.exact[self.numeric_columns].to_numpy(dtype=float).T
+            ]
+            self.exact = self.exact[self.exact['Type'].notna()].reset_index(drop=True)
+
+        # Largest types first
+        counts = self.exact['Type'].value_counts()
+        moving = counts > self.k
+        small = counts[~moving]
+        # Rows left in the buffer if this type and every smaller one stay
+        left = small[::-1].cumsum()[::-1]
+        moving |= (left > self.max_exact_rows // 2).reindex(counts.index, fill_value=False)
+        if moving.any():
+            rows = self.exact['Type'].isin(counts.index[moving])
+            self._update(self.exact[rows])
+            self.exact = self.exact[~rows].reset_index(drop=True)
+
+    def _update(self, frame):
+        values = frame[self.numeric_columns].to_numpy(dtype=float)
+        for equipment_type, positions in frame.groupby('Type').indices.items():
+            sketches = self.sketches.get(equipment_type)
+            if sketches is None:
+                sketches = [QuantileSketch(self.k) for _ in self.numeric_columns]
+                self.sketches[equipment_type] = sketches
+            rows = values[positions]
+            for column, sketch in enumerate(sketches):
+                sketch.update(rows[:, column])
+
+    def _describe(self, sketches):
+        described = {}
+        for column, sketch in zip(self.numeric_columns, sketches):
+            values = sketch.quantiles(QUANTILES.values())
+            described[column.lower()] = {
+                key: round(value, 2) for key, value in zip(QUANTILES, values)
+            }
+        return described
+
+
+class TypeHistograms:
+    """
+    Exact fixed-bin histograms per equipment type and numeric column, and
+    over all rows with a type.
+
+    Bins span each type's [min, max], so the ranges are passed in and rows
+    are counted afterwards, chunk by chunk. The counts equal those of
+    np.histogram(values, bins) for each type's values, computed for all
+    types at once with one bincount per chunk and column.
+    """
+
+    def __init__(self, numeric_columns, mins, maxs, bins=None):
+        """
+        Args:
+            numeric_columns: Columns to count
+            mins: DataFrame of per-type minimums (index: type, columns: numeric_columns)
+            maxs: DataFrame of per-type maximums, indexed like mins
+            bins: Number of bins (defaults to CSV_HISTOGRAM_BINS)
+        """
+        self.numeric_columns = list(numeric_columns)
+        self.bins = bins or getattr(settings, 'CSV_HISTOGRAM_BINS', 20)
+        self.types = mins.index
+        lows = mins[self.numeric_columns].to_numpy(dtype=float)
+        highs = maxs.loc[self.types, self.numeric_columns].to_numpy(dtype=float)
+        self.lows, self.highs = _histogram_range(lows, highs)
+        self.overall_lows, self.overall_highs = _histogram_range(
+            lows.min(axis=0, initial=np.inf), highs.max(axis=0, initial=-np.inf)
+        )
+        self.counts = np.zeros((len(self.numeric_columns), len(self.types), self.bins), dtype=np.int64)
+        self.overall_counts = np.zeros((len(self.numeric_columns), self.bins), dtype=np.int64)
+
+    def add(self, df):
+        """
+        Count a chunk of the rows the ranges were computed from.
+
+        Args:
+            df: pandas DataFrame chunk with a Type column and the numeric columns
+        """
+        if not len(self.types):
+            return
+        codes = self.types.get_indexer(df['Type'])
+        typed = codes >= 0
+        codes = codes[typed]
+        values = df[self.numeric_columns].to_numpy(dtype=float)[typed]
+        overall = np.zeros(codes.size, dtype=np.int64)
+        for column in range(len(self.numeric_columns)):
+            self.counts[column] += _bin_counts(
+                values[:, column], codes, self.lows[:, column], self.highs[:, column], self.bins
+            )
+            self.overall_counts[column] += _bin_counts(
+                values[:, column], overall, self.overall_lows[column:column + 1],
+                self.overall_highs[column:column + 1], self.bins
+            )[0]
+
+    def by_type(self):
+        """
+        Returns:
+            dict: {type: {'flowrate': {'range': [low, high], 'counts': [...]}, ...}}
+        """
+        keys = [column.lower() for column in self.numeric_columns]
+        result = {}
+        for index, equipment_type in enumerate(self.types):
+            result[equipment_type] = {
+                key: {
+                    'range': [float(self.lows[index, column]), float(self.highs[index, column])],
+                    'counts': self.counts[column, index].tolist(),
+                }
+                for column, key in enumerate(keys)
+            }
+        return result
+
+    def overall(self):
+        """
+        Returns:
+            dict: {'flowrate': {'range': [low, high], 'counts': [...]}, ...}
+        """
+        if not len(self.types):
+            return {}
+        return {
+            column.lower(): {
+                'range': [float(self.overall_lows[index]), float(self.overall_highs[index])],
+                'counts': self.overall_counts[index].tolist(),
+            }
+            for index, column in enumerate(self.numeric_columns)
+        }
+
+
+def _histogram_range(lows, highs):
+    """Widen empty ranges by 0.5 on each side, as np.histogram does."""
+    empty = highs <= lows
+    return np.where(empty, lows - 0.5, lows), np.where(empty, highs + 0.5, highs)
+
+
+def _bin_counts(values, codes, lows, highs, bins):
+    """
+    Vectorized equal-width histograms for many groups at once.
+
+    Bin edges and indexes are computed the way np.histogram computes them
+    (including its corrections at the edges), so the counts are identical.
+
+    Args:
+        values: 1-D array of values, each within its group's range
+        codes: Group index of each value
+        lows: Lower edge per group (already widened by _histogram_range)
+        highs: Upper edge per group
+        bins: Number of bins per group
+
+    Returns:
+        numpy.ndarray: (groups, bins) array of counts
+    """
+    edges = np.arange(bins + 1, dtype=float) * ((highs - lows) / bins)[:, None] + lows[:, None]
+    edges[:, -1] = highs
+    index = ((values - lows[codes]) / (highs - lows)[codes] * bins).astype(np.int64)
+    index[index == bins] -= 1
+    index[values < edges[codes, index]] -= 1
+    index[(values >= edges[codes, index + 1]) & (index != bins - 1)] += 1
+    counts = np.bincount(codes * bins + index, minlength=lows.size * bins)
+    return counts.reshape(lows.size, bins)
+
+
+def dump_sketches(sketches):
+    """
+    Serialize a sequence of sketches into one blob.
+
+    Args:
+        sketches: Iterable of QuantileSketch
+
+    Returns:
+        bytes: Concatenation of the serialized sketches
+    """
+    return b''.join(sketch.to_bytes() for sketch in sketches)
+
+
+def load_sketches(data):
+    """
+    Deserialize a blob written by dump_sketches.
+
+    Args:
+        data: Bytes (or memoryview) from the database
+
+    Returns:
+        list: QuantileSketch instances in their original order
+    """
+    data = bytes(data)
+    sketches = []
+    offset = 0
+    while offset < len(data):
+        sketch, offset = QuantileSketch.from_bytes(data, offset)
+        sketches.append(sketch)
+    return sketches
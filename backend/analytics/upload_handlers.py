@@ -0,0 +1,37 @@
+"""
+Upload handlers for CSV uploads.
+"""
+import hashlib
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """
+    Compute a SHA-256 digest of each uploaded file as it is received.
+
+    The handler passes every chunk through unchanged to the next handler,
+    so the file is hashed while Django writes it out, without a second
+    read. Digests are available in `digests`, keyed by form field name,
+    once the request body has been parsed.
+
+    Must be inserted at the front of request.upload_handlers before
+    request.data or request.FILES is accessed.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.digests = {}
+        self.hasher = None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        self.digests[self.field_name] = self.hasher.hexdigest()
+        # Let the next handler build the file object
+        return None
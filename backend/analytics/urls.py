@@ -5,8 +5,15 @@ urlpatterns = [
     path('csv/upload/', views.upload_csv, name='upload-csv'),
     path('datasets/', views.list_datasets, name='list-datasets'),
     path('datasets/<int:pk>/', views.retrieve_dataset, name='retrieve-dataset'),
+    path('datasets/<int:pk>/status/', views.get_dataset_status, name='dataset-status'),
     path('datasets/<int:pk>/statistics/', views.get_dataset_statistics, name='dataset-statistics'),
+    path('datasets/<int:pk>/histograms/', views.get_dataset_histograms, name='dataset-histograms'),
+    path('datasets/<int:pk>/series/', views.get_dataset_series, name='dataset-series'),
     path('datasets/<int:pk>/data/', views.get_dataset_data, name='dataset-data'),
     path('datasets/<int:pk>/pdf-report/', views.generate_pdf_report, name='generate-pdf'),
+    path('datasets/<int:pk>/reports/', views.create_report_job, name='create-report-job'),
+    path('reports/<int:pk>/', views.get_report_job, name='report-job'),
+    path('reports/<int:pk>/download/', views.download_report_job, name='download-report-job'),
     path('csv/statistics/', views.get_statistics, name='get-statistics'),
+    path('statistics/types/', views.get_type_statistics, name='type-statistics'),
 ]
@@ -1,18 +1,42 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes, parser_classes
+from rest_framework.decorators import api_view, permission_classes, parser_classes, renderer_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.renderers import JSONRenderer
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponse
-from .models import CSVDataset
+from django.db.models import Sum
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
+from .models import CSVDataset, ReportJob, TypeStatistic
 from .serializers import (
     CSVDatasetSerializer,
+    CSVDatasetStatusSerializer,
+    CSVDatasetSummarySerializer,
     CSVUploadSerializer,
-    StatisticsSerializer
+    ReportJobCreateSerializer,
+    ReportJobSerializer
+)
+from .services import CSVProcessingService, aggregate_type_statistics, reuse_processed_upload
+from .upload_handlers import HashingUploadHandler
+from .pagination import InvalidCursor, paginate_by_upload
+from .jobs import background_processing_enabled, process_report_job
+from .columnar import DataQueryError, count_rows, downsample_series, has_sidecar, iter_batches, query_rows
+from .renderers import (
+    ArrowStreamRenderer,
+    NDJSONRenderer,
+    ParquetRenderer,
+    stream_arrow,
+    stream_ndjson,
+    stream_parquet
 )
-from .services import CSVProcessingService
 from .pdf_service import PDFReportService
+from . import report_cache
+
+# Bytes a multipart body may carry beyond the file itself (boundaries and part headers)
+UPLOAD_FORM_OVERHEAD = 64 * 1024
 
 
 @api_view(['POST'])
@@ -20,7 +44,7 @@ from .pdf_service import PDFReportService
 @parser_classes([MultiPartParser, FormParser])
 def upload_csv(request):
     """
-    Upload and process a CSV file.
+    Upload a CSV file and queue it for processing.
     
     POST /api/analytics/csv/upload/
     Content-Type: multipart/form-data
@@ -28,14 +52,34 @@ def upload_csv(request):
     Form data:
         file: CSV file
     
-    Returns:
+    Returns (202 Accepted, processed by the background worker pool):
         {
             "dataset_id": 1,
             "file_name": "equipment.csv",
-            "status": "completed",
-            "statistics": {...}
+            "status": "processing"
         }
+    
+    Poll GET /api/analytics/datasets/{id}/status/ until status is "completed"
+    or "failed". With CSV_BACKGROUND_PROCESSING disabled the file is processed
+    inline and the response is 201 with "statistics" included. Re-uploading a
+    file identical to an already processed one also returns 201 immediately.
     """
+    # Refuse bodies that cannot hold an acceptable file before receiving them
+    max_size = getattr(settings, 'CSV_MAX_UPLOAD_SIZE', 200 * 1024 * 1024)
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = 0
+    if content_length > max_size + UPLOAD_FORM_OVERHEAD:
+        return Response(
+            {'error': f'File size cannot exceed {max_size // (1024 * 1024)}MB.'},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+    
+    # Hash the file while it is received, before request.data is parsed
+    hashing_handler = HashingUploadHandler(request)
+    request.upload_handlers.insert(0, hashing_handler)
+    
     serializer = CSVUploadSerializer(data=request.data)
     
     if not serializer.is_valid():
@@ -45,15 +89,45 @@ def upload_csv(request):
         )
     
     uploaded_file = serializer.validated_data['file']
+    content_hash = hashing_handler.digests.get('file')
+    
+    # Identical content was already processed: reuse its file and statistics
+    dataset = reuse_processed_upload(request.user, uploaded_file.name, content_hash)
+    if dataset is not None:
+        return Response(
+            {
+                'message': 'CSV uploaded. Results reused from an identical upload.',
+                'dataset_id': dataset.id,
+                'file_name': dataset.file_name,
+                'status': dataset.status,
+                'row_count': dataset.row_count,
+                'statistics': dataset.statistics
+            },
+            status=status.HTTP_201_CREATED
+        )
     
     # Create dataset instance
     dataset = CSVDataset.objects.create(
         file_name=uploaded_file.name,
         file=uploaded_file,
         uploaded_by=request.user,
-        status='processing'
+        status='processing',
+        bytes_total=uploaded_file.size,
+        content_hash=content_hash
     )
     
+    # Hand off to the worker pool; status='processing' drives client polling
+    if background_processing_enabled():
+        return Response(
+            {
+                'message': 'CSV uploaded. Processing has started.',
+                'dataset_id': dataset.id,
+                'file_name': dataset.file_name,
+                'status': dataset.status
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+    
     # Process CSV
     processor = CSVProcessingService(dataset)
     success, error_message = processor.process()
@@ -87,26 +161,71 @@ def upload_csv(request):
 @permission_classes([IsAuthenticated])
 def list_datasets(request):
     """
-    List all datasets for the authenticated user.
+    List the authenticated user's datasets, newest first, one page at a time.
     
     GET /api/analytics/csv/datasets/
     
+    Query params:
+        view: "full" (default) or "summary". Summary rows carry only id,
+            file_name, uploaded_by_username, uploaded_at, row_count and
+            status; the statistics and error_log columns are not loaded.
+        limit: Page size (default DATASET_PAGE_SIZE, capped at DATASET_PAGE_MAX)
+        cursor: The "next" value from the previous page
+        include_total: "true" to also return the user's total dataset count
+    
     Returns:
         {
             "count": 5,
+            "next": "MjAyNi0wMi0wM1QxNDo0NTowMCswMDowMHw1",
             "datasets": [...]
         }
+    
+    "count" is the number of datasets on this page; "next" is null on the
+    last page.
     """
+    view = request.query_params.get('view', 'full')
+    if view not in ('full', 'summary'):
+        return Response(
+            {'error': 'view must be "full" or "summary".'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    page_size = getattr(settings, 'DATASET_PAGE_SIZE', 50)
+    page_max = getattr(settings, 'DATASET_PAGE_MAX', 500)
+    try:
+        limit = int(request.query_params.get('limit', page_size))
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return Response(
+            {'error': 'limit must be a positive integer.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    limit = min(limit, page_max)
+    
     datasets = CSVDataset.objects.filter(uploaded_by=request.user)
-    serializer = CSVDatasetSerializer(datasets, many=True)
     
-    return Response(
-        {
-            'count': datasets.count(),
-            'datasets': serializer.data
-        },
-        status=status.HTTP_200_OK
-    )
+    if view == 'summary':
+        serializer_class = CSVDatasetSummarySerializer
+        queryset = datasets.select_related('uploaded_by').only(*CSVDatasetSummarySerializer.SUMMARY_FIELDS)
+    else:
+        serializer_class = CSVDatasetSerializer
+        queryset = datasets.select_related('uploaded_by')
+    
+    try:
+        page, next_cursor = paginate_by_upload(queryset, request.query_params.get('cursor'), limit)
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    data = {
+        'count': len(page),
+        'next': next_cursor,
+        'datasets': serializer_class(page, many=True).data
+    }
+    if request.query_params.get('include_total', '').lower() in ('1', 'true'):
+        data['total'] = datasets.count()
+    
+    return Response(data, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
@@ -132,6 +251,35 @@ def retrieve_dataset(request, pk):
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_dataset_status(request, pk):
+    """
+    Get the processing status and progress of a dataset.
+    Cheap enough to poll while an upload is being processed.
+    
+    GET /api/analytics/datasets/{id}/status/
+    
+    Returns:
+        {
+            "id": 1,
+            "status": "processing",
+            "phase": "reading",
+            "progress": 42.5,
+            "rows_processed": 850000,
+            "bytes_read": 44040192,
+            "bytes_total": 103809024,
+            "error_log": null,
+            "processed_at": null
+        }
+    """
+    queryset = CSVDataset.objects.only(*CSVDatasetStatusSerializer.STATUS_FIELDS)
+    dataset = get_object_or_404(queryset, pk=pk, uploaded_by=request.user)
+    serializer = CSVDatasetStatusSerializer(dataset)
+    
+    return Response(serializer.data, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_dataset_statistics(request, pk):
@@ -160,6 +308,147 @@ def get_dataset_statistics(request, pk):
     return Response(dataset.statistics, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_dataset_histograms(request, pk):
+    """
+    Get the fixed-bin histograms computed when a dataset was processed.
+    Bins are equal-width over `range`; edge i is low + i * (high - low) / bins.
+    
+    GET /api/v1/analytics/datasets/{id}/histograms/?type=Pump
+    
+    Query params:
+        type: Equipment types to include (repeated or comma-separated; default all)
+    
+    Returns:
+        {
+            "dataset_id": 5,
+            "overall": {
+                "flowrate": {"range": [80.0, 410.2], "counts": [3, 9, ...]},
+                ...
+            },
+            "by_type": {
+                "Pump": {"flowrate": {"range": [...], "counts": [...]}, ...},
+                ...
+            }
+        }
+    """
+    queryset = CSVDataset.objects.only('id', 'status', 'statistics', 'uploaded_by')
+    dataset = get_object_or_404(queryset, pk=pk, uploaded_by=request.user)
+    
+    if dataset.status != 'completed':
+        return Response(
+            {'error': 'Dataset processing not completed.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    overall = (dataset.statistics or {}).get('overall_histograms')
+    if not overall:
+        return Response(
+            {'error': 'No histograms available for this dataset.'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    rows = TypeStatistic.objects.filter(dataset=dataset, histograms__isnull=False)
+    types = _list_param(request, 'type')
+    if types:
+        rows = rows.filter(equipment_type__in=types)
+    
+    return Response(
+        {
+            'dataset_id': dataset.id,
+            'overall': overall,
+            'by_type': dict(rows.order_by('equipment_type').values_list('equipment_type', 'histograms'))
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_dataset_series(request, pk):
+    """
+    Get a downsampled series of each numeric column for plotting.
+    
+    Rows are split into equal buckets in file order and each bucket keeps
+    its minimum and maximum, so peaks survive the reduction.
+    
+    GET /api/v1/analytics/datasets/{id}/series/?points=1000
+    
+    Query params:
+        points: Maximum points per series (default DATASET_SERIES_POINTS,
+            at most DATASET_SERIES_MAX_POINTS)
+        columns: Numeric columns to include, e.g. columns=Flowrate,Pressure
+        type: Equipment type(s) to keep, e.g. type=Pump,Valve
+    
+    Returns:
+        {
+            "dataset_id": 5,
+            "total_rows": 1000000,
+            "bucket_size": 2000,
+            "series": {
+                "Flowrate": {"x": [0, 1312, 2000, ...], "y": [51.2, 499.8, 77.1, ...]},
+                ...
+            }
+        }
+    """
+    queryset = CSVDataset.objects.only('id', 'status', 'row_count', 'file', 'uploaded_by')
+    dataset = get_object_or_404(queryset, pk=pk, uploaded_by=request.user)
+    
+    if dataset.status != 'completed':
+        return Response(
+            {'error': 'Dataset processing not completed.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    max_points = getattr(settings, 'DATASET_SERIES_MAX_POINTS', 10000)
+    try:
+        points = int(request.query_params.get('points', getattr(settings, 'DATASET_SERIES_POINTS', 1000)))
+        if not 2 <= points <= max_points:
+            raise ValueError
+    except ValueError:
+        return Response(
+            {'error': f'points must be an integer between 2 and {max_points}.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    types = _list_param(request, 'type')
+    batch_size = getattr(settings, 'CSV_CHUNK_SIZE', 100000)
+    
+    try:
+        # Datasets processed before TypeStatistic existed have no rows to sum
+        if types and dataset.type_statistics.exists():
+            total_rows = dataset.type_statistics.filter(
+                equipment_type__in=types
+            ).aggregate(total=Sum('count'))['total'] or 0
+        else:
+            total_rows = count_rows(dataset, types=types, batch_size=batch_size)
+        
+        result = downsample_series(
+            dataset,
+            total_rows,
+            points,
+            columns=_list_param(request, 'columns'),
+            types=types,
+            batch_size=batch_size
+        )
+    except DataQueryError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except Exception as e:
+        return Response(
+            {'error': f'Failed to read dataset: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    return Response(
+        {'dataset_id': dataset.id, 'total_rows': total_rows, **result},
+        status=status.HTTP_200_OK
+    )
+
+
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def delete_dataset(request, pk):
@@ -175,9 +464,9 @@ def delete_dataset(request, pk):
     """
     dataset = get_object_or_404(CSVDataset, pk=pk, uploaded_by=request.user)
     
-    # Delete the file from storage
-    if dataset.file:
-        dataset.file.delete(save=False)
+    # Delete the CSV, its sidecar and cached reports from storage
+    dataset.delete_files()
+    report_cache.clear(dataset.id)
     
     # Delete the database record
     dataset.delete()
@@ -233,12 +522,93 @@ def get_statistics(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+def get_type_statistics(request):
+    """
+    Aggregate per-type statistics across the user's completed datasets.
+    Computed by the database from the TypeStatistic table.
+    
+    GET /api/v1/analytics/statistics/types/?type=Pump&last=10
+    
+    Query params:
+        type: Equipment types to include (repeated or comma-separated; default all)
+        last: Only the N most recent completed datasets (default all)
+    
+    Returns:
+        {
+            "dataset_count": 10,
+            "by_type": {
+                "Pump": {
+                    "count": 500,
+                    "dataset_count": 10,
+                    "flowrate": {"avg": 245.6, "min": 80.0, "max": 410.2},
+                    ...
+                }
+            }
+        }
+    """
+    last = request.query_params.get('last')
+    try:
+        last = int(last) if last is not None else None
+        if last is not None and last < 1:
+            raise ValueError
+    except ValueError:
+        return Response(
+            {'error': 'last must be a positive integer.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    result = aggregate_type_statistics(request.user, types=_list_param(request, 'type'), last=last)
+    return Response(result, status=status.HTTP_200_OK)
+
+
+# Response formats whose rows are streamed batch by batch
+STREAMING_FORMATS = {
+    'ndjson': stream_ndjson,
+    'arrow': stream_arrow,
+    'parquet': stream_parquet,
+}
+
+
+def _list_param(request, name):
+    """
+    Read a list query parameter given either repeated or comma-separated.
+    
+    Returns:
+        list: Non-empty values in request order
+    """
+    values = []
+    for raw in request.query_params.getlist(name):
+        values.extend(value.strip() for value in raw.split(',') if value.strip())
+    return values
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, NDJSONRenderer, ArrowStreamRenderer, ParquetRenderer])
 def get_dataset_data(request, pk):
     """
     Get raw CSV data from a specific dataset.
     
     GET /api/analytics/datasets/{id}/data/
     
+    Query parameters (all optional):
+        offset: Number of matching rows to skip (default 0)
+        limit: Maximum number of rows to return (default all)
+        columns: Comma-separated columns to return, e.g. columns=Type,Flowrate
+        type: Equipment type(s) to keep, e.g. type=Pump,Valve
+        sort: Comma-separated sort columns, prefix '-' for descending
+    
+    Response headers:
+        X-Total-Count: Number of rows matching the type filter
+    
+    Streaming formats, selected with the Accept header or `?format=`:
+        application/x-ndjson (ndjson): newline-delimited JSON rows
+        application/vnd.apache.arrow.stream (arrow): Arrow IPC stream
+        application/vnd.apache.parquet (parquet): Parquet file
+    These read the dataset in batches of DATASET_STREAM_BATCH_SIZE rows and
+    write each batch as it goes. Sorting is not available when streaming
+    and no X-Total-Count header is sent.
+    
     Returns:
         List of equipment data rows
     """
@@ -251,15 +621,79 @@ def get_dataset_data(request, pk):
         )
     
     try:
-        import pandas as pd
-        df = pd.read_csv(dataset.file.path)
-        data = df.to_dict('records')
-        return Response(data, status=status.HTTP_200_OK)
+        offset = int(request.query_params.get('offset', 0))
+        limit = request.query_params.get('limit')
+        limit = int(limit) if limit is not None else None
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError
+    except ValueError:
+        return Response(
+            {'error': 'offset and limit must be non-negative integers.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    columns = _list_param(request, 'columns')
+    types = _list_param(request, 'type')
+    sort = _list_param(request, 'sort')
+    
+    response_format = request.accepted_renderer.format
+    if response_format in STREAMING_FORMATS:
+        if sort:
+            return Response(
+                {'error': 'sort is not supported when streaming.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # The sidecar already is the unfiltered Parquet file
+        unfiltered = not (columns or types or offset or limit is not None)
+        if response_format == 'parquet' and unfiltered and has_sidecar(dataset):
+            return FileResponse(
+                open(dataset.sidecar_path, 'rb'),
+                content_type=ParquetRenderer.media_type
+            )
+        
+        try:
+            batches = iter_batches(
+                dataset,
+                getattr(settings, 'DATASET_STREAM_BATCH_SIZE', 10000),
+                columns=columns,
+                types=types,
+                offset=offset,
+                limit=limit
+            )
+        except DataQueryError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return StreamingHttpResponse(
+            STREAMING_FORMATS[response_format](batches),
+            content_type=request.accepted_renderer.media_type
+        )
+    
+    try:
+        total, data = query_rows(
+            dataset,
+            columns=columns,
+            types=types,
+            sort=sort,
+            offset=offset,
+            limit=limit
+        )
+    except DataQueryError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     except Exception as e:
         return Response(
             {'error': f'Failed to read dataset: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+    
+    response = Response(data, status=status.HTTP_200_OK)
+    response['X-Total-Count'] = str(total)
+    return response
 
 
 @api_view(['GET'])
@@ -270,6 +704,14 @@ def generate_pdf_report(request, pk):
     
     GET /api/analytics/datasets/{id}/pdf-report/
     
+    Query params:
+        charts: 'raster' (matplotlib images) or 'vector' (drawn natively,
+            smaller and faster); defaults to PDF_CHART_FORMAT
+    
+    Finished reports are cached on disk and carry an ETag; a request whose
+    If-None-Match matches it gets 304 Not Modified. Large reports should be
+    requested as report jobs instead, which render in the background.
+    
     Returns:
         PDF file download
     """
@@ -281,12 +723,177 @@ def generate_pdf_report(request, pk):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Generate PDF
-    pdf_service = PDFReportService(dataset)
-    pdf_bytes = pdf_service.generate()
+    chart_format = request.query_params.get('charts') or getattr(settings, 'PDF_CHART_FORMAT', 'raster')
+    if chart_format not in PDFReportService.CHART_FORMATS:
+        return _chart_format_error()
+    
+    digest = report_cache.report_digest(dataset, PDFReportService.TEMPLATE_VERSION, chart_format)
+    if _etag_matches(request, digest):
+        return _not_modified(digest)
+    
+    # Generate PDF on a cache miss
+    path = report_cache.get_or_render(
+        dataset.id,
+        digest,
+        lambda output: PDFReportService(dataset, chart_format).generate(output),
+        variant=chart_format
+    )
+    
+    return _pdf_response(path, dataset.id, digest)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_report_job(request, pk):
+    """
+    Queue PDF report generation for a dataset on the background worker pool.
+    Poll the job's status, then download the finished report.
+    
+    POST /api/analytics/datasets/{id}/reports/
+    
+    Body (optional):
+        {"charts": "vector"}
+    
+    Returns:
+        The report job (202 while it is queued, 201 if the report was
+        already cached or was generated inline)
+    """
+    dataset = get_object_or_404(CSVDataset, pk=pk, uploaded_by=request.user)
+    
+    if dataset.status != 'completed':
+        return Response(
+            {'error': 'Cannot generate PDF for incomplete dataset.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    serializer = ReportJobCreateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {'error': 'Invalid report request.', 'details': serializer.errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
-    # Create HTTP response with PDF
-    response = HttpResponse(pdf_bytes, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="equipment_report_{dataset.id}.pdf"'
+    chart_format = (
+        serializer.validated_data.get('charts')
+        or request.query_params.get('charts')
+        or getattr(settings, 'PDF_CHART_FORMAT', 'raster')
+    )
+    if chart_format not in PDFReportService.CHART_FORMATS:
+        return _chart_format_error()
+    
+    digest = report_cache.report_digest(dataset, PDFReportService.TEMPLATE_VERSION, chart_format)
+    
+    # A cached report is ready right away
+    if report_cache.cached_path(dataset.id, digest, chart_format):
+        now = timezone.now()
+        job = ReportJob.objects.create(
+            dataset=dataset,
+            chart_format=chart_format,
+            digest=digest,
+            status='completed',
+            started_at=now,
+            heartbeat_at=now,
+            completed_at=now
+        )
+        return Response(ReportJobSerializer(job).data, status=status.HTTP_201_CREATED)
+    
+    job = ReportJob.objects.create(dataset=dataset, chart_format=chart_format, digest=digest)
+    
+    # Hand off to the worker pool; status='processing' drives client polling
+    if background_processing_enabled():
+        return Response(ReportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
     
+    now = timezone.now()
+    ReportJob.objects.filter(pk=job.pk).update(started_at=now, heartbeat_at=now)
+    process_report_job(job.pk, chart_processes=None)
+    job.refresh_from_db()
+    return Response(ReportJobSerializer(job).data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_report_job(request, pk):
+    """
+    Get the status of a report job.
+    
+    GET /api/analytics/reports/{id}/
+    
+    Returns:
+        {
+            "id": 3,
+            "dataset_id": 5,
+            "chart_format": "raster",
+            "status": "processing",
+            "error_log": null,
+            "created_at": "...",
+            "started_at": "...",
+            "completed_at": null
+        }
+    """
+    job = get_object_or_404(ReportJob, pk=pk, dataset__uploaded_by=request.user)
+    return Response(ReportJobSerializer(job).data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def download_report_job(request, pk):
+    """
+    Download the PDF produced by a completed report job.
+    
+    GET /api/analytics/reports/{id}/download/
+    
+    Returns:
+        PDF file download (with the same ETag as the pdf-report endpoint)
+    """
+    job = get_object_or_404(ReportJob, pk=pk, dataset__uploaded_by=request.user)
+    
+    if job.status != 'completed':
+        return Response(
+            {'error': 'Report is not ready.', 'status': job.status, 'error_log': job.error_log},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if _etag_matches(request, job.digest):
+        return _not_modified(job.digest)
+    
+    path = report_cache.cached_path(job.dataset_id, job.digest, job.chart_format)
+    if path is None:
+        # Replaced by a newer render after the dataset was reprocessed
+        return Response(
+            {'error': 'Report is no longer available. Create a new report job.'},
+            status=status.HTTP_410_GONE
+        )
+    
+    return _pdf_response(path, job.dataset_id, job.digest)
+
+
+def _chart_format_error():
+    return Response(
+        {'error': f"charts must be one of: {', '.join(PDFReportService.CHART_FORMATS)}."},
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+
+def _etag_matches(request, digest):
+    """Return True if the request's If-None-Match covers the report digest."""
+    if_none_match = request.headers.get('If-None-Match')
+    return bool(if_none_match) and bool(set(parse_etags(if_none_match)) & {quote_etag(digest), '*'})
+
+
+def _not_modified(digest):
+    response = HttpResponseNotModified()
+    response['ETag'] = quote_etag(digest)
+    return response
+
+
+def _pdf_response(path, dataset_id, digest):
+    """Stream a cached report as a PDF attachment."""
+    response = FileResponse(
+        open(path, 'rb'),
+        content_type='application/pdf',
+        as_attachment=True,
+        filename=f'equipment_report_{dataset_id}.pdf'
+    )
+    response['ETag'] = quote_etag(digest)
+    response['Cache-Control'] = 'private, no-cache'
     return response
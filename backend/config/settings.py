@@ -126,6 +126,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'users.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -141,6 +142,19 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Token lookups are cached so authenticated requests skip the database.
+# LocMemCache is per process: with several server processes, use a shared
+# backend (Redis, Memcached) so revoked tokens are dropped everywhere at once.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+AUTH_TOKEN_CACHE_TIMEOUT = 30  # Seconds a token lookup stays cached (bounds how long a revoked token works in other processes)
+AUTH_TOKEN_LIFETIME = 7 * 24 * 3600  # Seconds a token stays valid after login
+AUTH_TOKEN_MAX_PER_USER = 10  # Signed-in clients per user; a further login revokes the oldest token
+
 # CORS settings for React frontend
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:3000',
@@ -164,12 +178,50 @@ CORS_ALLOW_HEADERS = [
     'authorization',
     'content-type',
     'dnt',
+    'if-none-match',
     'origin',
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
 ]
 
+CORS_EXPOSE_HEADERS = [
+    'etag',
+    'x-total-count',
+]
+
 # CSV Upload settings
 MAX_DATASETS_PER_USER = 5
+DATASET_PAGE_SIZE = 50  # Datasets per page in the dataset list API
+DATASET_PAGE_MAX = 500  # Largest page a client may request with ?limit=
 CSV_REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+# Largest accepted CSV in bytes (200MB unless set in the environment). Every user keeps up to
+# MAX_DATASETS_PER_USER uploads, so this also bounds each user's storage. File parts of the
+# upload are spooled to disk past FILE_UPLOAD_MAX_MEMORY_SIZE and are not subject to
+# DATA_UPLOAD_MAX_MEMORY_SIZE; a proxy in front of Django needs a body limit at least this large
+# (e.g. nginx client_max_body_size).
+CSV_MAX_UPLOAD_SIZE = int(os.environ.get('CSV_MAX_UPLOAD_SIZE', 200 * 1024 * 1024))
+CSV_STREAMING_THRESHOLD = 10 * 1024 * 1024  # Files above 10MB are read in chunks
+CSV_CHUNK_SIZE = 100000  # Rows per chunk in streaming mode
+CSV_QUANTILE_SKETCH_K = 200  # Quantile sketch size per type and column (~1% rank error)
+CSV_QUANTILE_EXACT_ROWS = 500000  # Rows buffered verbatim for exact percentiles; larger files fall back to sketches
+CSV_HISTOGRAM_BINS = 20  # Equal-width bins per histogram
+PARQUET_COMPRESSION = 'zstd'  # Codec for the columnar sidecar written next to each upload
+PARQUET_ROW_GROUP_SIZE = 65536  # Rows per sidecar row group; a data page reads only the groups it spans
+DATASET_STREAM_BATCH_SIZE = 10000  # Rows read per batch when streaming dataset rows
+DATASET_SERIES_POINTS = 1000  # Default points per downsampled plotting series
+DATASET_SERIES_MAX_POINTS = 10000
+
+# Background processing (run workers with `python manage.py process_uploads`)
+CSV_BACKGROUND_PROCESSING = True  # False processes uploads inside the request
+CSV_WORKER_PROCESSES = 2
+CSV_WORKER_POLL_INTERVAL = 1.0  # Seconds between queue checks when idle
+CSV_JOB_STALE_AFTER = 3600  # Seconds since a claimed job's last heartbeat before it can be reclaimed
+CSV_SWEEP_INTERVAL = 60  # Seconds between sweeps of files from expired datasets
+CSV_SWEEP_BATCH_SIZE = 500  # Queued file deletions handled per sweep
+CSV_PROGRESS_INTERVAL = 1.0  # Minimum seconds between progress writes while processing
+PDF_CHART_FORMAT = 'raster'  # Default report charts: 'raster' (matplotlib PNGs) or 'vector' (reportlab drawings)
+PDF_REPORT_CACHE_DIR = MEDIA_ROOT / 'report_cache'  # Generated PDF reports, keyed by dataset and content digest
+PDF_CHART_PROCESSES = 4  # Processes rendering report charts in parallel (capped at the CPU count; 1 renders in the request)
+PDF_REPORT_JOB_TTL = 86400  # Seconds finished report jobs are kept
+PDF_CHART_CACHE_BYTES = 64 * 1024 * 1024  # Memory for memoized chart renders shared by all reports (LRU)
@@ -24,5 +24,5 @@ def home(request):
             }
         },
         'documentation': 'See README.md for full documentation',
-        'authentication': 'All endpoints (except login) require HTTP Basic Authentication'
+        'authentication': 'All endpoints (except login) require the Bearer token returned by login'
     })
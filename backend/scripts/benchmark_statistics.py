@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+"""
+Script Name: benchmark_statistics.py
+Purpose: Compare the legacy per-group loop in compute_statistics with the
+         single-pass groupby().agg() implementation on synthetic data.
+"""
+
+import os
+import sys
+import time
+import argparse
+import django
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from analytics.services import CSVProcessingService
+
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+DEFAULT_TYPES = [10, 1_000, 50_000]
+
+
+def legacy_compute_statistics(df):
+    """Previous implementation: a Python loop with nine scans per group."""
+    type_statistics = {}
+    for equipment_type, group in df.groupby('Type'):
+        type_statistics[equipment_type] = {
+            'count': len(group),
+            'flowrate': {
+                'avg': round(float(group['Flowrate'].mean()), 2),
+                'min': round(float(group['Flowrate'].min()), 2),
+                'max': round(float(group['Flowrate'].max()), 2),
+            },
+            'pressure': {
+                'avg': round(float(group['Pressure'].mean()), 2),
+                'min': round(float(group['Pressure'].min()), 2),
+                'max': round(float(group['Pressure'].max()), 2),
+            },
+            'temperature': {
+                'avg': round(float(group['Temperature'].mean()), 2),
+                'min': round(float(group['Temperature'].min()), 2),
+                'max': round(float(group['Temperature'].max()), 2),
+            }
+        }
+
+    return {
+        'total_equipment_count': len(df),
+        'by_type': type_statistics,
+        'overall_averages': {
+            'flowrate': round(float(df['Flowrate'].mean()), 2),
+            'pressure': round(float(df['Pressure'].mean()), 2),
+            'temperature': round(float(df['Temperature'].mean()), 2),
+        }
+    }
+
+
+def legacy_view(statistics):
+    """Keep only the fields the legacy implementation produced."""
+    return {
+        'total_equipment_count': statistics['total_equipment_count'],
+        'by_type': {
+            equipment_type: {
+                'count': entry['count'],
+                **{
+                    parameter: {key: entry[parameter][key] for key in ('avg', 'min', 'max')}
+                    for parameter in ('flowrate', 'pressure', 'temperature')
+                },
+            }
+            for equipment_type, entry in statistics['by_type'].items()
+        },
+        'overall_averages': statistics['overall_averages'],
+    }
+
+
+def make_frame(rows, types, seed=42):
+    """Build a synthetic equipment DataFrame with the given shape."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Equipment Name': np.arange(rows).astype(str),
+        'Type': np.char.add('Type-', rng.integers(0, types, rows).astype(str)),
+        'Flowrate': rng.uniform(50, 500, rows),
+        'Pressure': rng.uniform(1, 20, rows),
+        'Temperature': rng.uniform(20, 300, rows),
+    })
+
+
+def best_of(func, df, repeat):
+    """Return the fastest wall-clock time of `repeat` runs and the last result."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--types', type=int, nargs='+', default=DEFAULT_TYPES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skip-legacy', action='store_true',
+                        help='Only time the vectorized implementation')
+    args = parser.parse_args()
+
+    service = CSVProcessingService(dataset_instance=None)
+
+    print(f"{'rows':>10} {'types':>8} {'legacy (s)':>12} {'agg (s)':>10} {'speedup':>9}")
+    print('-' * 53)
+
+    for rows in args.rows:
+        for types in args.types:
+            df = make_frame(rows, types)
+            new_time, new_result = best_of(service.compute_statistics, df, args.repeat)
+
+            if args.skip_legacy:
+                print(f"{rows:>10} {types:>8} {'-':>12} {new_time:>10.4f} {'-':>9}")
+                continue
+
+            old_time, old_result = best_of(legacy_compute_statistics, df, args.repeat)
+            if old_result != legacy_view(new_result):
+                print(f"⚠️ Results differ for rows={rows}, types={types}")
+
+            print(f"{rows:>10} {types:>8} {old_time:>12.4f} {new_time:>10.4f} "
+                  f"{old_time / new_time:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Tests for bearer token authentication in users.authentication.
+"""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from users.models import AuthToken, token_cache_key
+
+LOGIN_URL = '/api/v1/auth/login/'
+LOGOUT_URL = '/api/v1/auth/logout/'
+PROFILE_URL = '/api/v1/auth/profile/'
+
+
+class CachedTokenAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='tokens', password='tokens123')
+
+    def login(self):
+        """Log in as a separate client and return it with its token."""
+        client = APIClient()
+        response = client.post(LOGIN_URL, {'username': 'tokens', 'password': 'tokens123'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['token']}")
+        return client, response.data['token']
+
+    def test_each_login_gets_its_own_token(self):
+        _, laptop_token = self.login()
+        _, desktop_token = self.login()
+        self.assertNotEqual(laptop_token, desktop_token)
+        self.assertEqual(AuthToken.objects.filter(user=self.user).count(), 2)
+
+    def test_logout_revokes_only_the_calling_token(self):
+        laptop, laptop_token = self.login()
+        desktop, _ = self.login()
+        # Both lookups are cached
+        self.assertEqual(laptop.get(PROFILE_URL).status_code, 200)
+        self.assertEqual(desktop.get(PROFILE_URL).status_code, 200)
+
+        self.assertEqual(laptop.post(LOGOUT_URL).status_code, 200)
+
+        self.assertIsNone(cache.get(token_cache_key(laptop_token)))
+        self.assertEqual(laptop.get(PROFILE_URL).status_code, 401)
+        self.assertEqual(desktop.get(PROFILE_URL).status_code, 200)
+
+    def test_deactivated_user_is_rejected_despite_cached_token(self):
+        client, _ = self.login()
+        self.assertEqual(client.get(PROFILE_URL).status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(client.get(PROFILE_URL).status_code, 401)
+
+    def test_expired_token_is_rejected_despite_cached_lookup(self):
+        client, token = self.login()
+        self.assertEqual(client.get(PROFILE_URL).status_code, 200)
+
+        AuthToken.objects.filter(key=token).update(expires_at=timezone.now() - timedelta(seconds=1))
+        cached = cache.get(token_cache_key(token))
+        cached.expires_at = timezone.now() - timedelta(seconds=1)
+        cache.set(token_cache_key(token), cached)
+
+        response = client.get(PROFILE_URL)
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(AuthToken.objects.filter(key=token).exists())
+
+    def test_login_deletes_expired_tokens(self):
+        other = User.objects.create_user(username='other', password='other123')
+        stale = AuthToken.objects.create(user=other, expires_at=timezone.now() - timedelta(days=1))
+
+        _, token = self.login()
+
+        self.assertFalse(AuthToken.objects.filter(key=stale.key).exists())
+        self.assertGreater(AuthToken.objects.get(key=token).expires_at, timezone.now() + timedelta(days=6))
+
+    @override_settings(AUTH_TOKEN_MAX_PER_USER=2)
+    def test_login_revokes_the_oldest_tokens_beyond_the_limit(self):
+        oldest, _ = self.login()
+        AuthToken.objects.update(created=timezone.now() - timedelta(hours=1))
+        _, second = self.login()
+        newest, newest_token = self.login()
+
+        self.assertEqual(set(AuthToken.objects.values_list('key', flat=True)), {second, newest_token})
+        self.assertEqual(oldest.get(PROFILE_URL).status_code, 401)
+        self.assertEqual(newest.get(PROFILE_URL).status_code, 200)
@@ -0,0 +1,124 @@
+"""
+Tests for sidecar queries in analytics.columnar.
+"""
+import shutil
+import tempfile
+from unittest import mock
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from analytics.columnar import DataQueryError, iter_batches, query_rows
+from analytics.models import CSVDataset
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+CSV = (
+    "Equipment Name,Type,Flowrate,Pressure,Temperature\n"
+    "Pump-1,1,100,5.0,110\n"
+    "Pump-2,2,120,5.5,115\n"
+    "Pump-3,1,140,6.0,120\n"
+)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class TypeFilterTests(TestCase):
+    """Filtering by type works whether Type is stored as text or as int64."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        user = User.objects.create_user(username='columnar', password='columnar')
+        self.dataset = CSVDataset.objects.create(
+            file_name='numeric_types.csv',
+            file=ContentFile(CSV.encode('utf-8'), name='numeric_types.csv'),
+            uploaded_by=user,
+            status='completed'
+        )
+
+    def assertFiltered(self):
+        total, rows = query_rows(self.dataset, columns=['Equipment Name'], types=['1'])
+        self.assertEqual(total, 2)
+        self.assertEqual([row['Equipment Name'] for row in rows], ['Pump-1', 'Pump-3'])
+
+        batches = list(iter_batches(self.dataset, 2, columns=['Equipment Name'], types=['1']))
+        self.assertEqual(sum(batch.num_rows for batch in batches), 2)
+
+    def test_backfilled_sidecar(self):
+        self.assertFiltered()
+        stored = pq.read_schema(self.dataset.sidecar_path).field('Type').type
+        self.assertTrue(pa.types.is_string(stored) or pa.types.is_large_string(stored), stored)
+
+    def test_int64_sidecar(self):
+        table = pa.table({
+            'Equipment Name': ['Pump-1', 'Pump-2', 'Pump-3'],
+            'Type': pa.array([1, 2, 1], type=pa.int64()),
+            'Flowrate': [100.0, 120.0, 140.0],
+            'Pressure': [5.0, 5.5, 6.0],
+            'Temperature': [110.0, 115.0, 120.0],
+        })
+        pq.write_table(table, self.dataset.sidecar_path)
+        self.assertFiltered()
+
+
+PAGED_CSV = (
+    "Equipment Name,Type,Flowrate,Pressure,Temperature\n"
+    + "".join(f"Unit-{i},{['Pump', 'Valve', 'Reactor'][i % 3]},{100 + i},{5 + i / 10},{110 + i}\n" for i in range(95))
+)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, PARQUET_ROW_GROUP_SIZE=10)
+class QueryPageTests(TestCase):
+    """Unsorted pages read only the row groups that hold them."""
+
+    def setUp(self):
+        user = User.objects.create_user(username='columnar', password='columnar')
+        self.dataset = CSVDataset.objects.create(
+            file_name='paged.csv',
+            file=ContentFile(PAGED_CSV.encode('utf-8'), name='paged.csv'),
+            uploaded_by=user,
+            status='completed'
+        )
+        # Backfill the sidecar, in row groups of 10
+        query_rows(self.dataset, limit=1)
+        self.names = [f'Unit-{i}' for i in range(95)]
+
+    def read_page(self, **kwargs):
+        with mock.patch.object(pq.ParquetFile, 'read_row_groups', autospec=True,
+                               side_effect=pq.ParquetFile.read_row_groups) as read_row_groups:
+            total, rows = query_rows(self.dataset, columns=['Equipment Name'], **kwargs)
+        groups = [list(call.args[1]) for call in read_row_groups.call_args_list]
+        return total, [row['Equipment Name'] for row in rows], groups
+
+    def test_page_reads_its_row_groups(self):
+        total, names, groups = self.read_page(offset=25, limit=10)
+        self.assertEqual(total, 95)
+        self.assertEqual(names, self.names[25:35])
+        self.assertEqual(groups, [[2, 3]])
+
+    def test_filtered_page(self):
+        total, names, groups = self.read_page(types=['Valve'], offset=5, limit=4)
+        self.assertEqual(total, 32)
+        self.assertEqual(names, self.names[1::3][5:9])
+        self.assertEqual(groups, [[1, 2]])
+
+    def test_page_past_the_end(self):
+        total, names, groups = self.read_page(types=['Pump'], offset=40)
+        self.assertEqual((total, names, groups), (32, [], []))
+
+        total, names, _ = self.read_page(offset=90)
+        self.assertEqual((total, names), (95, self.names[90:]))
+
+    def test_sorted_page(self):
+        total, rows = query_rows(self.dataset, columns=['Equipment Name'], sort=['-Flowrate'], limit=2)
+        self.assertEqual((total, [row['Equipment Name'] for row in rows]), (95, ['Unit-94', 'Unit-93']))
+
+    def test_empty_sort_key(self):
+        with self.assertRaisesMessage(DataQueryError, 'Sort keys must name a column'):
+            query_rows(self.dataset, sort=['-'])
@@ -0,0 +1,129 @@
+"""
+Tests for the background processing jobs in analytics.jobs.
+"""
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from analytics.jobs import claim_next_dataset, claim_next_report_job, process_dataset
+from analytics.models import CSVDataset, ReportJob, TypeStatistic
+from analytics.services import CSVProcessingService, ProgressReporter
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+CSV = (
+    "Equipment Name,Type,Flowrate,Pressure,Temperature\n"
+    + "".join(f"Unit-{i},{'Pump' if i % 2 else 'Valve'},{100 + i},{5 + i / 10},{110 + i}\n" for i in range(10))
+)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, CSV_PROGRESS_INTERVAL=0, MAX_DATASETS_PER_USER=2)
+class ProcessDatasetTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='jobs', password='jobs')
+
+    def create_dataset(self, status='processing'):
+        return CSVDataset.objects.create(
+            file_name='equipment.csv',
+            file=ContentFile(CSV.encode('utf-8'), name='equipment.csv'),
+            uploaded_by=self.user,
+            status=status
+        )
+
+    def delete_during(self, dataset, method, calls=1):
+        """Patch a CSVProcessingService method to delete the dataset on its nth call."""
+        original = getattr(CSVProcessingService, method)
+        seen = []
+
+        def wrapper(service, *args, **kwargs):
+            seen.append(1)
+            if len(seen) == calls:
+                CSVDataset.objects.filter(pk=dataset.pk).delete()
+            return original(service, *args, **kwargs)
+
+        return mock.patch.object(CSVProcessingService, method, wrapper)
+
+    def assertNotResurrected(self, dataset, result):
+        self.assertEqual(result, (dataset.pk, False, 'Dataset no longer exists.'))
+        self.assertFalse(CSVDataset.objects.filter(pk=dataset.pk).exists())
+        self.assertFalse(TypeStatistic.objects.filter(dataset_id=dataset.pk).exists())
+        self.assertFalse(os.path.exists(dataset.sidecar_path))
+
+    def test_deleted_while_reading(self):
+        dataset = self.create_dataset()
+        # Streaming in 3-row chunks: the row disappears before the second chunk
+        with self.settings(CSV_STREAMING_THRESHOLD=0, CSV_CHUNK_SIZE=3):
+            with self.delete_during(dataset, 'validate_csv', calls=2):
+                result = process_dataset(dataset.pk)
+        self.assertNotResurrected(dataset, result)
+
+    def test_deleted_before_results_are_saved(self):
+        dataset = self.create_dataset()
+        with self.delete_during(dataset, 'compute_statistics'):
+            result = process_dataset(dataset.pk)
+        self.assertNotResurrected(dataset, result)
+
+    def test_retention_waits_for_processing_datasets(self):
+        queued = self.create_dataset()
+        newer = [self.create_dataset(status='completed') for _ in range(2)]
+        # Past the limit, but still waiting for the worker
+        self.assertTrue(CSVDataset.objects.filter(pk=queued.pk).exists())
+
+        self.assertEqual(process_dataset(queued.pk), (queued.pk, True, None))
+
+        remaining = set(CSVDataset.objects.values_list('pk', flat=True))
+        self.assertEqual(remaining, {dataset.pk for dataset in newer})
+
+
+@override_settings(CSV_JOB_STALE_AFTER=60)
+class ClaimTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='claims', password='claims')
+
+    def claimed_dataset(self, seconds_ago):
+        return CSVDataset.objects.create(
+            file_name='equipment.csv',
+            file='csv_uploads/equipment.csv',
+            uploaded_by=self.user,
+            processing_started_at=timezone.now() - timedelta(seconds=seconds_ago)
+        )
+
+    def test_progress_keeps_a_long_running_claim(self):
+        # Claimed two hours ago but still reporting progress
+        dataset = self.claimed_dataset(7200)
+        ProgressReporter(dataset, interval=0).update(rows_processed=1000, bytes_read=4096)
+
+        self.assertIsNone(claim_next_dataset())
+        dataset.refresh_from_db()
+        self.assertEqual(dataset.rows_processed, 1000)
+
+    def test_silent_claim_is_reclaimed(self):
+        dataset = self.claimed_dataset(120)
+        self.assertEqual(claim_next_dataset(), dataset.pk)
+        self.assertIsNone(claim_next_dataset())
+
+    def test_report_job_heartbeat(self):
+        dataset = self.claimed_dataset(0)
+        long_ago = timezone.now() - timedelta(hours=2)
+        job = ReportJob.objects.create(dataset=dataset, digest='0' * 64)
+        ReportJob.objects.filter(pk=job.pk).update(started_at=long_ago, heartbeat_at=timezone.now())
+        self.assertIsNone(claim_next_report_job())
+
+        ReportJob.objects.filter(pk=job.pk).update(heartbeat_at=long_ago)
+        self.assertEqual(claim_next_report_job(), job.pk)
+        job.refresh_from_db()
+        self.assertGreater(job.started_at, long_ago)
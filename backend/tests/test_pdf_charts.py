@@ -0,0 +1,134 @@
+"""
+Tests for the raster report charts in analytics.pdf_charts.
+"""
+import sys
+from io import BytesIO
+from types import SimpleNamespace
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from reportlab.pdfgen import canvas
+
+from analytics import pdf_charts
+from analytics.pdf_charts import ChartCache, ChartImage, render_chart_png, render_report_charts
+from analytics.services import CSVProcessingService
+
+
+def chart_statistics(rows=60, types=3):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'Equipment Name': [f'Unit-{i}' for i in range(rows)],
+        'Type': [f'Type-{i % types}' for i in range(rows)],
+        'Flowrate': rng.normal(100, 10, rows),
+        'Pressure': rng.normal(5, 1, rows),
+        'Temperature': rng.normal(110, 5, rows),
+    })
+    return CSVProcessingService(SimpleNamespace()).compute_statistics(df)
+
+
+class ChartImageTests(SimpleTestCase):
+
+    def test_render_chart_png_returns_owned_bytes(self):
+        png, width, height = render_chart_png('bar', chart_statistics())
+        self.assertTrue(png.startswith(b'\x89PNG'))
+        self.assertGreater(width, 0)
+        self.assertGreater(height, 0)
+
+    def render(self, cache_bytes):
+        with mock.patch.object(pdf_charts, '_chart_cache', ChartCache(cache_bytes)):
+            chart = render_report_charts(chart_statistics(), names=['pie'])['pie']
+            cache = pdf_charts._chart_cache
+        self.assertIsInstance(chart, ChartImage)
+        return chart, cache
+
+    def test_cached_chart_does_not_pin_the_cache(self):
+        chart, cache = self.render(64 * 1024 * 1024)
+        self.assertIsNone(chart.png)
+        self.assertEqual(cache.size, len(next(iter(cache._entries.values()))[0]))
+
+        # Evicted before the report is drawn: the chart renders itself again
+        with mock.patch.object(pdf_charts, '_chart_cache', ChartCache(64 * 1024 * 1024)) as fresh:
+            chart.drawOn(canvas.Canvas(BytesIO()), 0, 0)
+        self.assertEqual(len(fresh._entries), 1)
+
+    def test_uncached_chart_releases_its_bytes(self):
+        # Nothing fits the cache, so the chart is the only owner of its PNG
+        chart, cache = self.render(0)
+        self.assertEqual(cache.size, 0)
+        png = chart.png
+        self.assertIsNotNone(png)
+        references = sys.getrefcount(png)
+
+        chart.drawOn(canvas.Canvas(BytesIO()), 0, 0)
+        self.assertIsNone(chart.png)
+        self.assertEqual(sys.getrefcount(png), references - 1)
+
+
+class ChartCacheTests(SimpleTestCase):
+
+    @staticmethod
+    def chart(nbytes):
+        return b'x' * nbytes, 100, 100
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        cache = ChartCache(max_bytes=100)
+        cache.put('a', self.chart(40))
+        cache.put('b', self.chart(40))
+        cache.get('a')
+        cache.put('c', self.chart(40))
+
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertEqual(cache.size, 80)
+
+        # One large chart pushes out everything older
+        cache.put('d', self.chart(100))
+        self.assertEqual(list(cache._entries), ['d'])
+        self.assertEqual(cache.size, 100)
+
+    def test_oversized_chart_is_not_cached(self):
+        cache = ChartCache(max_bytes=100)
+        cache.put('a', self.chart(50))
+        cache.put('big', self.chart(101))
+        self.assertIsNone(cache.get('big'))
+        self.assertEqual(cache.size, 50)
+
+    def test_replacing_a_chart_updates_the_size(self):
+        cache = ChartCache(max_bytes=100)
+        cache.put('a', self.chart(50))
+        cache.put('a', self.chart(20))
+        self.assertEqual(cache.size, 20)
+        self.assertEqual(len(cache.get('a')[0]), 20)
+
+
+class ParallelRenderingTests(SimpleTestCase):
+
+    NAMES = ['bar', 'pie', 'heatmap']
+
+    def render(self, workers):
+        with mock.patch.object(pdf_charts, '_chart_cache', ChartCache(64 * 1024 * 1024)) as cache:
+            render_report_charts(chart_statistics(), workers=workers, names=self.NAMES)
+        # Charts read their PNG back from the cache when drawn
+        return {name: value for (name, _, _), value in cache._entries.items()}
+
+    def test_pool_renders_the_same_charts(self):
+        try:
+            parallel = self.render(workers=2)
+        finally:
+            pdf_charts._reset_executor()
+        self.assertEqual(parallel, self.render(workers=0))
+
+    def test_broken_pool_falls_back_to_this_process(self):
+        broken = mock.Mock()
+        broken.map.side_effect = BrokenProcessPool('worker died')
+        with mock.patch.object(pdf_charts, '_get_executor', return_value=broken), \
+                mock.patch.object(pdf_charts, '_reset_executor') as reset:
+            charts = self.render(workers=2)
+        broken.map.assert_called_once()
+        reset.assert_called_once()
+        self.assertEqual(set(charts), set(self.NAMES))
+        self.assertTrue(all(png.startswith(b'\x89PNG') for png, _, _ in charts.values()))
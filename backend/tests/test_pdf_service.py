@@ -0,0 +1,73 @@
+"""
+Tests for PDF report generation in analytics.pdf_service.
+"""
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from reportlab.graphics.shapes import Drawing
+
+from analytics import pdf_charts
+from analytics.models import CSVDataset
+from analytics.pdf_charts import ChartCache, REPORT_CHARTS, render_chart_png
+from analytics.pdf_service import PDFReportService
+from analytics.pdf_vector_charts import VECTOR_CHARTS, render_vector_charts
+from analytics.services import CSVProcessingService
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+CSV = (
+    "Equipment Name,Type,Flowrate,Pressure,Temperature\n"
+    + "".join(f"Unit-{i},Type-{i % 4},{100 + i % 13},{5 + i % 7 / 10},{110 + i % 5}\n" for i in range(80))
+)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class VectorReportTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        user = User.objects.create_user('reporter')
+        self.dataset = CSVDataset.objects.create(
+            file_name='equipment.csv',
+            file=ContentFile(CSV.encode('utf-8'), name='equipment.csv'),
+            uploaded_by=user
+        )
+        success, error_message = CSVProcessingService(self.dataset).process()
+        self.assertTrue(success, error_message)
+        self.dataset.refresh_from_db()
+
+    def test_vector_charts_match_raster_sizes(self):
+        self.assertEqual(set(VECTOR_CHARTS), set(REPORT_CHARTS))
+        charts = render_vector_charts(self.dataset.statistics)
+        for name, chart in charts.items():
+            with self.subTest(chart=name):
+                self.assertIsInstance(chart, Drawing)
+                _, width, height = render_chart_png(name, self.dataset.statistics)
+                self.assertAlmostEqual(chart.width, width, delta=1)
+                self.assertAlmostEqual(chart.height, height, delta=1)
+
+    def test_charts_without_types_are_skipped(self):
+        charts = render_vector_charts({'by_type': {}})
+        self.assertEqual(charts, {name: None for name in VECTOR_CHARTS})
+
+    def test_vector_report_embeds_no_images(self):
+        vector = PDFReportService(self.dataset, chart_format='vector').generate()
+        with mock.patch.object(pdf_charts, '_chart_cache', ChartCache(0)):
+            raster = PDFReportService(self.dataset, chart_format='raster', chart_processes=1).generate()
+
+        self.assertTrue(vector.startswith(b'%PDF'))
+        self.assertNotIn(b'/Subtype /Image', vector)
+        self.assertIn(b'/Subtype /Image', raster)
+        self.assertLess(len(vector), len(raster))
+
+    def test_unknown_chart_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            PDFReportService(self.dataset, chart_format='svg')
@@ -0,0 +1,146 @@
+"""
+Query plan and query count checks for the per-user CSVDataset lookups.
+
+The table is filled with synthetic datasets spread across many users and
+ANALYZEd, so SQLite plans the lookups as it would for a large table. Each
+lookup must walk one of the composite indexes in order: lookups that only
+read indexed columns must be answered from the index alone (a covering
+index), and lookups that return whole rows must read the index without a
+sort step, so only the rows on the requested page are fetched from the table.
+"""
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from analytics.models import CSVDataset, FileDeletion, ReportJob, TypeStatistic, enforce_dataset_limit
+
+ROWS = 20_000
+USERS = 200
+STATUSES = ['completed', 'completed', 'completed', 'failed', 'processing']
+STATISTIC_COLUMNS = {
+    f'{parameter}_{stat}': 0.0
+    for parameter in TypeStatistic.PARAMETERS
+    for stat in ('mean', 'min', 'max')
+}
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Plan assertions use SQLite EXPLAIN QUERY PLAN output')
+@override_settings(MAX_DATASETS_PER_USER=5)
+class DatasetQueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create([User(username=f'plan_user_{i}') for i in range(USERS)])
+        owners = list(User.objects.filter(username__startswith='plan_user_').order_by('pk'))
+        now = timezone.now()
+
+        CSVDataset.objects.bulk_create([
+            CSVDataset(
+                file_name=f'dataset_{i}.csv',
+                file=f'csv_uploads/dataset_{i}.csv',
+                uploaded_by=owners[i % USERS],
+                uploaded_at=now - timedelta(minutes=i),
+                status=STATUSES[i % len(STATUSES)],
+                row_count=100,
+                statistics={'total_equipment_count': 100, 'by_type': {}, 'overall_averages': {}},
+            )
+            for i in range(ROWS)
+        ], batch_size=5000)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        cls.user = owners[0]
+
+    def assertPlan(self, queryset, index_name, covering=False):
+        """Assert the query searches `index_name` (alone, if covering) without sorting."""
+        plan = queryset.explain()
+        expected = f"USING COVERING INDEX {index_name}" if covering else f"USING INDEX {index_name}"
+        self.assertIn(expected, plan)
+        self.assertNotIn('TEMP B-TREE', plan.upper())
+
+    def history(self):
+        return CSVDataset.objects.filter(uploaded_by=self.user).order_by('-uploaded_at', '-id')
+
+    def test_list_first_page(self):
+        self.assertPlan(self.history()[:51], 'dataset_user_uploaded_idx')
+
+    def test_list_cursor_page(self):
+        cursor = self.history()[50]
+        page = self.history().filter(
+            Q(uploaded_at__lt=cursor.uploaded_at) | Q(uploaded_at=cursor.uploaded_at, id__lt=cursor.pk)
+        )[:51]
+        self.assertPlan(page, 'dataset_user_uploaded_idx')
+
+    def test_latest_completed(self):
+        latest = CSVDataset.objects.filter(uploaded_by=self.user, status='completed').order_by('-uploaded_at')[:1]
+        self.assertPlan(latest, 'dataset_user_status_idx')
+
+    def test_completed_ids_are_index_only(self):
+        # aggregate_type_statistics
+        ids = CSVDataset.objects.filter(
+            uploaded_by=self.user, status='completed'
+        ).order_by('-uploaded_at', '-id').values_list('pk', flat=True)[:10]
+        self.assertPlan(ids, 'dataset_user_status_idx', covering=True)
+
+    def test_retention_scan_is_index_only(self):
+        # enforce_dataset_limit
+        expired = self.history().values_list('pk', flat=True)[5:]
+        self.assertPlan(expired, 'dataset_user_uploaded_idx', covering=True)
+
+    def test_endpoint_query_counts(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        dataset_id = self.history().values_list('pk', flat=True).first()
+        budgets = [
+            ('/api/v1/analytics/datasets/', 1),
+            ('/api/v1/analytics/datasets/?view=summary', 1),
+            ('/api/v1/analytics/csv/statistics/', 1),
+            (f'/api/v1/analytics/datasets/{dataset_id}/status/', 1),
+        ]
+        for url, budget in budgets:
+            with self.subTest(url=url), CaptureQueriesContext(connection) as captured:
+                response = client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(len(captured.captured_queries), budget)
+
+
+@override_settings(MAX_DATASETS_PER_USER=2)
+class RetentionQueryTests(TestCase):
+
+    def test_retention_deletes_children_in_bulk(self):
+        user = User.objects.create_user('retention')
+        now = timezone.now()
+        CSVDataset.objects.bulk_create([
+            CSVDataset(
+                file_name=f'dataset_{i}.csv',
+                file=f'csv_uploads/dataset_{i}.csv',
+                uploaded_by=user,
+                uploaded_at=now - timedelta(minutes=i),
+                status='completed',
+            )
+            for i in range(6)
+        ])
+        expired = list(CSVDataset.objects.filter(uploaded_by=user).order_by('-uploaded_at')[2:])
+        for dataset in expired:
+            TypeStatistic.objects.bulk_create([
+                TypeStatistic(dataset=dataset, equipment_type=f'Type-{j}', count=1, **STATISTIC_COLUMNS)
+                for j in range(20)
+            ])
+            ReportJob.objects.create(dataset=dataset, digest='0' * 64)
+
+        # Id scan, file lookup, file queue insert and one DELETE per table
+        with self.assertNumQueries(6 + 2):  # + savepoint and release
+            enforce_dataset_limit(user.pk)
+
+        self.assertEqual(CSVDataset.objects.filter(uploaded_by=user).count(), 2)
+        self.assertFalse(TypeStatistic.objects.exists())
+        self.assertFalse(ReportJob.objects.exists())
+        self.assertEqual(FileDeletion.objects.count(), 4)
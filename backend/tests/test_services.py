@@ -0,0 +1,212 @@
+"""
+Tests for CSV processing in analytics.services.
+"""
+import io
+import os
+import math
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from analytics.models import CSVDataset, TypeStatistic
+from analytics.services import CSVProcessingService, merge_statistics
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+NUMERIC_TYPES_CSV = (
+    "Equipment Name,Type,Flowrate,Pressure,Temperature\n"
+    + "".join(
+        f"Unit-{i},{equipment_type},{100 + i},{5 + i / 10},{110 + i}\n"
+        for i, equipment_type in enumerate(['1', '2', '10', '2', '10', '1', '10', '3'] * 5)
+    )
+)
+
+
+def large_csv(rows=5_000, seed=0):
+    """Several thousand rows over a few types, each far above the sketch size."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Equipment Name': [f'Unit-{i}' for i in range(rows)],
+        'Type': rng.choice(['Pump', 'Valve', 'Reactor'], rows),
+        'Flowrate': rng.normal(100, 10, rows).round(3),
+        'Pressure': (rng.random(rows) * 10).round(3),
+        'Temperature': rng.normal(110, 5, rows).round(3),
+    }).to_csv(index=False)
+
+
+class ComputeStatisticsTests(SimpleTestCase):
+    """The grouped aggregation must match statistics computed type by type."""
+
+    def test_by_type_matches_per_group_reference(self):
+        df = pd.read_csv(io.StringIO(large_csv(rows=2_000)), dtype={'Type': str})
+        statistics = CSVProcessingService(None).compute_statistics(df)
+
+        self.assertEqual(statistics['total_equipment_count'], 2_000)
+        self.assertEqual(list(statistics['by_type']), sorted(df['Type'].unique()))
+        for equipment_type, group in df.groupby('Type'):
+            entry = statistics['by_type'][equipment_type]
+            self.assertEqual(entry['count'], len(group))
+            for column in CSVProcessingService.NUMERIC_COLUMNS:
+                values = group[column]
+                with self.subTest(type=equipment_type, column=column):
+                    self.assertEqual(entry[column.lower()]['avg'], round(values.mean(), 2))
+                    self.assertEqual(entry[column.lower()]['min'], round(values.min(), 2))
+                    self.assertEqual(entry[column.lower()]['max'], round(values.max(), 2))
+                    self.assertEqual(entry[column.lower()]['std'], round(values.std(), 2))
+                    self.assertTrue(math.isclose(entry[column.lower()]['sum'], values.sum()))
+
+        for column in CSVProcessingService.NUMERIC_COLUMNS:
+            self.assertEqual(statistics['overall_averages'][column.lower()], round(df[column].mean(), 2))
+
+    def test_single_row_type_has_zero_std(self):
+        df = pd.DataFrame({
+            'Equipment Name': ['A', 'B', 'C'],
+            'Type': ['Pump', 'Pump', 'Valve'],
+            'Flowrate': [1.0, 3.0, 2.0],
+            'Pressure': [1.0, 1.0, 1.0],
+            'Temperature': [10.0, 20.0, 30.0],
+        })
+        statistics = CSVProcessingService(None).compute_statistics(df)
+        self.assertEqual(statistics['by_type']['Valve']['flowrate']['std'], 0.0)
+        self.assertEqual(statistics['by_type']['Pump']['flowrate']['std'], round(math.sqrt(2), 2))
+
+
+class MergeStatisticsTests(SimpleTestCase):
+    """Statistics of parts merge into the statistics of the whole."""
+
+    def setUp(self):
+        self.df = pd.read_csv(io.StringIO(large_csv(rows=3_000, seed=1)), dtype={'Type': str})
+        self.service = CSVProcessingService(None)
+
+    def test_merged_parts_equal_the_whole(self):
+        parts = [self.df.iloc[:1_000], self.df.iloc[1_000:1_001], self.df.iloc[1_001:]]
+        merged = merge_statistics(*(self.service.compute_statistics(part) for part in parts))
+        whole = self.service.compute_statistics(self.df)
+
+        self.assertEqual(merged['total_equipment_count'], whole['total_equipment_count'])
+        self.assertEqual(merged['overall_averages'], whole['overall_averages'])
+        self.assertEqual(merged['overall_std'], whole['overall_std'])
+        self.assertEqual(list(merged['by_type']), list(whole['by_type']))
+        for equipment_type, entry in whole['by_type'].items():
+            self.assertEqual(merged['by_type'][equipment_type]['count'], entry['count'])
+            for key in ('flowrate', 'pressure', 'temperature'):
+                merged_entry = merged['by_type'][equipment_type][key]
+                with self.subTest(type=equipment_type, key=key):
+                    for stat in ('avg', 'min', 'max', 'std'):
+                        self.assertEqual(merged_entry[stat], entry[key][stat])
+                    self.assertTrue(math.isclose(merged_entry['sum'], entry[key]['sum']))
+                    self.assertTrue(math.isclose(merged_entry['m2'], entry[key]['m2'], rel_tol=1e-9))
+
+    def test_std_is_the_sample_std(self):
+        statistics = self.service.compute_statistics(self.df)
+        for equipment_type, group in self.df.groupby('Type'):
+            self.assertEqual(statistics['by_type'][equipment_type]['pressure']['std'], round(group['Pressure'].std(), 2))
+        self.assertEqual(statistics['overall_std']['flowrate'], round(self.df['Flowrate'].std(), 2))
+
+    def test_statistics_without_moments_have_no_std(self):
+        statistics = self.service.compute_statistics(self.df)
+        # As stored before moments existed: rounded avg/min/max only
+        legacy = {
+            'total_equipment_count': statistics['total_equipment_count'],
+            'overall_averages': statistics['overall_averages'],
+            'by_type': {
+                equipment_type: {
+                    'count': entry['count'],
+                    **{
+                        key: {stat: entry[key][stat] for stat in ('avg', 'min', 'max')}
+                        for key in ('flowrate', 'pressure', 'temperature')
+                    }
+                }
+                for equipment_type, entry in statistics['by_type'].items()
+            },
+        }
+        merged = merge_statistics(legacy, statistics)
+        self.assertEqual(merged['total_equipment_count'], 2 * statistics['total_equipment_count'])
+        self.assertIsNone(merged['by_type']['Pump']['flowrate']['std'])
+        self.assertIsNone(merged['overall_std']['flowrate'])
+        self.assertEqual(merged['by_type']['Pump']['flowrate']['avg'], statistics['by_type']['Pump']['flowrate']['avg'])
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, CSV_HISTOGRAM_BINS=20)
+class ComputeStatisticsParityTests(TestCase):
+    """The in-memory and streaming paths must produce the same statistics."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='parity', password='parity')
+        self.dataset = CSVDataset.objects.create(
+            file_name='numeric_types.csv',
+            file=ContentFile(NUMERIC_TYPES_CSV.encode('utf-8'), name='numeric_types.csv'),
+            uploaded_by=self.user
+        )
+
+    def test_numeric_type_labels(self):
+        _, in_memory, error = CSVProcessingService(self.dataset).compute_in_memory()
+        self.assertIsNone(error)
+        _, streaming, error = CSVProcessingService(self.dataset, chunk_size=7).compute_streaming()
+        self.assertIsNone(error)
+
+        self.assertEqual(list(in_memory['by_type']), ['1', '10', '2', '3'])
+        self.assertStatisticsEqual(streaming, in_memory)
+
+    def test_percentiles_of_large_types(self):
+        dataset = CSVDataset.objects.create(
+            file_name='large.csv',
+            file=ContentFile(large_csv().encode('utf-8'), name='large.csv'),
+            uploaded_by=self.user
+        )
+        _, in_memory, error = CSVProcessingService(dataset).compute_in_memory()
+        self.assertIsNone(error)
+        _, streaming, error = CSVProcessingService(dataset, chunk_size=1_000).compute_streaming()
+        self.assertIsNone(error)
+
+        self.assertEqual(streaming['overall_quantiles'], in_memory['overall_quantiles'])
+        for equipment_type, entry in in_memory['by_type'].items():
+            for key in ('flowrate', 'pressure', 'temperature'):
+                self.assertEqual(
+                    streaming['by_type'][equipment_type][key]['quantiles'], entry[key]['quantiles'],
+                    (equipment_type, key)
+                )
+        self.assertStatisticsEqual(streaming, in_memory)
+
+        # Percentiles are exact, as pandas computes them
+        rows = pd.read_csv(dataset.file.path)
+        self.assertEqual(in_memory['overall_quantiles']['pressure']['p90'], round(rows['Pressure'].quantile(0.9), 2))
+
+    def test_stored_histograms_are_exact(self):
+        rows = pd.read_csv(self.dataset.file.path, dtype={'Type': str})
+        for streaming in (False, True):
+            with self.subTest(streaming=streaming):
+                success, _ = CSVProcessingService(self.dataset, chunk_size=7).process(streaming=streaming)
+                self.assertTrue(success)
+                stored = dict(TypeStatistic.objects.filter(dataset=self.dataset).values_list('equipment_type', 'histograms'))
+                for equipment_type, group in rows.groupby('Type'):
+                    for column in CSVProcessingService.NUMERIC_COLUMNS:
+                        counts, _ = np.histogram(group[column].to_numpy(dtype=float), bins=20)
+                        self.assertEqual(stored[equipment_type][column.lower()]['counts'], counts.tolist())
+                os.remove(self.dataset.sidecar_path)
+
+    def assertStatisticsEqual(self, first, second, path='statistics'):
+        """Compare key order and values, allowing for float summation order."""
+        if isinstance(first, dict):
+            self.assertIsInstance(second, dict, path)
+            self.assertEqual(list(first), list(second), path)
+            for key in first:
+                self.assertStatisticsEqual(first[key], second[key], f'{path}.{key}')
+        elif isinstance(first, list):
+            self.assertEqual(len(first), len(second), path)
+            for i, (a, b) in enumerate(zip(first, second)):
+                self.assertStatisticsEqual(a, b, f'{path}[{i}]')
+        elif isinstance(first, float):
+            self.assertTrue(math.isclose(first, second, rel_tol=1e-9, abs_tol=1e-9), f'{path}: {first} != {second}')
+        else:
+            self.assertEqual(first, second, path)
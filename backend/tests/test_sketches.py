@@ -0,0 +1,99 @@
+"""
+Tests for per-type quantile sketches in analytics.sketches.
+"""
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from analytics.sketches import TypeHistograms, TypeQuantiles
+
+NUMERIC_COLUMNS = ['Flowrate', 'Pressure', 'Temperature']
+
+
+def equipment_frame(rows, types, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Type': rng.integers(0, types, rows).astype(str),
+        'Flowrate': rng.normal(100, 10, rows),
+        'Pressure': rng.random(rows) * 10,
+        'Temperature': rng.normal(50, 5, rows),
+    })
+
+
+class TypeQuantilesTests(SimpleTestCase):
+
+    def add_in_chunks(self, quantiles, df, chunk_size):
+        for start in range(0, len(df), chunk_size):
+            quantiles.add(df.iloc[start:start + chunk_size])
+        return quantiles
+
+    def test_exact_buffer_is_bounded_across_types(self):
+        # 500 types of about 10 rows each: every type stays below k
+        df = equipment_frame(5_000, 500)
+        quantiles = TypeQuantiles(NUMERIC_COLUMNS, k=200, max_exact_rows=500)
+
+        for start in range(0, len(df), 100):
+            quantiles.add(df.iloc[start:start + 100])
+            buffered = quantiles.pending_rows + (0 if quantiles.exact is None else len(quantiles.exact))
+            self.assertLessEqual(buffered, 500 + 100)
+
+    def test_small_types_stay_exact(self):
+        df = equipment_frame(5_000, 500)
+        expected = TypeQuantiles(NUMERIC_COLUMNS, k=200)
+        expected.add(df)
+
+        chunked = self.add_in_chunks(TypeQuantiles(NUMERIC_COLUMNS, k=200, max_exact_rows=500), df, 100)
+
+        self.assertEqual(chunked.by_type(), expected.by_type())
+
+    def test_percentiles_do_not_depend_on_chunking(self):
+        # Types far above k, but the whole file fits the exact buffer
+        df = equipment_frame(6_000, 4)
+        whole = TypeQuantiles(NUMERIC_COLUMNS, k=50)
+        whole.add(df)
+        chunked = self.add_in_chunks(TypeQuantiles(NUMERIC_COLUMNS, k=50), df, 700)
+
+        self.assertEqual(chunked.by_type(), whole.by_type())
+        self.assertEqual(chunked.overall(), whole.overall())
+        self.assertEqual(chunked.dumps(), whole.dumps())
+
+        expected = df['Flowrate'].quantile([0.05, 0.5, 0.99]).round(2).tolist()
+        overall = whole.overall()['flowrate']
+        self.assertEqual([overall['p5'], overall['p50'], overall['p99']], expected)
+
+    def test_overflow_falls_back_to_sketches(self):
+        df = equipment_frame(6_000, 4)
+        quantiles = self.add_in_chunks(TypeQuantiles(NUMERIC_COLUMNS, k=50, max_exact_rows=1_000), df, 700)
+
+        self.assertIsNotNone(quantiles.overall_sketches)
+        self.assertEqual(quantiles.overall_sketches[0].count, len(df))
+        # Within the sketch's rank error of the exact median
+        median = quantiles.overall()['flowrate']['p50']
+        rank = (df['Flowrate'] < median).mean()
+        self.assertLess(abs(rank - 0.5), 0.05)
+
+
+class TypeHistogramsTests(SimpleTestCase):
+
+    def test_counts_match_np_histogram(self):
+        df = equipment_frame(20_000, 50)
+        # Values on bin edges and a type whose values are all equal
+        df['Temperature'] = df['Temperature'].round()
+        df.loc[df['Type'] == '7', 'Pressure'] = 2.5
+        grouped = df.groupby('Type')[NUMERIC_COLUMNS]
+
+        histograms = TypeHistograms(NUMERIC_COLUMNS, grouped.min(), grouped.max(), bins=20)
+        for start in range(0, len(df), 3_000):
+            histograms.add(df.iloc[start:start + 3_000])
+
+        by_type = histograms.by_type()
+        for equipment_type, rows in df.groupby('Type'):
+            for column in NUMERIC_COLUMNS:
+                counts, edges = np.histogram(rows[column].to_numpy(), bins=20)
+                entry = by_type[equipment_type][column.lower()]
+                self.assertEqual(entry['counts'], counts.tolist(), (equipment_type, column))
+                self.assertEqual(entry['range'], [edges[0], edges[-1]])
+
+        for column in NUMERIC_COLUMNS:
+            counts, _ = np.histogram(df[column].to_numpy(), bins=20)
+            self.assertEqual(histograms.overall()[column.lower()]['counts'], counts.tolist())
@@ -0,0 +1,559 @@
+"""
+Tests for the analytics API views.
+"""
+import base64
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from analytics import report_cache
+from analytics.jobs import claim_next_report_job, process_report_job
+from analytics.models import CSVDataset, ReportJob, TypeStatistic
+from analytics.pagination import decode_cursor, encode_cursor
+from analytics.services import CSVProcessingService
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+CSV = (
+    "Equipment Name,Type,Flowrate,Pressure,Temperature\n"
+    + "".join(f"Unit-{i},{'Pump' if i % 2 else 'Valve'},{100 + i},{5 + i / 10},{110 + i % 7}\n" for i in range(50))
+)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class CreateReportJobTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user('analyst')
+        self.dataset = CSVDataset.objects.create(
+            file_name='equipment.csv',
+            file='equipment.csv',
+            uploaded_by=self.user,
+            status='completed',
+            statistics={'by_type': {}},
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('create-report-job', args=[self.dataset.pk])
+
+    def test_non_object_body_is_rejected(self):
+        for body in ([], 'vector'):
+            response = self.client.post(self.url, body, format='json')
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(ReportJob.objects.exists())
+
+    def test_unknown_chart_format_is_rejected(self):
+        response = self.client.post(self.url, {'charts': 'bitmap'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_chart_format_from_body_or_default(self):
+        response = self.client.post(self.url, {'charts': 'vector'}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['chart_format'], 'vector')
+
+        response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['chart_format'], 'raster')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, PDF_REPORT_CACHE_DIR=os.path.join(MEDIA_ROOT, 'report_cache'))
+class ReportJobLifecycleTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('analyst')
+        self.dataset = CSVDataset.objects.create(
+            file_name='equipment.csv',
+            file=ContentFile(CSV.encode('utf-8'), name='equipment.csv'),
+            uploaded_by=self.user
+        )
+        success, error_message = CSVProcessingService(self.dataset).process()
+        self.assertTrue(success, error_message)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        report_cache.clear(self.dataset.pk)
+
+    def create_job(self):
+        return self.client.post(
+            reverse('create-report-job', args=[self.dataset.pk]), {'charts': 'vector'}, format='json'
+        )
+
+    def test_lifecycle(self):
+        response = self.create_job()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'processing')
+        self.assertIsNone(response.data['started_at'])
+        job_id = response.data['id']
+        status_url = reverse('report-job', args=[job_id])
+        download_url = reverse('download-report-job', args=[job_id])
+
+        self.assertEqual(self.client.get(download_url).status_code, 400)
+
+        # A worker claims the job and renders it
+        self.assertEqual(claim_next_report_job(), job_id)
+        self.assertEqual(process_report_job(job_id), (job_id, True, None))
+
+        response = self.client.get(status_url)
+        self.assertEqual(response.data['status'], 'completed')
+        self.assertIsNotNone(response.data['completed_at'])
+
+        response = self.client.get(download_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        etag = response['ETag']
+        self.assertEqual(self.client.get(download_url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # The report is cached now, so a new job is completed right away
+        response = self.create_job()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], 'completed')
+
+        # Cache entry removed: the finished job can no longer be downloaded
+        report_cache.clear(self.dataset.pk)
+        self.assertEqual(self.client.get(download_url).status_code, 410)
+
+    def test_failed_job(self):
+        job_id = self.create_job().data['id']
+        with mock.patch('analytics.pdf_service.PDFReportService.generate', side_effect=RuntimeError('boom')), \
+                self.assertLogs('analytics.jobs', 'ERROR'):
+            self.assertEqual(process_report_job(job_id), (job_id, False, 'boom'))
+
+        response = self.client.get(reverse('report-job', args=[job_id]))
+        self.assertEqual(response.data['status'], 'failed')
+        self.assertEqual(response.data['error_log'], 'boom')
+        self.assertEqual(self.client.get(reverse('download-report-job', args=[job_id])).status_code, 400)
+
+    def test_other_users_jobs_are_not_found(self):
+        job_id = self.create_job().data['id']
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user('other'))
+        self.assertEqual(other.get(reverse('report-job', args=[job_id])).status_code, 404)
+        self.assertEqual(other.get(reverse('download-report-job', args=[job_id])).status_code, 404)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class DatasetSeriesTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('analyst')
+        # No TypeStatistic rows, as for datasets processed before they existed
+        self.dataset = CSVDataset.objects.create(
+            file_name='equipment.csv',
+            file=ContentFile(CSV.encode('utf-8'), name='equipment.csv'),
+            uploaded_by=self.user,
+            status='completed',
+            row_count=50,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('dataset-series', args=[self.dataset.pk])
+
+    def test_unknown_type_returns_empty_series(self):
+        response = self.client.get(self.url, {'type': 'nope'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_rows'], 0)
+        for series in response.data['series'].values():
+            self.assertEqual(series, {'x': [], 'y': []})
+
+    def test_type_filter_without_type_statistics_is_downsampled(self):
+        response = self.client.get(self.url, {'type': 'Pump', 'points': 4, 'columns': 'Flowrate'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_rows'], 25)
+        self.assertEqual(response.data['bucket_size'], 13)
+        series = response.data['series']['Flowrate']
+        self.assertLessEqual(len(series['x']), 4)
+        # Rows 0 and 24 of the Pump rows hold the extremes of the two buckets
+        self.assertIn(0, series['x'])
+        self.assertIn(24, series['x'])
+
+    def test_whole_dataset_counts_sidecar_rows(self):
+        response = self.client.get(self.url, {'points': 10, 'columns': 'Flowrate'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_rows'], 50)
+        self.assertEqual(response.data['bucket_size'], 10)
+        self.assertEqual(len(response.data['series']['Flowrate']['x']), 10)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class DatasetDataFormatTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('analyst')
+        self.dataset = CSVDataset.objects.create(
+            file_name='equipment.csv',
+            file=ContentFile(CSV.encode('utf-8'), name='equipment.csv'),
+            uploaded_by=self.user,
+            status='completed',
+            row_count=50,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, pk, **params):
+        return self.client.get(reverse('dataset-data', args=[pk]), params)
+
+    def assertJSONError(self, response, status_code, key):
+        self.assertEqual(response.status_code, status_code)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn(key, json.loads(response.content))
+
+    @override_settings(DATASET_STREAM_BATCH_SIZE=10)
+    def test_ndjson_rows_are_streamed_in_batches(self):
+        response = self.get(self.dataset.pk, format='ndjson', offset=5, limit=30, columns='Equipment Name')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertNotIn('X-Total-Count', response)
+
+        chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 1)
+        rows = [json.loads(line) for line in b''.join(chunks).decode('utf-8').splitlines()]
+        self.assertEqual(rows, [{'Equipment Name': f'Unit-{i}'} for i in range(5, 35)])
+
+    def test_ndjson_rejects_sort(self):
+        response = self.get(self.dataset.pk, format='ndjson', sort='Flowrate')
+        self.assertEqual(response.status_code, 400)
+
+    def test_arrow_rows(self):
+        response = self.get(self.dataset.pk, format='arrow', type='Pump', columns='Type,Flowrate')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.arrow.stream')
+        table = pa.ipc.open_stream(b''.join(response.streaming_content)).read_all()
+        self.assertEqual(table.column_names, ['Type', 'Flowrate'])
+        self.assertEqual(table.num_rows, 25)
+
+    def test_errors_are_json_in_binary_formats(self):
+        for response_format in ('arrow', 'parquet'):
+            with self.subTest(response_format):
+                self.assertJSONError(self.get(self.dataset.pk, format=response_format, offset=-1), 400, 'error')
+                self.assertJSONError(self.get(self.dataset.pk + 1, format=response_format), 404, 'detail')
+
+        CSVDataset.objects.filter(pk=self.dataset.pk).update(status='processing')
+        self.assertJSONError(self.get(self.dataset.pk, format='arrow'), 400, 'error')
+
+
+class DatasetStatusTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('analyst')
+        self.dataset = CSVDataset.objects.create(
+            file_name='equipment.csv',
+            file='csv_uploads/equipment.csv',
+            uploaded_by=self.user,
+            phase='reading',
+            rows_processed=850,
+            bytes_read=425,
+            bytes_total=1000,
+            statistics={'by_type': {}},
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, pk=None):
+        return self.client.get(reverse('dataset-status', args=[pk or self.dataset.pk]))
+
+    def set_progress(self, **fields):
+        CSVDataset.objects.filter(pk=self.dataset.pk).update(**fields)
+        return self.get().data['progress']
+
+    def test_status_fields(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {
+            'id', 'status', 'phase', 'progress', 'rows_processed',
+            'bytes_read', 'bytes_total', 'error_log', 'processed_at'
+        })
+        self.assertEqual(response.data['status'], 'processing')
+        self.assertEqual(response.data['rows_processed'], 850)
+        # Polling never loads the statistics blob
+        self.assertFalse(any('"statistics"' in query['sql'] for query in captured.captured_queries))
+
+    def test_progress_follows_bytes_read(self):
+        self.assertEqual(self.get().data['progress'], 42.5)
+        self.assertEqual(self.set_progress(bytes_read=1500), 100.0)
+        self.assertEqual(self.set_progress(bytes_total=None), 0.0)
+        self.assertEqual(self.set_progress(bytes_total=0), 0.0)
+        self.assertEqual(self.set_progress(phase='done', status='completed'), 100.0)
+
+    def test_other_users_dataset_is_not_found(self):
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user('other'))
+        response = other.get(reverse('dataset-status', args=[self.dataset.pk]))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, CSV_BACKGROUND_PROCESSING=False)
+class UploadDeduplicationTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('analyst')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, content, client=None):
+        return (client or self.client).post(
+            reverse('upload-csv'),
+            {'file': SimpleUploadedFile('equipment.csv', content)},
+            format='multipart'
+        )
+
+    def test_identical_upload_reuses_results(self):
+        content = CSV.encode('utf-8')
+        first = self.upload(content)
+        self.assertEqual(first.status_code, 201)
+        original = CSVDataset.objects.get(pk=first.data['dataset_id'])
+        self.assertEqual(original.content_hash, hashlib.sha256(content).hexdigest())
+
+        with mock.patch.object(CSVProcessingService, 'process') as process:
+            second = self.upload(content)
+        process.assert_not_called()
+        self.assertEqual(second.status_code, 201)
+        self.assertIn('reused', second.data['message'])
+
+        reused = CSVDataset.objects.get(pk=second.data['dataset_id'])
+        self.assertNotEqual(reused.pk, original.pk)
+        self.assertEqual(reused.file.name, original.file.name)
+        self.assertEqual(reused.status, 'completed')
+        self.assertEqual(reused.row_count, 50)
+        self.assertEqual(reused.statistics, original.statistics)
+        self.assertEqual(
+            list(reused.type_statistics.order_by('equipment_type').values_list('equipment_type', 'count')),
+            [('Pump', 25), ('Valve', 25)]
+        )
+
+    def test_changed_content_is_processed(self):
+        self.upload(CSV.encode('utf-8'))
+        changed = CSV.replace('Unit-0,Valve,100', 'Unit-0,Valve,99')
+        with mock.patch.object(CSVProcessingService, 'process', return_value=(True, None)) as process:
+            self.upload(changed.encode('utf-8'))
+        process.assert_called_once()
+
+    def test_other_users_uploads_are_not_reused(self):
+        self.upload(CSV.encode('utf-8'))
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user('other'))
+        with mock.patch.object(CSVProcessingService, 'process', return_value=(True, None)) as process:
+            self.upload(CSV.encode('utf-8'), client=other)
+        process.assert_called_once()
+
+
+@override_settings(MAX_DATASETS_PER_USER=10)
+class DatasetListTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('analyst')
+        now = timezone.now()
+        for i in range(7):
+            dataset = CSVDataset.objects.create(
+                file_name=f'equipment_{i}.csv',
+                file=f'csv_uploads/equipment_{i}.csv',
+                uploaded_by=self.user,
+                status='completed',
+                row_count=i,
+                statistics={'by_type': {}},
+            )
+            # Pairs of uploads share a timestamp, so pages must break ties by id
+            CSVDataset.objects.filter(pk=dataset.pk).update(uploaded_at=now - timedelta(minutes=i // 2))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('list-datasets')
+
+    def test_cursor_pages_cover_every_dataset_once(self):
+        expected = list(
+            CSVDataset.objects.filter(uploaded_by=self.user)
+            .order_by('-uploaded_at', '-id').values_list('pk', flat=True)
+        )
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['count'], len(response.data['datasets']))
+            seen.extend(dataset['id'] for dataset in response.data['datasets'])
+            pages += 1
+            cursor = response.data['next']
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, 4)
+
+    def test_summary_view_skips_statistics(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(self.url, {'view': 'summary'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data['datasets'][0]), {
+            'id', 'file_name', 'uploaded_by_username', 'uploaded_at', 'row_count', 'status'
+        })
+        self.assertEqual(response.data['datasets'][0]['uploaded_by_username'], 'analyst')
+        self.assertEqual(len(captured.captured_queries), 1)
+        sql = captured.captured_queries[0]['sql']
+        self.assertNotIn('"statistics"', sql)
+        self.assertNotIn('"error_log"', sql)
+
+        full = self.client.get(self.url)
+        self.assertIn('statistics', full.data['datasets'][0])
+
+    def test_unknown_view_is_rejected(self):
+        self.assertEqual(self.client.get(self.url, {'view': 'compact'}).status_code, 400)
+
+    def test_cursor_round_trip(self):
+        dataset = CSVDataset.objects.order_by('pk').first()
+        self.assertEqual(decode_cursor(encode_cursor(dataset)), (dataset.uploaded_at, dataset.pk))
+
+    def test_malformed_and_naive_cursors_are_rejected(self):
+        naive = base64.urlsafe_b64encode(b'2026-01-01T00:00:00|5').decode()
+        for cursor in ('not-a-cursor', naive):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.url, {'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data, {'error': 'Invalid cursor.'})
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class TypeStatisticsTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('analyst')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('type-statistics')
+        self.older = self.process(CSV)
+        self.newer = self.process(CSV.replace('Valve', 'Reactor'))
+
+    def process(self, content):
+        dataset = CSVDataset.objects.create(
+            file_name='equipment.csv',
+            file=ContentFile(content.encode('utf-8'), name='equipment.csv'),
+            uploaded_by=self.user
+        )
+        success, error_message = CSVProcessingService(dataset).process()
+        self.assertTrue(success, error_message)
+        return dataset
+
+    def frame(self, *datasets):
+        return pd.concat([pd.read_csv(dataset.file.path) for dataset in datasets])
+
+    def test_rows_are_stored_per_type(self):
+        rows = TypeStatistic.objects.filter(dataset=self.newer).order_by('equipment_type')
+        self.assertEqual(list(rows.values_list('equipment_type', 'count')), [('Pump', 25), ('Reactor', 25)])
+        pump = rows.get(equipment_type='Pump')
+        self.assertEqual(pump.flowrate_mean, self.newer.statistics['by_type']['Pump']['flowrate']['avg'])
+        self.assertIsNotNone(pump.flowrate_m2)
+
+    def test_aggregate_across_datasets(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['dataset_count'], 2)
+        self.assertEqual(list(response.data['by_type']), ['Pump', 'Reactor', 'Valve'])
+
+        pump = response.data['by_type']['Pump']
+        rows = self.frame(self.older, self.newer)
+        pumps = rows[rows['Type'] == 'Pump']
+        self.assertEqual(pump['count'], 50)
+        self.assertEqual(pump['dataset_count'], 2)
+        for column in ('Flowrate', 'Pressure', 'Temperature'):
+            with self.subTest(column=column):
+                self.assertEqual(pump[column.lower()]['avg'], round(pumps[column].mean(), 2))
+                self.assertEqual(pump[column.lower()]['std'], round(pumps[column].std(), 2))
+                self.assertEqual(pump[column.lower()]['min'], round(pumps[column].min(), 2))
+                self.assertEqual(pump[column.lower()]['max'], round(pumps[column].max(), 2))
+
+    def test_type_and_last_filters(self):
+        response = self.client.get(self.url, {'type': 'Pump,Valve', 'last': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['dataset_count'], 1)
+        self.assertEqual(list(response.data['by_type']), ['Pump'])
+        self.assertEqual(response.data['by_type']['Pump']['count'], 25)
+
+        self.assertEqual(self.client.get(self.url, {'last': 0}).status_code, 400)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, CSV_HISTOGRAM_BINS=8)
+class DatasetHistogramTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('analyst')
+        self.dataset = CSVDataset.objects.create(
+            file_name='equipment.csv',
+            file=ContentFile(CSV.encode('utf-8'), name='equipment.csv'),
+            uploaded_by=self.user
+        )
+        success, error_message = CSVProcessingService(self.dataset).process()
+        self.assertTrue(success, error_message)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('dataset-histograms', args=[self.dataset.pk])
+
+    def test_histograms(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['dataset_id'], self.dataset.pk)
+        self.assertEqual(list(response.data['by_type']), ['Pump', 'Valve'])
+
+        rows = pd.read_csv(self.dataset.file.path)
+        flowrate = response.data['overall']['flowrate']
+        counts, _ = np.histogram(rows['Flowrate'], bins=8, range=tuple(flowrate['range']))
+        self.assertEqual(flowrate['counts'], counts.tolist())
+        for histograms in response.data['by_type'].values():
+            self.assertEqual(sum(histograms['pressure']['counts']), 25)
+
+    def test_type_filter(self):
+        response = self.client.get(self.url, {'type': 'Valve'})
+        self.assertEqual(list(response.data['by_type']), ['Valve'])
+
+    def test_missing_histograms(self):
+        CSVDataset.objects.filter(pk=self.dataset.pk).update(statistics={'by_type': {}})
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        CSVDataset.objects.filter(pk=self.dataset.pk).update(status='processing')
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, CSV_MAX_UPLOAD_SIZE=1024)
+class UploadSizeTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('analyst')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('upload-csv')
+
+    def upload(self, content):
+        return self.client.post(self.url, {'file': SimpleUploadedFile('equipment.csv', content)}, format='multipart')
+
+    def test_oversized_body_is_refused_before_parsing(self):
+        response = self.upload(b'x' * (1024 + 65 * 1024))
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(CSVDataset.objects.exists())
+
+    def test_oversized_file_is_rejected(self):
+        response = self.upload(b'x' * 2048)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('file', response.data['details'])
+        self.assertFalse(CSVDataset.objects.exists())
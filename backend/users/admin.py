@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserPreferences
+from .models import AuthToken, UserPreferences
 
 
 @admin.register(UserPreferences)
@@ -7,3 +7,10 @@ class UserPreferencesAdmin(admin.ModelAdmin):
     list_display = ('user', 'theme', 'default_view', 'items_per_page', 'last_active_dataset_id', 'updated_at')
     list_filter = ('theme', 'default_view')
     search_fields = ('user__username', 'user__email')
+
+
+@admin.register(AuthToken)
+class AuthTokenAdmin(admin.ModelAdmin):
+    list_display = ('user', 'created', 'expires_at')
+    search_fields = ('user__username',)
+    raw_id_fields = ('user',)
@@ -0,0 +1,89 @@
+"""
+Token authentication with a cache in front of the token table.
+
+The cache is only as shared as the CACHES backend. With the default
+per-process LocMemCache, a token revoked (or a user deactivated) through
+one server process is dropped from that process's cache at once but can
+stay valid in other processes for up to AUTH_TOKEN_CACHE_TIMEOUT seconds.
+Deployments running several processes should point CACHES at a shared
+backend such as Redis or Memcached, or keep the timeout short.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from .models import AuthToken, token_cache_key
+
+
+def issue_token(user):
+    """
+    Issue a new API token for a signed-in client.
+
+    Expired tokens of every user are deleted first, and the user's oldest
+    tokens beyond AUTH_TOKEN_MAX_PER_USER are revoked, so the token table
+    stays bounded without a separate cleanup job.
+
+    Args:
+        user: Authenticated User instance
+
+    Returns:
+        str: Opaque token key for the `Authorization: Bearer` header
+    """
+    AuthToken.objects.filter(expires_at__lte=timezone.now()).delete()
+
+    keep = getattr(settings, 'AUTH_TOKEN_MAX_PER_USER', 10) - 1
+    oldest = AuthToken.objects.filter(user=user).order_by('-created').values_list('key', flat=True)[keep:]
+    if oldest:
+        AuthToken.objects.filter(key__in=list(oldest)).delete()
+
+    return AuthToken.objects.create(user=user).key
+
+
+def revoke_token(token):
+    """
+    Revoke one API token; the user's other clients stay signed in.
+
+    Args:
+        token: AuthToken instance (request.auth) or None for requests
+            authenticated some other way
+    """
+    if isinstance(token, AuthToken):
+        # Deleting drops the cached lookup (see users.models)
+        AuthToken.objects.filter(key=token.key).delete()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Authenticate `Authorization: Bearer <token>` requests.
+
+    Unlike Basic authentication, no password hash is computed per request.
+    Tokens are looked up once and then served from the Django cache for
+    AUTH_TOKEN_CACHE_TIMEOUT seconds. Expiry is checked on every request,
+    cached or not.
+    """
+    keyword = 'Bearer'
+    model = AuthToken
+
+    def authenticate_credentials(self, key):
+        token = cache.get(token_cache_key(key))
+
+        if token is None:
+            try:
+                token = AuthToken.objects.select_related('user').get(key=key)
+            except AuthToken.DoesNotExist:
+                raise exceptions.AuthenticationFailed('Invalid token.')
+            cache.set(
+                token_cache_key(key),
+                token,
+                getattr(settings, 'AUTH_TOKEN_CACHE_TIMEOUT', 30)
+            )
+
+        if token.is_expired:
+            revoke_token(token)
+            raise exceptions.AuthenticationFailed('Token has expired.')
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+
+        return (token.user, token)
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:40
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def set_expiry(apps, schema_editor):
+    """Existing tokens expire one lifetime after they were issued."""
+    AuthToken = apps.get_model('users', 'AuthToken')
+    lifetime = timedelta(seconds=getattr(settings, 'AUTH_TOKEN_LIFETIME', 7 * 24 * 3600))
+    AuthToken.objects.update(expires_at=F('created') + lifetime)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_auth_token'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authtoken',
+            name='expires_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(set_expiry, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='authtoken',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -1,5 +1,20 @@
+import os
+import binascii
+from datetime import timedelta
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+TOKEN_CACHE_KEY_PREFIX = 'auth-token:'
+
+
+def token_cache_key(key):
+    """Cache key under which CachedTokenAuthentication stores a token lookup."""
+    return f"{TOKEN_CACHE_KEY_PREFIX}{key}"
 
 
 class UserPreferences(models.Model):
@@ -39,3 +54,54 @@ class UserPreferences(models.Model):
     
     def __str__(self):
         return f"{self.user.username}'s preferences"
+
+
+class AuthToken(models.Model):
+    """
+    API token issued at login, one per signed-in client.
+
+    Unlike DRF's authtoken.Token a user can hold several tokens, so logging
+    out on one device leaves the user's other sessions signed in. Tokens
+    expire AUTH_TOKEN_LIFETIME seconds after they are issued.
+    """
+    key = models.CharField(max_length=40, primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='auth_tokens')
+    created = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Token for {self.user.username}"
+
+    def save(self, *args, **kwargs):
+        if not self.key:
+            self.key = binascii.hexlify(os.urandom(20)).decode()
+        if self.expires_at is None:
+            self.expires_at = timezone.now() + token_lifetime()
+        return super().save(*args, **kwargs)
+
+    @property
+    def is_expired(self):
+        return self.expires_at <= timezone.now()
+
+
+def token_lifetime():
+    """How long an issued token stays valid (AUTH_TOKEN_LIFETIME seconds)."""
+    return timedelta(seconds=getattr(settings, 'AUTH_TOKEN_LIFETIME', 7 * 24 * 3600))
+
+
+@receiver(post_delete, sender=AuthToken)
+def forget_deleted_token(sender, instance, **kwargs):
+    """Drop a revoked (or cascade-deleted) token from the lookup cache."""
+    cache.delete(token_cache_key(instance.key))
+
+
+@receiver(post_save, sender=User)
+def forget_user_tokens(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Drop cached lookups of a changed user's tokens, so that deactivation
+    takes effect on the next request rather than when the cache expires.
+    """
+    if created or update_fields == frozenset(['last_login']):
+        return
+    keys = AuthToken.objects.filter(user=instance).values_list('key', flat=True)
+    cache.delete_many([token_cache_key(key) for key in keys])
@@ -7,6 +7,7 @@ from django.contrib.auth.models import User
 from django.views.decorators.csrf import csrf_exempt
 from .serializers import UserSerializer, LoginSerializer, UserPreferencesSerializer
 from .models import UserPreferences
+from .authentication import issue_token, revoke_token
 
 
 @csrf_exempt
@@ -77,6 +78,7 @@ def register_view(request):
         user_data = UserSerializer(user).data
         return Response({
             'message': 'Registration successful.',
+            'token': issue_token(user),
             'user': user_data
         }, status=status.HTTP_201_CREATED)
     except Exception as e:
@@ -91,13 +93,16 @@ def register_view(request):
 @permission_classes([AllowAny])
 def login_view(request):
     """
-    Login endpoint using Basic Authentication.
+    Login endpoint that issues an API token.
     
     POST /api/auth/login/
     {
         "username": "user",
         "password": "pass"
     }
+    
+    Send the returned token on later requests as
+    `Authorization: Bearer <token>`.
     """
     serializer = LoginSerializer(data=request.data)
     
@@ -117,6 +122,7 @@ def login_view(request):
         user_data = UserSerializer(user).data
         return Response({
             'message': 'Login successful.',
+            'token': issue_token(user),
             'user': user_data
         }, status=status.HTTP_200_OK)
     else:
@@ -130,10 +136,12 @@ def login_view(request):
 @permission_classes([IsAuthenticated])
 def logout_view(request):
     """
-    Logout endpoint.
+    Logout endpoint. Revokes the API token the request was made with;
+    the user's other devices stay signed in.
     
     POST /api/auth/logout/
     """
+    revoke_token(request.auth)
     logout(request)
     return Response(
         {'message': 'Logout successful.'},
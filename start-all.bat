@@ -12,6 +12,10 @@ echo Starting Backend Server...
 start "Backend Server" cmd /k "cd backend && venv\Scripts\activate && python manage.py runserver"
 timeout /t 3 /nobreak >nul
 
+REM Start CSV processing workers in new window
+echo Starting Upload Workers...
+start "Upload Workers" cmd /k "cd backend && venv\Scripts\activate && python manage.py process_uploads"
+
 REM Start Frontend in new window
 echo Starting Web Frontend...
 start "Web Frontend" cmd /k "cd Web-Frontend && npm run dev"
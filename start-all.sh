@@ -24,6 +24,8 @@ cd backend
 source venv/bin/activate
 python manage.py runserver &
 BACKEND_PID=$!
+python manage.py process_uploads &
+WORKER_PID=$!
 cd ..
 sleep 3
 
@@ -45,7 +47,7 @@ cd Desktop-App
 python main.py
 
 # When desktop app closes, kill backend and frontend
-kill $BACKEND_PID $FRONTEND_PID 2>/dev/null
+kill $BACKEND_PID $WORKER_PID $FRONTEND_PID 2>/dev/null
 
 echo ""
 echo "All components stopped."